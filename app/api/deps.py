@@ -0,0 +1,87 @@
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import ValidationError
+
+from app.config import settings
+from core.pagination import decode_cursor
+from core.security import auth_cache, verify_token
+from models.schemas import User
+from services.providers import Services, get_services
+
+# Request dependencies shared by the page routes (app/main.py) and the API routers
+
+# Security
+security = HTTPBearer(auto_error=False)
+
+# Dependency to get current user
+async def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    services: Services = Depends(get_services)
+) -> Optional[User]:
+    """Get current user from token or session"""
+    token = None
+    
+    # Try to get token from Authorization header
+    if credentials:
+        token = credentials.credentials
+    
+    # Try to get token from session cookie
+    if not token:
+        token = request.session.get("access_token")
+    
+    if not token:
+        return None
+    
+    return await resolve_user(token, services)
+
+# Resolve a session token to its active user, None if invalid
+async def resolve_user(token: str, services: Services) -> Optional[User]:
+    # Fast path: token already verified by this process
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    try:
+        payload = verify_token(token)
+        user_id = int(payload["sub"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    
+    # Signed profile claims avoid the lookup while the token is fresh and the user unchanged since issue
+    claims = payload.get("profile")
+    cache_until = payload.get("exp")
+    if settings.AUTH_PROFILE_CLAIMS and claims and auth_cache.claims_trusted(user_id, payload.get("iat")):
+        try:
+            current_user = User.model_validate(claims)
+            # The snapshot is as old as the token: cache it no longer than the claims are trusted
+            trusted_until = payload["iat"] + auth_cache.ttl
+            cache_until = min(cache_until, trusted_until) if cache_until else trusted_until
+        except ValidationError:
+            current_user = None
+    else:
+        current_user = None
+    
+    if current_user is None:
+        user_service = services.users
+        db_user = await user_service.get_user_by_id(user_id)
+        if not db_user:
+            return None
+        current_user = User.model_validate(db_user)
+    
+    if not current_user.is_active:
+        return None
+    
+    auth_cache.put(token, user_id, current_user, token_exp=cache_until)
+    return current_user
+
+
+# Run a cursor-paginated service call, rejecting malformed cursors with a 400
+async def paginate(fetch, *args, cursor: Optional[str] = None, **kwargs):
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return await fetch(*args, cursor=cursor, **kwargs)
@@ -0,0 +1,79 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import get_current_user, paginate
+from core.serialization import FastJSONResponse
+from models.schemas import User
+from services.providers import Services, get_services
+
+# Versioned JSON API. Responses are plain dicts from services/projections.py,
+# returned as FastJSONResponse so FastAPI neither validates them against a
+# response model nor runs them through jsonable_encoder.
+router = APIRouter(prefix="/api/v1", tags=["v1"], default_response_class=FastJSONResponse)
+
+async def require_user(current_user: Optional[User] = Depends(get_current_user)) -> User:
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return current_user
+
+# Home feed; each author is listed once under "authors"
+@router.get("/feed")
+async def feed(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_user),
+    services: Services = Depends(get_services)
+):
+    page = await paginate(services.projections.get_feed, current_user.id, limit=limit, cursor=cursor)
+    return FastJSONResponse(page)
+
+# A user's posts
+@router.get("/users/{user_id}/posts")
+async def user_posts(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    services: Services = Depends(get_services)
+):
+    page = await paginate(services.projections.get_user_posts, user_id, limit=limit, cursor=cursor)
+    return FastJSONResponse(page)
+
+# Profile with a page of posts and the caller's relationship to the user
+@router.get("/profile/{user_id}")
+async def profile(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    viewer_id = current_user.id if current_user else None
+    result = await paginate(
+        services.projections.get_profile, user_id, viewer_id=viewer_id, limit=limit, cursor=cursor
+    )
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return FastJSONResponse(result)
+
+# The caller's connections and counters
+@router.get("/network")
+async def network(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_user),
+    services: Services = Depends(get_services)
+):
+    page = await paginate(services.projections.get_network, current_user.id, limit=limit, cursor=cursor)
+    return FastJSONResponse(page)
+
+# People search
+@router.get("/search")
+async def search(
+    q: str = "",
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    services: Services = Depends(get_services)
+):
+    if not q:
+        return FastJSONResponse({"users": [], "total": 0})
+    return FastJSONResponse(await services.projections.search_users(q, limit=limit, offset=(page - 1) * limit))
@@ -4,21 +4,107 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./linkedin_clone.db"
+    DB_STACK: str = "sync"  # sync (Session on the DB threadpool) or async (AsyncSession)
+    DATABASE_READ_URL: Optional[str] = None  # read-only pool for GET routes; defaults to DATABASE_URL
+    DB_READ_SPLIT: bool = False  # serve GET routes from the read-only pool
+    DB_POOL_SIZE: int = 16  # match DB_THREADPOOL_WORKERS so workers never wait on the pool
+    DB_MAX_OVERFLOW: int = 4
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a pooled connection
+    DB_READ_POOL_SIZE: int = 16
+    DB_STORAGE_PROFILE: str = "wal"  # SQLite: wal (tuned for concurrent readers) or default (SQLite defaults)
+    SQLITE_SYNCHRONOUS: str = "normal"  # fsync only at WAL checkpoints; safe against app crashes
+    # Page cache of each connection, not shared: a process can hold up to this times
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW), plus DB_READ_POOL_SIZE with DB_READ_SPLIT:
+    # 4 MiB * 20 = 80 MiB, or 144 MiB split. Hot pages are also read through mmap.
+    SQLITE_CACHE_SIZE_KB: int = 4 * 1024
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait for the write lock instead of failing with "database is locked"
+    SYNC_OVERLAP_SECONDS: float = 10.0  # in-memory indexes re-read rows this far behind their sync watermark
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_SIZE: int = 10000  # verified tokens kept per process; 0 disables the cache
+    AUTH_CACHE_TTL: int = 60  # seconds a cached user snapshot is trusted
+    AUTH_PROFILE_CLAIMS: bool = False  # embed a signed profile snapshot in session tokens
     
     # Application
     APP_NAME: str = "LinkedIn Clone"
     DEBUG: bool = False
+    QUERY_BUDGET: int = 0  # max SQL statements per request, enforced when > 0 (tests/dev)
+    
+    # Observability
+    METRICS_ENABLED: bool = True  # per-request metrics middleware and the /metrics endpoint
+    SLOW_REQUEST_MS: int = 500  # requests at least this slow are logged with their slowest SQL; 0 disables
+    
+    # Templates
+    TEMPLATE_BYTECODE_CACHE: bool = True  # persist compiled templates across restarts and workers
+    TEMPLATE_CACHE_DIR: Optional[str] = None  # bytecode cache directory; defaults to a per-user temp dir
+    FRAGMENT_CACHE_SIZE: int = 5000  # rendered post/user cards kept per process; 0 disables
+    TEMPLATE_STREAMING: bool = False  # stream the feed and profile pages while they render
     
     # File uploads
     UPLOAD_DIR: str = "static/uploads"
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
     
+    # Execution pools
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread or process
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE: int = 64  # waiting hash jobs before logins get a 503
+    DB_THREADPOOL_WORKERS: int = 16
+    DB_THREADPOOL_QUEUE: int = 1000  # waiting DB jobs before requests get a 503
+    IMAGE_WORKERS: int = 2  # processes generating upload derivatives
+    IMAGE_QUEUE: int = 32  # waiting derivative jobs before uploads get a 503
+    
+    # Write queue
+    WRITE_QUEUE_ENABLED: bool = False  # group-commit posts and connection requests/acceptances
+    WRITE_BATCH_SIZE: int = 64  # writes committed together at most
+    WRITE_BATCH_DELAY_MS: float = 2.0  # how long the first write of a batch waits for others to join
+    
+    # Search
+    SEARCH_BACKEND: str = "auto"  # auto (FTS5 when available), fts5 or memory
+    SEARCH_PAGE_SIZE: int = 20
+    SEARCH_SYNC_INTERVAL: float = 5.0  # memory backend: seconds between delta syncs of users changed by other workers
+    TYPEAHEAD_LIMIT: int = 8  # suggestions per keystroke
+    TYPEAHEAD_SCAN_LIMIT: int = 2000  # index entries examined per lookup at most
+    TYPEAHEAD_SYNC_INTERVAL: float = 5.0  # seconds between delta syncs of users changed by other workers
+    
+    # Social graph index
+    GRAPH_SYNC_INTERVAL: float = 5.0  # seconds between delta syncs of connections changed elsewhere
+    CONNECTION_BULK_MAX: int = 500  # users per bulk send/accept request
+    
+    # Suggestions
+    SUGGESTION_MAX_NEIGHBORS: int = 200  # connections expanded per user when generating candidates
+    SUGGESTION_MAX_SECOND_DEGREE: int = 500  # connections read per expanded neighbour
+    SUGGESTION_CANDIDATES: int = 300  # top mutual-count candidates scored on profile overlap
+    SUGGESTION_STORE: int = 50  # suggestions kept per user
+    
+    # Messaging
+    MESSAGE_MAX_LENGTH: int = 2000
+    MESSAGE_PAGE_SIZE: int = 30
+    WS_QUEUE_SIZE: int = 100  # events buffered per socket; a client that falls further behind is disconnected
+    WS_SEND_TIMEOUT: float = 10.0  # seconds a single socket write may take before the client counts as stalled
+    PUBSUB_BROKER: str = "local"  # local (this process only) or database (relay between workers via a table)
+    PUBSUB_POLL_INTERVAL: float = 0.1  # database broker: seconds between polls for other workers' events
+    PUBSUB_RETENTION: int = 300  # database broker: seconds relayed events are kept
+    
+    # Jobs
+    JOB_PAGE_SIZE: int = 20
+    JOB_DEFAULT_DAYS: int = 30  # how long a posting stays open
+    JOB_MAX_DAYS: int = 90
+    JOB_FACET_LIMIT: int = 10  # values listed per facet, most common first
+    JOB_SYNC_INTERVAL: float = 5.0  # seconds between delta syncs of postings changed by other workers
+    JOB_REPACK_RATIO: float = 0.25  # reload the index once this fraction of its slots held removed postings
+    
+    # Feed
+    FEED_FANOUT_THRESHOLD: int = 5000  # authors above this many connections are pulled on read
+    FEED_BACKFILL_DEPTH: int = 200  # posts per author copied into a timeline on backfill
+    FEED_SEED_DEPTH: int = 50  # posts copied into a timeline when a new connection is accepted
+    FEED_STREAM_HEARTBEAT: float = 15.0  # seconds between SSE keep-alive comments on /feed/stream
+    
     class Config:
         env_file = ".env"
+        extra = "ignore"  # .env also carries server-only keys such as HOST/PORT
 
 settings = Settings()
\ No newline at end of file
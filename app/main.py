@@ -1,17 +1,47 @@
-from fastapi import FastAPI, Request, Depends, HTTPException, status, Form, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import (
+    FastAPI, Request, Depends, HTTPException, status, Form, UploadFile, File, Query, BackgroundTasks,
+    WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from typing import Optional, List
+import asyncio
+import contextlib
+import hashlib
+import json
 import os
+import time
 
-from core.database import get_db, init_db
-from core.security import create_access_token, verify_token, get_password_hash, verify_password
-from models.schemas import UserCreate, PostCreate, User, Post
-from services.business import UserService, PostService, ConnectionService
-from core.config import settings
+from core.assets import PrecompressedStaticFiles, asset_url
+from core.database import SessionLocal, init_db
+from core.utils import UnsupportedImage, UploadTooLarge, avatar_url, format_time_ago, save_upload_file
+from core.executor import OverloadedError, executor_stats, shutdown_executors
+from core.instrumentation import GaugeCallback, QueryCounter, TimedTemplate, record_request, registry
+from core.templating import (
+    configure_environment, render_fragment, stream_template, template_fingerprint, warm_templates
+)
+from core.write_queue import write_queue
+from core.security import (
+    create_access_token, verify_password_async, get_password_hash_async,
+    auth_cache, profile_claims
+)
+from models.schemas import (
+    UserCreate, PostBase, PostCreate, PostCreated, User, Post, FeedResponse, ConnectionsResponse, SearchResponse,
+    MessageCreate, MessagesResponse, ConnectionsBulk, ConnectionsBulkResult, Job, JobCreate, JobSearchResponse,
+    TypeaheadResponse
+)
+from services.providers import Services, get_services, open_services
+from services.pubsub import SlowConsumer, author_channel, hub, init_pubsub, shutdown_pubsub, user_channel
+from services.graph import init_graph
+from services.jobs import init_jobs
+from services.media import process_profile_picture
+from services.search import init_search
+from services.typeahead import init_typeahead
+from app.config import settings
+from app.api import v1
+from app.api.deps import get_current_user, paginate, resolve_user
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -21,73 +51,111 @@ app = FastAPI(
 )
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+# Versioned JSON API
+app.include_router(v1.router)
 
 # Templates
 templates = Jinja2Templates(directory="templates")
+templates.env.template_class = TimedTemplate
+templates.env.globals["avatar_url"] = avatar_url
+templates.env.globals["asset_url"] = asset_url
+templates.env.filters["time_ago"] = format_time_ago
+configure_environment(templates.env)
+TEMPLATES_VERSION = template_fingerprint(templates.env)
 
-# Security
-security = HTTPBearer(auto_error=False)
+ALLOWED_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    init_search()
+    with SessionLocal() as db:
+        init_graph(db)
+        init_jobs(db)
+        init_typeahead(db)
+    warm_templates(templates.env)
+    await init_pubsub()
 
-# Dependency to get current user
-async def get_current_user(
-    request: Request,
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
-    """Get current user from token or session"""
-    token = None
-    
-    # Try to get token from Authorization header
-    if credentials:
-        token = credentials.credentials
-    
-    # Try to get token from session cookie
-    if not token:
-        token = request.session.get("access_token")
-    
-    if not token:
-        return None
-    
-    try:
-        payload = verify_token(token)
-        user_id = payload.get("sub")
-        if user_id:
-            user_service = UserService(db)
-            return user_service.get_user_by_id(int(user_id))
-    except:
-        return None
-    
-    return None
+@app.on_event("shutdown")
+async def shutdown_event():
+    await shutdown_pubsub()
+    await write_queue.stop()
+    shutdown_executors()
+
+# Shed load instead of queueing without bound when an executor is saturated
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request: Request, exc: OverloadedError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+# Create a session token for a user, with profile claims when enabled
+def issue_session_token(user) -> str:
+    data = {"sub": str(user.id)}
+    if settings.AUTH_PROFILE_CLAIMS:
+        data["profile"] = profile_claims(user)
+    return create_access_token(data=data)
+
+# Strong validator of a rendered profile page: the profile version plus everything
+# else the page depends on (viewer, page cursor, app version, templates and assets)
+def profile_etag(user_id: int, version: int, viewer: Optional[User], cursor: Optional[str]) -> str:
+    viewer_key = f"{viewer.id}:{viewer.updated_at.isoformat()}" if viewer else "-"
+    raw = f"{app.version}:{TEMPLATES_VERSION}|{user_id}:{version}|{viewer_key}|{cursor or ''}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+def profile_cache_headers(etag: str) -> dict:
+    # private: pages differ per viewer; no-cache: always revalidate with If-None-Match
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Cookie, Authorization"}
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "linkedin-clone"}
+    return {"status": "healthy", "service": "linkedin-clone", "executors": executor_stats()}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# Render a large page, streamed as it renders when TEMPLATE_STREAMING is on
+def render_page(name: str, context: dict, headers: Optional[dict] = None):
+    if settings.TEMPLATE_STREAMING:
+        return stream_template(templates.env, name, context, headers=headers)
+    return templates.TemplateResponse(name, context, headers=headers)
 
 # Home page
 @app.get("/", response_class=HTMLResponse)
 async def home(
     request: Request,
+    cursor: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
     if current_user:
-        # Get recent posts for feed
-        post_service = PostService(db)
-        posts = post_service.get_recent_posts(limit=20)
+        # Get the user's connection-scoped timeline
+        post_service = services.posts
+        posts, next_cursor = await paginate(post_service.get_feed, current_user.id, limit=20, cursor=cursor)
         
-        return templates.TemplateResponse(
+        return render_page(
             "feed.html",
             {
                 "request": request,
                 "current_user": current_user,
                 "posts": posts,
+                "cursor": cursor,
+                "next_cursor": next_cursor,
                 "page_title": "Feed"
             }
         )
@@ -111,10 +179,13 @@ async def login(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
-    user_service = UserService(db)
-    user = user_service.authenticate_user(email, password)
+    # Look the user up, then run bcrypt on the password pool
+    user_service = services.users
+    user = await user_service.get_user_by_email(email)
+    if user and not (user.is_active and await verify_password_async(password, user.hashed_password)):
+        user = None
     
     if not user:
         return templates.TemplateResponse(
@@ -127,7 +198,7 @@ async def login(
         )
     
     # Create access token
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = issue_session_token(user)
     
     # Store token in session
     request.session["access_token"] = access_token
@@ -151,12 +222,12 @@ async def register(
     email: str = Form(...),
     password: str = Form(...),
     headline: str = Form(""),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
-    user_service = UserService(db)
+    user_service = services.users
     
     # Check if user already exists
-    if user_service.get_user_by_email(email):
+    if await user_service.get_user_by_email(email):
         return templates.TemplateResponse(
             "auth/register.html",
             {
@@ -176,15 +247,18 @@ async def register(
     )
     
     try:
-        user = user_service.create_user(user_data)
+        hashed_password = await get_password_hash_async(password)
+        user = await user_service.create_user(user_data, hashed_password=hashed_password)
         
         # Create access token
-        access_token = create_access_token(data={"sub": str(user.id)})
+        access_token = issue_session_token(user)
         
         # Store token in session
         request.session["access_token"] = access_token
         
         return RedirectResponse(url="/", status_code=302)
+    except OverloadedError:
+        raise
     except Exception as e:
         return templates.TemplateResponse(
             "auth/register.html",
@@ -198,6 +272,9 @@ async def register(
 # Logout endpoint
 @app.post("/logout")
 async def logout(request: Request):
+    token = request.session.get("access_token")
+    if token:
+        auth_cache.discard(token)
     request.session.clear()
     return RedirectResponse(url="/", status_code=302)
 
@@ -206,38 +283,42 @@ async def logout(request: Request):
 async def profile(
     request: Request,
     user_id: int,
+    cursor: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
-    user_service = UserService(db)
-    post_service = PostService(db)
-    connection_service = ConnectionService(db)
+    user_service = services.users
     
-    profile_user = user_service.get_user_by_id(user_id)
-    if not profile_user:
+    # Revalidation only needs the version: answer 304 before loading or rendering anything
+    version = await user_service.get_profile_version(user_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get user's posts
-    user_posts = post_service.get_posts_by_user(user_id)
+    etag = profile_etag(user_id, version, current_user, cursor)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=profile_cache_headers(etag))
     
-    # Check connection status
-    is_connected = False
-    connection_pending = False
-    if current_user and current_user.id != user_id:
-        is_connected = connection_service.are_connected(current_user.id, user_id)
-        connection_pending = connection_service.is_connection_pending(current_user.id, user_id)
+    # User, posts page and relationship state in one round trip
+    viewer_id = current_user.id if current_user else None
+    profile_view = await paginate(user_service.get_profile, user_id, viewer_id=viewer_id, cursor=cursor)
+    if not profile_view:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    return templates.TemplateResponse(
+    etag = profile_etag(user_id, profile_view.profile_version, current_user, cursor)
+    return render_page(
         "profile/profile.html",
         {
             "request": request,
             "current_user": current_user,
-            "profile_user": profile_user,
-            "posts": user_posts,
-            "is_connected": is_connected,
-            "connection_pending": connection_pending,
-            "page_title": f"{profile_user.first_name} {profile_user.last_name}"
-        }
+            "profile_user": profile_view.user,
+            "profile": profile_view,
+            "posts": profile_view.posts,
+            "next_cursor": profile_view.next_cursor,
+            "is_connected": profile_view.is_connected,
+            "connection_pending": profile_view.connection_pending,
+            "page_title": f"{profile_view.user.first_name} {profile_view.user.last_name}"
+        },
+        headers=profile_cache_headers(etag)
     )
 
 # My profile page
@@ -245,11 +326,42 @@ async def profile(
 async def my_profile(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    return RedirectResponse(url=f"/profile/{current_user.id}", status_code=302)
+
+# Profile picture upload
+@app.post("/profile/picture")
+async def upload_profile_picture(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    picture: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
 ):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
+    if picture.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported image type")
+    
+    # The multipart body is spooled before we get here; the streaming copy still refuses to keep
+    # anything over MAX_FILE_SIZE and the declared length rejects most oversized uploads up front
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_FILE_SIZE + 64 * 1024:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    
+    try:
+        image_path, _ = await run_in_threadpool(save_upload_file, picture)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc))
+    except UnsupportedImage as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    
+    # Derivatives are generated in the image process pool after the response is sent
+    background_tasks.add_task(process_profile_picture, current_user.id, image_path)
     return RedirectResponse(url=f"/profile/{current_user.id}", status_code=302)
 
 # Create post endpoint
@@ -258,39 +370,125 @@ async def create_post(
     request: Request,
     content: str = Form(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    post_service = PostService(db)
+    post_service = services.posts
     post_data = PostCreate(content=content, user_id=current_user.id)
     
     try:
-        post_service.create_post(post_data)
-        return RedirectResponse(url="/", status_code=302)
+        post = await post_service.create_post(post_data)
+    except OverloadedError:
+        raise
     except Exception as e:
         # Handle error - for now just redirect back
         return RedirectResponse(url="/", status_code=302)
+    
+    await publish_post(post)
+    return RedirectResponse(url="/", status_code=302)
+
+# Create post JSON endpoint: returns the rendered card so the page can insert it without a reload
+@app.post("/api/posts", response_model=PostCreated, status_code=status.HTTP_201_CREATED)
+async def create_post_api(
+    post_data: PostBase,
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    content = post_data.content.strip()
+    if not content:
+        raise HTTPException(status_code=422, detail="Post content is required")
+    
+    post = Post.model_validate(
+        await services.posts.create_post(PostCreate(content=content, user_id=current_user.id))
+    )
+    html = await publish_post(post)
+    return PostCreated(post=post, html=html)
+
+# Render a new post's card and push it to the feed streams of the author's connections
+async def publish_post(post) -> str:
+    html = render_fragment(templates.env, "partials/post_card.html", post=post, author=post.author)
+    await hub.publish(author_channel(post.user_id), {"id": post.id, "author_id": post.user_id, "html": str(html)})
+    return html
+
+# Live feed: Server-Sent Events with the card of every new post by the user or their connections.
+# EventSource reconnects on its own and sends Last-Event-ID, which replays what was missed.
+@app.get("/feed/stream")
+async def feed_stream(
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    # Everything from the database is read here: the session is gone once streaming starts
+    author_ids = [current_user.id] + await services.connections.get_connection_ids(current_user.id)
+    missed = []
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        posts, _ = await services.posts.get_feed(current_user.id, limit=20)
+        missed = [
+            {"id": post.id, "author_id": post.user_id, "html": str(
+                render_fragment(templates.env, "partials/post_card.html", post=post, author=post.author)
+            )}
+            for post in reversed(posts) if post.id > int(last_event_id)
+        ]
+    
+    def sse(event: dict) -> str:
+        return f"event: post\nid: {event['id']}\ndata: {json.dumps(event)}\n\n"
+    
+    async def events():
+        subscription = hub.subscribe(*(author_channel(author_id) for author_id in author_ids))
+        try:
+            yield "retry: 3000\n\n"
+            for event in missed:
+                yield sse(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.FEED_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse(event)
+        except SlowConsumer:
+            # Too far behind: end the stream; the browser reconnects and replays from Last-Event-ID
+            return
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Network page
 @app.get("/network", response_class=HTMLResponse)
 async def network(
     request: Request,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    user_service = UserService(db)
-    connection_service = ConnectionService(db)
+    user_service = services.users
+    connection_service = services.connections
+    
+    # Get suggested connections, ranked by mutual connections. First: refreshing stale
+    # suggestions commits, which would expire the connections loaded before it
+    suggested = await user_service.get_suggestions(current_user.id, limit=10)
     
     # Get connections
-    connections = connection_service.get_connections(current_user.id)
+    connections, next_cursor = await paginate(connection_service.get_connections, current_user.id, cursor=cursor)
     
-    # Get suggested connections (users not connected)
-    suggested = user_service.get_suggested_connections(current_user.id, limit=10)
+    # Header counts come from the maintained counters, not the listed pages
+    counters = await user_service.get_counters(current_user.id)
     
     return templates.TemplateResponse(
         "network/network.html",
@@ -298,25 +496,68 @@ async def network(
             "request": request,
             "current_user": current_user,
             "connections": connections,
+            "next_cursor": next_cursor,
             "suggested": suggested,
+            "counters": counters,
             "page_title": "My Network"
         }
     )
 
+# Feed JSON endpoint
+@app.get("/api/feed", response_model=FeedResponse)
+async def feed_api(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    posts, next_cursor = await paginate(services.posts.get_feed, current_user.id, limit=limit, cursor=cursor)
+    return FeedResponse(posts=posts, has_more=next_cursor is not None, next_cursor=next_cursor)
+
+# User posts JSON endpoint
+@app.get("/api/users/{user_id}/posts", response_model=FeedResponse)
+async def user_posts_api(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    services: Services = Depends(get_services)
+):
+    posts, next_cursor = await paginate(services.posts.get_posts_by_user, user_id, limit=limit, cursor=cursor)
+    return FeedResponse(posts=posts, has_more=next_cursor is not None, next_cursor=next_cursor)
+
+# Connections JSON endpoint
+@app.get("/api/connections", response_model=ConnectionsResponse)
+async def connections_api(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    users, next_cursor = await paginate(
+        services.connections.get_connections, current_user.id, limit=limit, cursor=cursor
+    )
+    return ConnectionsResponse(users=users, has_more=next_cursor is not None, next_cursor=next_cursor)
+
 # Send connection request
 @app.post("/connections/send/{user_id}")
 async def send_connection_request(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    connection_service = ConnectionService(db)
+    connection_service = services.connections
     
     try:
-        connection_service.send_connection_request(current_user.id, user_id)
+        await connection_service.send_connection_request(current_user.id, user_id)
     except Exception as e:
         pass  # Handle error silently for now
     
@@ -327,65 +568,324 @@ async def send_connection_request(
 async def accept_connection_request(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
-    connection_service = ConnectionService(db)
+    connection_service = services.connections
     
     try:
-        connection_service.accept_connection_request(user_id, current_user.id)
+        await connection_service.accept_connection_request(user_id, current_user.id)
     except Exception as e:
         pass  # Handle error silently for now
     
     return RedirectResponse(url="/network", status_code=302)
 
-# Jobs page
+# Accept every pending connection request
+@app.post("/connections/accept-all")
+async def accept_all_connection_requests(
+    current_user: User = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    await services.connections.accept_connection_requests(current_user.id)
+    return RedirectResponse(url="/network", status_code=302)
+
+# Bulk connection requests: send to many users, or accept many (or all) pending requests, in one transaction
+@app.post("/api/connections/bulk", response_model=ConnectionsBulkResult)
+async def connections_bulk_api(
+    bulk: ConnectionsBulk,
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    if bulk.action == "send":
+        if not bulk.user_ids:
+            raise HTTPException(status_code=422, detail="user_ids is required to send requests")
+        user_ids = await services.connections.send_connection_requests(current_user.id, bulk.user_ids)
+    else:
+        user_ids = await services.connections.accept_connection_requests(current_user.id, bulk.user_ids)
+    return ConnectionsBulkResult(user_ids=user_ids)
+
+# Jobs page: keyword search with location, seniority and remote facets
 @app.get("/jobs", response_class=HTMLResponse)
 async def jobs(
     request: Request,
-    current_user: Optional[User] = Depends(get_current_user)
+    q: str = "",
+    location: str = "",
+    seniority: str = "",
+    remote: str = "",
+    page: int = Query(1, ge=1),
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
 ):
+    page_size = settings.JOB_PAGE_SIZE
+    results = await services.jobs.search_jobs(
+        q, {"location": location, "seniority": seniority, "remote": remote},
+        limit=page_size, offset=(page - 1) * page_size
+    )
+    
     return templates.TemplateResponse(
         "jobs/jobs.html",
         {
             "request": request,
             "current_user": current_user,
+            "query": q,
+            "location": location,
+            "results": results,
+            "page": page,
+            "has_more": page * page_size < results.total,
             "page_title": "Jobs"
         }
     )
 
+# Post a job from the jobs page form
+@app.post("/jobs/create")
+async def create_job(
+    title: str = Form(...),
+    company: str = Form(...),
+    location: str = Form(...),
+    seniority: str = Form(...),
+    skills: str = Form(""),
+    remote: bool = Form(False),
+    description: str = Form(""),
+    current_user: User = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    try:
+        job_data = JobCreate(
+            title=title, company=company, location=location, seniority=seniority,
+            skills=skills.split(","), remote=remote, description=description
+        )
+    except ValidationError:
+        return RedirectResponse(url="/jobs", status_code=302)
+    
+    await services.jobs.create_job(current_user.id, job_data)
+    return RedirectResponse(url="/jobs", status_code=302)
+
+# Close one of your postings before it expires
+@app.post("/jobs/{job_id}/close")
+async def close_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    await services.jobs.close_job(job_id, current_user.id)
+    return RedirectResponse(url="/jobs", status_code=302)
+
+# Job search JSON endpoint
+@app.get("/api/jobs/search", response_model=JobSearchResponse)
+async def job_search_api(
+    q: str = "",
+    location: str = "",
+    seniority: str = "",
+    remote: str = "",
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    services: Services = Depends(get_services)
+):
+    return await services.jobs.search_jobs(
+        q, {"location": location, "seniority": seniority, "remote": remote},
+        limit=limit, offset=(page - 1) * limit
+    )
+
+# Create job JSON endpoint
+@app.post("/api/jobs", response_model=Job, status_code=status.HTTP_201_CREATED)
+async def create_job_api(
+    job_data: JobCreate,
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    return await services.jobs.create_job(current_user.id, job_data)
+
+# Close job JSON endpoint
+@app.post("/api/jobs/{job_id}/close", response_model=Job)
+async def close_job_api(
+    job_id: int,
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    job = await services.jobs.close_job(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No open posting of yours with this id")
+    return job
+
 # Messaging page
 @app.get("/messaging", response_class=HTMLResponse)
 async def messaging(
     request: Request,
-    current_user: User = Depends(get_current_user)
+    c: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    services: Services = Depends(get_services)
 ):
     if not current_user:
         return RedirectResponse(url="/login", status_code=302)
     
+    message_service = services.messages
+    conversations = await message_service.list_conversations(current_user.id)
+    
+    # Open the requested conversation, else the most recent one
+    active = next((conversation for conversation in conversations if conversation.id == c), None)
+    if active is None and conversations and c is None:
+        active = conversations[0]
+    history = None
+    if active is not None:
+        history = await message_service.get_messages(active.id, current_user.id, limit=settings.MESSAGE_PAGE_SIZE)
+    
     return templates.TemplateResponse(
         "messaging/messaging.html",
         {
             "request": request,
             "current_user": current_user,
+            "conversations": conversations,
+            "active": active,
+            "history": history,
+            "max_message_length": settings.MESSAGE_MAX_LENGTH,
             "page_title": "Messaging"
         }
     )
 
+# Open (or create) the conversation with a connection
+@app.post("/messaging/start/{user_id}")
+async def start_conversation(
+    user_id: int,
+    current_user: User = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=302)
+    
+    try:
+        conversation = await services.messages.get_or_create_conversation(current_user.id, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    
+    return RedirectResponse(url=f"/messaging?c={conversation.id}", status_code=302)
+
+# Conversation history: older pages by cursor, or catch-up after a message id
+@app.get("/api/conversations/{conversation_id}/messages", response_model=MessagesResponse)
+async def conversation_messages(
+    conversation_id: int,
+    cursor: Optional[str] = None,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: int = Query(settings.MESSAGE_PAGE_SIZE, ge=1, le=100),
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    history = await paginate(
+        services.messages.get_messages, conversation_id, current_user.id, limit=limit, cursor=cursor, after_id=after_id
+    )
+    if history is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return history
+
+# Real-time messaging socket.
+#
+# Client frames: {"type": "send", "conversation_id", "content", "client_id"}.
+# Server frames: {"type": "message", "message", "client_id"} for every message
+# in the user's conversations (including their own, from any tab), and
+# {"type": "error", "detail", "client_id"}. A client that cannot keep up is
+# closed with 1013 and should reconnect and catch up with ?after_id=.
+@app.websocket("/ws/messages")
+async def messages_socket(websocket: WebSocket):
+    token = websocket.session.get("access_token")
+    current_user = None
+    if token:
+        async with open_services(read_only=True) as services:
+            current_user = await resolve_user(token, services)
+    if not current_user:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+    
+    async def send(frame: dict) -> None:
+        # Frames from the receiver and the event forwarder must not interleave
+        async with send_lock:
+            await asyncio.wait_for(websocket.send_json(frame), settings.WS_SEND_TIMEOUT)
+    
+    async def receive_frames() -> None:
+        while True:
+            try:
+                frame = json.loads(await websocket.receive_text())
+                message_data = MessageCreate(
+                    conversation_id=frame.get("conversation_id"), content=(frame.get("content") or "").strip()
+                )
+            except (ValueError, AttributeError, ValidationError):
+                await send({"type": "error", "detail": "Invalid message"})
+                continue
+            
+            client_id = frame.get("client_id")
+            try:
+                async with open_services() as services:
+                    message, participant_ids = await services.messages.send_message(current_user.id, message_data)
+            except (ValueError, OverloadedError) as e:
+                await send({"type": "error", "detail": str(e), "client_id": client_id})
+                continue
+            
+            event = {"type": "message", "message": message.model_dump(mode="json"), "client_id": client_id}
+            for participant_id in participant_ids:
+                await hub.publish(user_channel(participant_id), event)
+    
+    async def forward_events(subscription) -> None:
+        try:
+            while True:
+                await send(await subscription.get())
+        except (SlowConsumer, asyncio.TimeoutError):
+            # Too far behind: drop the client rather than buffer for it
+            with contextlib.suppress(Exception):
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    
+    with hub.subscribe(user_channel(current_user.id)) as subscription:
+        tasks = [asyncio.create_task(receive_frames()), asyncio.create_task(forward_events(subscription))]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is not None and not isinstance(error, (WebSocketDisconnect, asyncio.TimeoutError)):
+                    raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
 # Search endpoint
 @app.get("/search", response_class=HTMLResponse)
 async def search(
     request: Request,
     q: str = "",
+    page: int = Query(1, ge=1),
     current_user: Optional[User] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    services: Services = Depends(get_services)
 ):
     results = []
+    total = 0
+    page_size = settings.SEARCH_PAGE_SIZE
     if q:
-        user_service = UserService(db)
-        results = user_service.search_users(q)
+        user_service = services.users
+        results, total = await user_service.search_users(
+            q, limit=page_size, offset=(page - 1) * page_size
+        )
     
     return templates.TemplateResponse(
         "search/results.html",
@@ -394,10 +894,87 @@ async def search(
             "current_user": current_user,
             "query": q,
             "results": results,
+            "total": total,
+            "page": page,
+            "has_more": page * page_size < total,
             "page_title": f"Search: {q}" if q else "Search"
         }
     )
 
+# Search JSON endpoint
+@app.get("/api/search", response_model=SearchResponse)
+async def search_api(
+    q: str = "",
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    services: Services = Depends(get_services)
+):
+    if not q:
+        return SearchResponse(users=[], total=0)
+    
+    users, total = await services.users.search_users(q, limit=limit, offset=(page - 1) * limit)
+    return SearchResponse(users=users, total=total)
+
+# Search-as-you-type suggestions for the navbar search box
+@app.get("/api/typeahead", response_model=TypeaheadResponse)
+async def typeahead_api(
+    q: str = "",
+    limit: int = Query(settings.TYPEAHEAD_LIMIT, ge=1, le=20),
+    current_user: Optional[User] = Depends(get_current_user),
+    services: Services = Depends(get_services)
+):
+    viewer_id = current_user.id if current_user else None
+    users = await services.users.typeahead(q, viewer_id=viewer_id, limit=limit) if q.strip() else []
+    return TypeaheadResponse(query=q, users=users)
+
+# Fail requests that exceed the per-request SQL budget (used by tests to catch N+1 queries)
+if settings.QUERY_BUDGET > 0:
+    from core.instrumentation import query_budget
+
+    @app.middleware("http")
+    async def enforce_query_budget(request: Request, call_next):
+        with query_budget(settings.QUERY_BUDGET):
+            return await call_next(request)
+
+# Per-route latency, SQL count and slow-request log
+if settings.METRICS_ENABLED:
+    for field in ("active", "queued", "completed", "rejected"):
+        registry.register(GaugeCallback(
+            f"executor_{field}", f"Executor {field} jobs", ("executor",),
+            lambda field=field: {(name,): stats[field] for name, stats in executor_stats().items()}
+        ))
+    
+    for field in ("subscriptions", "delivered", "dropped"):
+        registry.register(GaugeCallback(
+            f"pubsub_{field}", f"Pub/sub hub {field}", (),
+            lambda field=field: {(): hub.stats()[field]}
+        ))
+    
+    registry.register(GaugeCallback(
+        "write_queue_queued", "Writes waiting for the next group commit", (),
+        lambda: {(): write_queue.stats()["queued"]}
+    ))
+    
+    @app.middleware("http")
+    async def record_metrics(request: Request, call_next):
+        started = time.perf_counter()
+        status_code = 500
+        with QueryCounter() as counter:
+            try:
+                response = await call_next(request)
+                status_code = response.status_code
+                return response
+            finally:
+                route = request.scope.get("route")
+                record_request(
+                    request.method,
+                    route.path if route is not None else "unmatched",
+                    status_code,
+                    time.perf_counter() - started,
+                    counter,
+                    settings.SLOW_REQUEST_MS / 1000
+                )
+
 # Add session middleware
 from starlette.middleware.sessions import SessionMiddleware
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
@@ -0,0 +1 @@
+# Performance benchmarks package
\ No newline at end of file
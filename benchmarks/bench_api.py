@@ -0,0 +1,121 @@
+"""Benchmark the /api/v1 read models against response models validated from ORM objects.
+
+Usage:
+    python -m benchmarks.bench_api --db /tmp/app_bench.db --users 10000
+
+Each scenario builds the same page two ways and times query + build +
+encode: "orm" loads ORM objects, validates them into the response model
+(FeedResponse, UserProfile, ...) with from_attributes and encodes the result
+as a response_model route would; "v1" is services/projections.py encoded by
+core.serialization. The database is generated with benchmarks.datagen on
+first run and reused afterwards.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+def timed(fn: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    """Median wall time of fn() in milliseconds, and the size of its output"""
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(body)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=os.path.join("/tmp", "app_bench.db"))
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--posts-per-user", type=int, default=5)
+    parser.add_argument("--avg-connections", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    # Settings are read at import time: point the app at the benchmark database first
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    from benchmarks.datagen import create_database
+
+    if not os.path.exists(args.db):
+        print(f"Generating {args.db}")
+        create_database(args.db, args.users, args.posts_per_user, args.avg_connections, args.seed)
+
+    from fastapi.responses import JSONResponse
+    from sqlalchemy import func, select
+    from core.database import SessionLocal, User
+    from core.serialization import FastJSONResponse, orjson
+    from models.schemas import ConnectionsResponse, FeedResponse, SearchResponse
+    from services.business import ConnectionService, PostService, UserService
+    from services.graph import init_graph
+    from services.projections import ProjectionService
+    from services.search import init_search
+
+    init_search()
+    with SessionLocal() as db:
+        init_graph(db)
+        # A well-connected member, so feed pages mix many authors
+        hub_id = db.scalar(select(User.id).order_by(User.connections_count.desc()).limit(1))
+        user_count = db.scalar(select(func.count()).select_from(User))
+        rng = random.Random(args.seed)
+        profile_ids = [rng.randint(1, user_count) for _ in range(args.repeat)]
+
+        def orm(build: Callable[[], object]) -> Callable[[], bytes]:
+            def run() -> bytes:
+                db.expunge_all()  # load fresh objects every time, as a new request would
+                return JSONResponse(build().model_dump(mode="json")).body
+            return run
+
+        def v1(build: Callable[[], dict]) -> Callable[[], bytes]:
+            def run() -> bytes:
+                db.expunge_all()
+                return FastJSONResponse(build()).body
+            return run
+
+        def feed(limit: int):
+            posts, next_cursor = PostService(db).get_feed(hub_id, limit=limit)
+            return FeedResponse.model_validate(
+                {"posts": posts, "has_more": next_cursor is not None, "next_cursor": next_cursor}, from_attributes=True
+            )
+
+        def network(limit: int):
+            users, next_cursor = ConnectionService(db).get_connections(hub_id, limit=limit)
+            return ConnectionsResponse.model_validate(
+                {"users": users, "has_more": next_cursor is not None, "next_cursor": next_cursor}, from_attributes=True
+            )
+
+        def search(query: str):
+            users, total = UserService(db).search_users(query, limit=20)
+            return SearchResponse.model_validate({"users": users, "total": total}, from_attributes=True)
+
+        profiles = iter(profile_ids * 4)
+        projections = ProjectionService(db)
+        scenarios: List[Tuple[str, Callable[[], bytes], Callable[[], bytes]]] = [
+            ("feed (20 posts)", orm(lambda: feed(20)), v1(lambda: projections.get_feed(hub_id, limit=20))),
+            ("feed (100 posts)", orm(lambda: feed(100)), v1(lambda: projections.get_feed(hub_id, limit=100))),
+            (
+                "profile (20 posts)",
+                # get_profile already returns a validated UserProfile
+                orm(lambda: UserService(db).get_profile(next(profiles), viewer_id=hub_id)),
+                v1(lambda: projections.get_profile(next(profiles), viewer_id=hub_id)),
+            ),
+            ("network (50 users)", orm(lambda: network(50)), v1(lambda: projections.get_network(hub_id, limit=50))),
+            ("search (20 users)", orm(lambda: search("smith")), v1(lambda: projections.search_users("smith", limit=20))),
+        ]
+
+        print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+        print(f"{'scenario':<22}{'orm':>10}{'v1':>10}{'speedup':>9}{'orm bytes':>11}{'v1 bytes':>10}")
+        for name, orm_run, v1_run in scenarios:
+            orm_ms, orm_bytes = timed(orm_run, args.repeat)
+            v1_ms, v1_bytes = timed(v1_run, args.repeat)
+            print(
+                f"{name:<22}{orm_ms:>8.2f}ms{v1_ms:>8.2f}ms{orm_ms / v1_ms:>8.1f}x"
+                f"{orm_bytes:>11}{v1_bytes:>10}"
+            )
+
+if __name__ == "__main__":
+    main()
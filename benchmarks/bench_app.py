@@ -0,0 +1,194 @@
+"""Benchmark page latency, throughput and queries per request through an in-process ASGI client.
+
+Usage:
+    python -m benchmarks.bench_app --db /tmp/app_bench.db --users 10000 --requests 500 --concurrency 8
+    python -m benchmarks.bench_app --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_app --compare benchmarks/baseline.json --tolerance 0.25
+
+The database is generated with benchmarks.datagen on first run and reused
+afterwards; delete it (or pass a new --db) after changing the data options.
+With --compare the run exits non-zero when a scenario's p95 latency grew by
+more than the tolerance or it runs more SQL statements than the baseline.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+SEARCH_TERMS = ["smith", "data scientist", "engineer", "patel", "wonka", "jen"]
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class Scenario:
+    """One scripted request; `request` is awaited with a logged-in client, a RNG and the options"""
+
+    def __init__(
+        self, name: str, request: Callable[[Any, random.Random, argparse.Namespace], Awaitable[Any]], expect: int = 200
+    ):
+        self.name = name
+        self.request = request
+        self.expect = expect
+
+SCENARIOS = [
+    Scenario("feed", lambda client, rng, args: client.get("/")),
+    Scenario("profile", lambda client, rng, args: client.get(f"/profile/{rng.randint(1, args.users)}")),
+    Scenario("network", lambda client, rng, args: client.get("/network")),
+    Scenario("search", lambda client, rng, args: client.get("/search", params={"q": rng.choice(SEARCH_TERMS)})),
+    Scenario("login", lambda client, rng, args: client.post(
+        "/login",
+        data={"email": f"user{rng.randrange(args.users)}@example.com", "password": args.password},
+        follow_redirects=False
+    ), expect=302),
+]
+
+async def run_scenario(app, scenario: Scenario, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario with `concurrency` logged-in clients and summarize it"""
+    import httpx
+    from core.instrumentation import QueryCounter
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+
+    async def worker(index: int, count: int, record: bool) -> None:
+        nonlocal errors
+        rng = random.Random(args.seed * 1000 + index)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Each worker is a different member with their own session cookie
+            await client.post(
+                "/login",
+                data={"email": f"user{index % args.users}@example.com", "password": args.password},
+                follow_redirects=False
+            )
+            for _ in range(count):
+                with QueryCounter() as counter:
+                    started = time.perf_counter()
+                    response = await scenario.request(client, rng, args)
+                    elapsed = (time.perf_counter() - started) * 1000
+                if not record:
+                    continue
+                latencies.append(elapsed)
+                queries.append(counter.count)
+                if response.status_code != scenario.expect:
+                    errors += 1
+
+    per_worker = max(1, args.requests // args.concurrency)
+    await asyncio.gather(*(worker(i, max(1, args.warmup // args.concurrency), False) for i in range(args.concurrency)))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i, per_worker, True) for i in range(args.concurrency)))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+    }
+
+async def run_all(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    from app.main import app
+
+    selected = [scenario for scenario in SCENARIOS if not args.scenarios or scenario.name in args.scenarios]
+    await app.router.startup()
+    try:
+        return {scenario.name: await run_scenario(app, scenario, args) for scenario in selected}
+    finally:
+        await app.router.shutdown()
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Regressions of results against a baseline, as printable lines"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["queries_per_request"] > base["queries_per_request"]:
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']} -> {result['queries_per_request']}"
+            )
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    return regressions
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'scenario':<10}{'reqs':>7}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>9}{'queries':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<10}{result['requests']:>7}{result['errors']:>8}"
+            f"{result['p50_ms']:>8.1f}ms{result['p95_ms']:>8.1f}ms{result['p99_ms']:>8.1f}ms"
+            f"{result['throughput_rps']:>9.1f}{result['queries_per_request']:>9.1f}"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=os.path.join("/tmp", "app_bench.db"))
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--posts-per-user", type=int, default=5)
+    parser.add_argument("--avg-connections", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scenarios", nargs="*", choices=[scenario.name for scenario in SCENARIOS])
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 growth")
+    args = parser.parse_args()
+
+    # Settings are read at import time: point the app at the benchmark database first
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    from benchmarks.datagen import BENCH_PASSWORD, create_database
+    args.password = BENCH_PASSWORD
+
+    if not os.path.exists(args.db):
+        print(f"Generating {args.db}")
+        create_database(args.db, args.users, args.posts_per_user, args.avg_connections, args.seed)
+
+    results = asyncio.run(run_all(args))
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "users": args.users,
+                    "concurrency": args.concurrency,
+                    "requests": args.requests,
+                },
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["scenarios"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
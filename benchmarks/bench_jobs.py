@@ -0,0 +1,148 @@
+"""Benchmark job search: LIKE + GROUP BY facets in SQL vs the in-memory faceted index.
+
+Usage:
+    python -m benchmarks.bench_jobs --jobs 500000 --db /tmp/jobs_bench.db
+
+The database is created (or topped up) with synthetic postings on first run
+and reused afterwards. Besides query latency, the run reports index build
+time and the cost of incremental updates (a posting created, one expired).
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import create_engine, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from benchmarks.datagen import CITIES, COMPANIES, TITLES
+from core.database import Base, Job, User
+from services.jobs import JobIndex
+
+SKILLS = [
+    "python", "sql", "java", "go", "rust", "kubernetes", "aws", "react", "typescript", "spark",
+    "figma", "excel", "salesforce", "negotiation", "leadership", "terraform", "pytorch", "kafka",
+]
+SENIORITY = ["entry", "mid", "senior", "executive"]
+
+# (keywords, facet filters)
+QUERIES = [
+    ("", {}),
+    ("engineer", {}),
+    ("engineer", {"location": "Berlin", "remote": "remote"}),
+    ("senior python", {}),
+    ("data scientist pytorch", {"seniority": "senior"}),
+    ("wonka rust", {}),
+    ("zzz", {}),
+]
+
+def posting(rng: random.Random, i: int, now: datetime) -> dict:
+    title = rng.choice(TITLES)
+    if rng.random() < 0.3:
+        title = f"{rng.choice(['Senior', 'Lead', 'Junior', 'Staff'])} {title}"
+    return {
+        "poster_id": 1,
+        "title": title,
+        "company": rng.choice(COMPANIES),
+        "location": rng.choice(CITIES),
+        "skills": ", ".join(rng.sample(SKILLS, rng.randint(2, 5))),
+        "seniority": rng.choice(SENIORITY),
+        "remote": rng.random() < 0.3,
+        "description": "",
+        "created_at": now,
+        "expires_at": now + timedelta(days=30 + i % 60),
+        "updated_at": now,
+    }
+
+def populate(db: Session, count: int, batch_size: int = 50000) -> None:
+    """Insert synthetic postings until the table holds `count` rows"""
+    if db.get(User, 1) is None:
+        db.execute(insert(User).values(
+            id=1, email="recruiter@example.com", hashed_password="x", first_name="R", last_name="R"
+        ))
+    existing = db.scalar(select(func.count()).select_from(Job))
+    rng = random.Random(42 + existing)
+    now = datetime.utcnow()
+    for start in range(existing, count, batch_size):
+        rows = [posting(rng, i, now) for i in range(start, min(start + batch_size, count))]
+        db.execute(insert(Job), rows)
+        db.commit()
+        print(f"  inserted {start + len(rows)}/{count} postings")
+
+def sql_search(db: Session, query: str, filters: dict, limit: int = 20):
+    """What a search over the jobs table needs without an index: a page, a total and three facet GROUP BYs"""
+    conditions = [Job.expires_at > datetime.utcnow()]
+    for token in query.split():
+        pattern = f"%{token}%"
+        conditions.append(or_(
+            Job.title.ilike(pattern), Job.company.ilike(pattern), Job.location.ilike(pattern), Job.skills.ilike(pattern)
+        ))
+    filtered = list(conditions)
+    if "location" in filters:
+        filtered.append(Job.location == filters["location"])
+    if "seniority" in filters:
+        filtered.append(Job.seniority == filters["seniority"])
+    if "remote" in filters:
+        filtered.append(Job.remote == (filters["remote"] == "remote"))
+    page = db.execute(select(Job.id).where(*filtered).order_by(Job.id.desc()).limit(limit)).all()
+    total = db.scalar(select(func.count()).select_from(Job).where(*filtered))
+    facets = [
+        db.execute(select(column, func.count()).where(*conditions).group_by(column)).all()
+        for column in (Job.location, Job.seniority, Job.remote)
+    ]
+    return page, total, facets
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500_000)
+    parser.add_argument("--db", default=os.path.join("/tmp", "jobs_bench.db"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-sql", action="store_true", help="only time the index")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        print(f"Preparing {args.jobs} postings in {args.db}")
+        populate(db, args.jobs)
+
+        index = JobIndex()
+        start = time.perf_counter()
+        indexed = index.load(db)
+        print(f"Index of {indexed} open postings built in {time.perf_counter() - start:.1f}s")
+
+        print()
+        print(f"{'query':<40}{'sql':>10}{'index':>10}{'matches':>10}")
+        for query, filters in QUERIES:
+            label = " ".join([query or "(all)"] + [f"{facet}={value}" for facet, value in filters.items()])
+            sql_ms = timed(lambda: sql_search(db, query, filters), args.repeat) if not args.skip_sql else 0.0
+            index_ms = timed(lambda: index.search(query, filters), args.repeat)
+            total = index.search(query, filters)[1]
+            sql_column = f"{sql_ms:>8.2f}ms" if not args.skip_sql else f"{'-':>10}"
+            print(f"{label:<40}{sql_column}{index_ms:>8.2f}ms{total:>10}")
+
+        # Incremental maintenance: postings arriving and expiring while the index serves queries
+        rng = random.Random(7)
+        now = datetime.utcnow()
+        new_jobs = [
+            SimpleNamespace(id=10 ** 9 + i, **posting(rng, i, now)) for i in range(1000)
+        ]
+        add_ms = timed(lambda: [index.add(job) for job in new_jobs], 1) / len(new_jobs)
+        remove_ms = timed(lambda: [index.remove(job) for job in new_jobs], 1) / len(new_jobs)
+        print()
+        print(f"add one posting: {add_ms * 1000:.0f}us, expire one posting: {remove_ms * 1000:.0f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark user search: leading-wildcard ILIKE vs FTS5 vs the in-memory index, and typeahead.
+
+Usage:
+    python -m benchmarks.bench_search --users 1000000 --db /tmp/search_bench.db
+
+The database is created (or topped up) with synthetic users on first run and
+reused afterwards, so repeated runs only pay for the queries. The typeahead
+table times what the navbar box sends per keystroke: partial words, answered
+by services.typeahead or by ILIKE on the whole table.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, func, insert, or_, select, text
+from sqlalchemy.orm import Session
+
+from benchmarks.datagen import COMPANIES, FIRST_NAMES, LAST_NAMES, TITLES
+from core.database import Base, User
+from services.search import Fts5SearchBackend, InvertedIndexSearchBackend
+from services.typeahead import TypeaheadIndex
+
+QUERIES = ["smith", "jen", "data scientist", "engineer", "patel product", "wonka", "zzz"]
+TYPEAHEAD_QUERIES = ["j", "jen", "smi", "data sc", "eng", "patel pro", "zzz"]
+
+def populate(db: Session, count: int, batch_size: int = 50000) -> None:
+    """Insert synthetic users until the table holds `count` rows"""
+    existing = db.scalar(select(func.count()).select_from(User))
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    for start in range(existing, count, batch_size):
+        rows = [
+            {
+                "email": f"user{i}@example.com",
+                "hashed_password": "x",
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "headline": f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(start, min(start + batch_size, count))
+        ]
+        db.execute(insert(User), rows)
+        db.commit()
+        print(f"  inserted {start + len(rows)}/{count} users")
+
+def ilike_search(db: Session, query: str, limit: int = 20):
+    """The original UserService.search_users implementation"""
+    return db.query(User.id).filter(
+        or_(
+            User.first_name.ilike(f"%{query}%"),
+            User.last_name.ilike(f"%{query}%"),
+            User.headline.ilike(f"%{query}%")
+        )
+    ).limit(limit).all()
+
+def ilike_total(db: Session, query: str) -> int:
+    """Counting matches, which the ILIKE path would need to fill SearchResponse.total"""
+    return db.query(func.count(User.id)).filter(
+        or_(
+            User.first_name.ilike(f"%{query}%"),
+            User.last_name.ilike(f"%{query}%"),
+            User.headline.ilike(f"%{query}%")
+        )
+    ).scalar()
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.path.join("/tmp", "search_bench.db"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        Fts5SearchBackend.create_schema(conn)
+
+    with Session(engine) as db:
+        print(f"Preparing {args.users} users in {args.db}")
+        populate(db, args.users)
+
+        fts = Fts5SearchBackend()
+        indexed = db.execute(text("SELECT count(*) FROM users_fts")).scalar()
+        if indexed != db.scalar(select(func.count()).select_from(User)):
+            start = time.perf_counter()
+            fts.rebuild(db)
+            print(f"FTS5 index built in {time.perf_counter() - start:.1f}s")
+
+        memory = InvertedIndexSearchBackend()
+        start = time.perf_counter()
+        memory.rebuild(db)
+        print(f"In-memory index built in {time.perf_counter() - start:.1f}s")
+
+        print()
+        print(f"{'query':<18}{'ilike page':>12}{'ilike +total':>14}{'fts5':>10}{'memory':>10}{'matches':>10}")
+        for query in QUERIES:
+            ilike_page = timed(lambda: ilike_search(db, query), args.repeat)
+            ilike_full = timed(lambda: (ilike_search(db, query), ilike_total(db, query)), args.repeat)
+            fts_ms = timed(lambda: fts.search(db, query), args.repeat)
+            memory_ms = timed(lambda: memory.search(db, query), args.repeat)
+            total = fts.search(db, query)[1]
+            print(
+                f"{query:<18}{ilike_page:>10.2f}ms{ilike_full:>12.2f}ms"
+                f"{fts_ms:>8.2f}ms{memory_ms:>8.2f}ms{total:>10}"
+            )
+
+        typeahead = TypeaheadIndex()
+        start = time.perf_counter()
+        typeahead.load(db)
+        print()
+        print(f"Typeahead index built in {time.perf_counter() - start:.1f}s")
+        # A well-connected viewer: their connections are checked before the index
+        connections = random.Random(7).sample(range(1, args.users + 1), min(500, args.users))
+        print(f"{'typed':<18}{'ilike':>12}{'typeahead':>12}{'+500 conns':>12}{'shown':>8}")
+        for query in TYPEAHEAD_QUERIES:
+            ilike_ms = timed(lambda: ilike_search(db, query, limit=8), args.repeat)
+            typeahead_ms = timed(lambda: typeahead.search(query, limit=8), args.repeat)
+            boosted_ms = timed(lambda: typeahead.search(query, connections, limit=8), args.repeat)
+            shown = len(typeahead.search(query, connections, limit=8))
+            print(f"{query:<18}{ilike_ms:>10.2f}ms{typeahead_ms:>10.2f}ms{boosted_ms:>10.2f}ms{shown:>8}")
+
+if __name__ == "__main__":
+    main()
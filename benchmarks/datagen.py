@@ -0,0 +1,169 @@
+"""Generate a synthetic social network with the core/database models.
+
+Usage:
+    python -m benchmarks.datagen --users 10000 --posts-per-user 5 --avg-connections 20 --db /tmp/app_bench.db
+
+Connections follow a power law (preferential attachment): most members have a
+handful of connections and a few hubs have thousands, like a real network.
+Every user's password is BENCH_PASSWORD. The output is deterministic for a
+given --seed.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from core.database import Base, User, Post, Connection
+
+BENCH_PASSWORD = "benchmark"
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda",
+    "William", "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica",
+    "Thomas", "Sarah", "Charles", "Karen", "Aisha", "Wei", "Priya", "Mateo", "Yuki",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson",
+    "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Chen", "Patel", "Kim", "Nguyen",
+]
+TITLES = [
+    "Software Engineer", "Product Manager", "Data Scientist", "UX Designer",
+    "Marketing Lead", "Sales Director", "DevOps Engineer", "Recruiter",
+    "Financial Analyst", "Engineering Manager", "Consultant", "Founder",
+]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+CITIES = ["London", "Berlin", "New York", "San Francisco", "Bangalore", "Tokyo", "Toronto", "Sydney"]
+WORDS = (
+    "excited to share that our team shipped a new release today thanks to everyone "
+    "involved hiring engineers designers remote conference talk learned lessons growth "
+    "leadership product customers data launch milestone grateful opportunity"
+).split()
+
+def power_law_edges(count: int, avg_degree: int, rng: random.Random) -> List[tuple]:
+    """Preferential-attachment edges over user indexes 0..count-1"""
+    m = max(1, avg_degree // 2)
+    edges = []
+    # Each endpoint appears once per incident edge, so sampling it is degree-proportional
+    endpoints: List[int] = []
+    for new in range(count):
+        if new <= m:
+            targets = set(range(new))
+        else:
+            targets = set()
+            while len(targets) < m:
+                targets.add(rng.choice(endpoints))
+        for target in targets:
+            edges.append((new, target))
+            endpoints.extend((new, target))
+    return edges
+
+def generate(
+    db: Session,
+    users: int,
+    posts_per_user: int = 5,
+    avg_connections: int = 20,
+    pending_ratio: float = 0.05,
+    seed: int = 42,
+    batch_size: int = 10000,
+    log: Callable[[str], None] = print
+) -> None:
+    """Fill an empty database with users, posts and a power-law connection graph"""
+    from core.security import get_password_hash
+
+    if db.scalar(select(func.count()).select_from(User)):
+        raise ValueError("Database already contains users; generate into an empty database")
+
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+
+    def insert_batched(model, rows) -> None:
+        for offset in range(0, len(rows), batch_size):
+            db.execute(insert(model), rows[offset:offset + batch_size])
+        db.commit()
+
+    log(f"users: {users}")
+    insert_batched(User, [
+        {
+            "email": f"user{i}@example.com",
+            "hashed_password": hashed_password,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "headline": f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+            "location": rng.choice(CITIES),
+            "is_active": True,
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": start + timedelta(minutes=i),
+        }
+        for i in range(users)
+    ])
+    user_ids = list(db.scalars(select(User.id).order_by(User.id)))
+
+    edges = power_law_edges(users, avg_connections, rng)
+    log(f"connections: {len(edges)}")
+    insert_batched(Connection, [
+        {
+            "sender_id": user_ids[a],
+            "receiver_id": user_ids[b],
+            "status": "pending" if rng.random() < pending_ratio else "accepted",
+            "created_at": start + timedelta(minutes=rng.randrange(users * 2)),
+            "updated_at": start + timedelta(minutes=users * 2),
+        }
+        for a, b in edges
+    ])
+
+    post_count = users * posts_per_user
+    log(f"posts: {post_count}")
+    insert_batched(Post, [
+        {
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))),
+            "user_id": rng.choice(user_ids),
+            "created_at": start + timedelta(seconds=rng.randrange(users * 600)),
+        }
+        for _ in range(post_count)
+    ])
+
+def prepare(db: Session, log: Callable[[str], None] = print) -> None:
+    """Build the derived data the app expects: counters, timelines and the search index"""
+    from services.counters import CounterService
+    from services.search import init_search
+    from services.timeline import TimelineService
+
+    log("counters")
+    CounterService(db).reconcile()
+    log("timelines")
+    TimelineService(db).backfill()
+    log("search index")
+    init_search(db.get_bind()).rebuild(db)
+
+def create_database(path: str, users: int, posts_per_user: int, avg_connections: int, seed: int) -> None:
+    """Create and fill a SQLite benchmark database at path"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        generate(db, users, posts_per_user=posts_per_user, avg_connections=avg_connections, seed=seed)
+        prepare(db)
+    engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--posts-per-user", type=int, default=5)
+    parser.add_argument("--avg-connections", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=os.path.join("/tmp", "app_bench.db"))
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    started = time.perf_counter()
+    create_database(args.db, args.users, args.posts_per_user, args.avg_connections, args.seed)
+    print(f"Generated {args.db} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Callable, Dict, Optional
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+STATIC_DIR = "static"
+STATIC_URL = "/static"
+DIST_DIR = "dist"  # fingerprinted build output, relative to STATIC_DIR
+MANIFEST_NAME = "manifest.json"
+
+# Source assets: directories under STATIC_DIR and the extensions worth compressing
+ASSET_DIRS = ("css", "js")
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html")
+
+# Accept-Encoding token -> suffix of the precompressed file, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def _fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def build_assets(
+    static_dir: str = STATIC_DIR, progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, str]:
+    """Copy assets to dist/ under content-hashed names with gzip/brotli variants; returns the manifest"""
+    sources = []
+    for asset_dir in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, asset_dir)):
+            sources.extend(os.path.join(root, name) for name in sorted(files))
+
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    manifest: Dict[str, str] = {}
+    for done, source in enumerate(sources, 1):
+        logical = os.path.relpath(source, static_dir).replace(os.sep, "/")
+        stem, ext = os.path.splitext(logical)
+        hashed = f"{stem}.{_fingerprint(source)}{ext}"
+        target = os.path.join(dist_dir, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+
+        if ext in COMPRESSIBLE:
+            with open(source, "rb") as f:
+                data = f.read()
+            # mtime=0 keeps the .gz byte-identical across builds
+            with open(target + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(target + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+
+        manifest[logical] = f"{DIST_DIR}/{hashed}"
+        if progress:
+            progress(done, len(sources))
+
+    # Drop outputs of earlier builds that no longer match a source file
+    current = {os.path.join(static_dir, path) for path in manifest.values()}
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if name != MANIFEST_NAME and os.path.splitext(path)[0] not in current and path not in current:
+                os.remove(path)
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    _manifest_cache.clear()
+    return manifest
+
+_manifest_cache: Dict[str, Dict[str, str]] = {}
+
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """Logical asset name -> fingerprinted path; empty until build-assets has run"""
+    if static_dir not in _manifest_cache:
+        try:
+            with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)) as f:
+                _manifest_cache[static_dir] = json.load(f)
+        except FileNotFoundError:
+            _manifest_cache[static_dir] = {}
+    return _manifest_cache[static_dir]
+
+def asset_url(name: str) -> str:
+    """URL of a static asset, fingerprinted when the asset pipeline has been built"""
+    return f"{STATIC_URL}/{load_manifest().get(name, name)}"
+
+def _immutable_prefixes():
+    # Fingerprinted build output, and uploads, whose names are content hashes (see core.utils)
+    prefixes = [f"{DIST_DIR}/"]
+    upload_dir = os.path.relpath(settings.UPLOAD_DIR, STATIC_DIR).replace(os.sep, "/")
+    if not upload_dir.startswith(".."):
+        prefixes.append(f"{upload_dir}/")
+    return tuple(prefixes)
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles serving .br/.gz siblings by Accept-Encoding, with immutable caching for hashed paths"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        path = path.replace(os.sep, "/")
+        if not path.startswith(_immutable_prefixes()):
+            return await super().get_response(path, scope)
+
+        accepted = _accepted_encodings(scope)
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            _, stat_result = self.lookup_path(path + suffix)
+            if stat_result is not None:
+                response = await super().get_response(path + suffix, scope)
+                response.headers["Content-Encoding"] = encoding
+                content_type = _content_type(path)
+                if content_type:
+                    response.headers["Content-Type"] = content_type
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+def _accepted_encodings(scope: Scope) -> set:
+    for name, value in scope.get("headers", ()):
+        if name == b"accept-encoding":
+            tokens = set()
+            for part in value.decode("latin-1").split(","):
+                token, _, params = part.partition(";")
+                _, _, quality = params.partition("q=")
+                try:
+                    if quality and float(quality) == 0:
+                        continue  # explicitly refused
+                except ValueError:
+                    pass
+                tokens.add(token.strip().lower())
+            return tokens
+    return set()
+
+def _content_type(path: str) -> Optional[str]:
+    content_type, _ = mimetypes.guess_type(path)
+    if content_type and (content_type.startswith("text/") or content_type == "application/javascript"):
+        content_type += "; charset=utf-8"
+    return content_type
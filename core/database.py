@@ -1,16 +1,101 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+import os
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import (
+    create_engine, event, false, inspect, true,
+    Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, UniqueConstraint
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import URL, Engine, make_url
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Optional, Tuple
 from app.config import settings
+from core.instrumentation import instrument_pool
 
 # Database setup
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, Any]:
+    """PRAGMAs applied to every new SQLite connection for the configured storage profile"""
+    pragmas: Dict[str, Any] = {"busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS}
+    if settings.DB_STORAGE_PROFILE == "wal":
+        if not read_only:
+            # Persistent per database file; readers then never block on the writer
+            pragmas["journal_mode"] = "wal"
+        pragmas["synchronous"] = settings.SQLITE_SYNCHRONOUS
+        pragmas["cache_size"] = -settings.SQLITE_CACHE_SIZE_KB  # negative: KiB instead of pages
+        pragmas["mmap_size"] = settings.SQLITE_MMAP_SIZE
+        pragmas["temp_store"] = "memory"
+    elif settings.DB_STORAGE_PROFILE != "default":
+        raise ValueError(f"Unknown DB_STORAGE_PROFILE: {settings.DB_STORAGE_PROFILE}")
+    if read_only:
+        pragmas["query_only"] = "on"
+    return pragmas
+
+def _engine_options(url: URL, pool_size: int) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options  # in-memory databases live in a single connection
+    options.update(pool_size=pool_size, max_overflow=settings.DB_MAX_OVERFLOW, pool_timeout=settings.DB_POOL_TIMEOUT)
+    return options
+
+def _set_pragmas_on_connect(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_db_engine(database_url: str, read_only: bool = False, pool_size: Optional[int] = None) -> Engine:
+    """Create a pooled engine with the storage profile applied to each connection"""
+    url = make_url(database_url)
+    new_engine = create_engine(url, **_engine_options(url, pool_size or settings.DB_POOL_SIZE))
+    if url.get_backend_name() == "sqlite":
+        _set_pragmas_on_connect(new_engine, sqlite_pragmas(read_only))
+    instrument_pool(new_engine)
+    return new_engine
+
+engine = create_db_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Read-only pool for GET routes (DB_READ_SPLIT); the primary engine when the split is off
+if settings.DB_READ_SPLIT:
+    read_engine = create_db_engine(
+        settings.DATABASE_READ_URL or settings.DATABASE_URL, read_only=True, pool_size=settings.DB_READ_POOL_SIZE
+    )
+else:
+    read_engine = engine
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine, info={"read_only": settings.DB_READ_SPLIT}
+)
+
+# Async database setup (DB_STACK=async); the engines are created on first use
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+_async_engines: Dict[bool, AsyncEngine] = {}
+
+def get_async_engine(read_only: bool = False) -> AsyncEngine:
+    read_only = read_only and settings.DB_READ_SPLIT
+    if read_only not in _async_engines:
+        url = make_url(settings.DATABASE_READ_URL or settings.DATABASE_URL if read_only else settings.DATABASE_URL)
+        url = url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+        pool_size = settings.DB_READ_POOL_SIZE if read_only else settings.DB_POOL_SIZE
+        options = _engine_options(url, pool_size)
+        options.pop("connect_args", None)
+        async_engine = create_async_engine(url, **options)
+        if url.get_backend_name() == "sqlite":
+            _set_pragmas_on_connect(async_engine.sync_engine, sqlite_pragmas(read_only))
+        instrument_pool(async_engine.sync_engine)
+        _async_engines[read_only] = async_engine
+    return _async_engines[read_only]
+
+# expire_on_commit=False: attributes must stay readable after commit without lazy IO
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # Database models
@@ -27,6 +112,14 @@ class User(Base):
     location = Column(String, default="")
     profile_picture = Column(String, default="")
     is_active = Column(Boolean, default=True)
+    # Columns below were added after the baseline; server defaults fill in existing rows (migration 0003)
+    feed_fanout_on_read = Column(Boolean, default=False, server_default=false())  # too many connections to push to
+    suggestions_stale = Column(Boolean, default=True, server_default=true())  # suggestions need a refresh
+    # Denormalized counters, maintained by the services and repaired by `manage.py reconcile-counters`
+    connections_count = Column(Integer, nullable=False, default=0, server_default="0")
+    posts_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_requests_count = Column(Integer, nullable=False, default=0, server_default="0")  # inbound pending requests
+    profile_version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on any profile page change
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -37,6 +130,11 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination over (created_at, id), globally and per author
+        Index("ix_posts_created_id", "created_at", "id"),
+        Index("ix_posts_user_created_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
@@ -47,12 +145,34 @@ class Post(Base):
     # Relationships
     author = relationship("User", back_populates="posts")
 
+def connection_pair(user_id: int, other_id: int) -> Tuple[int, int]:
+    """Canonical (low id, high id) key of a pair of users: their connection or their conversation"""
+    return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+def _pair_default(index: int):
+    def default(context) -> int:
+        parameters = context.get_current_parameters()
+        return connection_pair(parameters["sender_id"], parameters["receiver_id"])[index]
+    return default
+
 class Connection(Base):
     __tablename__ = "connections"
+    __table_args__ = (
+        # At most one row per pair of users, whichever of them sent the request
+        UniqueConstraint("user_low_id", "user_high_id", name="uq_connections_pair"),
+        # A user's connections or requests from either side of the pair
+        Index("ix_connections_sender_status_created", "sender_id", "status", "created_at", "id"),
+        Index("ix_connections_receiver_status_created", "receiver_id", "status", "created_at", "id"),
+        # Delta sync of the in-memory graph index
+        Index("ix_connections_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Derived from sender_id/receiver_id on insert
+    user_low_id = Column(Integer, nullable=False, default=_pair_default(0))
+    user_high_id = Column(Integer, nullable=False, default=_pair_default(1))
     status = Column(String, default="pending")  # pending, accepted, rejected
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -61,6 +181,178 @@ class Connection(Base):
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_connections")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_connections")
 
+class TimelineEntry(Base):
+    """Materialized home feed row: one per (reader, post) pushed on write"""
+    __tablename__ = "timelines"
+    __table_args__ = (
+        Index("ix_timelines_user_created", "user_id", "created_at", "post_id"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    created_at = Column(DateTime, nullable=False)  # copy of Post.created_at for the range read
+    
+    # Relationships
+    post = relationship("Post")
+
+class ConnectionSuggestion(Base):
+    """Precomputed "People you may know" row: one per (user, candidate)"""
+    __tablename__ = "connection_suggestions"
+    __table_args__ = (
+        Index("ix_connection_suggestions_user_score", "user_id", "score"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    score = Column(Float, nullable=False)
+    mutual_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    candidate = relationship("User", foreign_keys=[candidate_id])
+
+class ImportCheckpoint(Base):
+    """Progress of a bulk import source, committed with each batch so a rerun resumes"""
+    __tablename__ = "import_checkpoints"
+    
+    source = Column(String, primary_key=True)  # "<kind>:<absolute path>"
+    records_done = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Conversation(Base):
+    """Direct message thread between two users, stored once as (low id, high id)"""
+    __tablename__ = "conversations"
+    __table_args__ = (
+        UniqueConstraint("user_low_id", "user_high_id", name="uq_conversations_pair"),
+        # A user's conversations, most recently active first, from either side of the pair
+        Index("ix_conversations_low_updated", "user_low_id", "updated_at"),
+        Index("ix_conversations_high_updated", "user_high_id", "updated_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_low_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_high_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    last_message_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)  # time of the last message
+    
+    # Relationships
+    user_low = relationship("User", foreign_keys=[user_low_id])
+    user_high = relationship("User", foreign_keys=[user_high_id])
+
+class Message(Base):
+    __tablename__ = "messages"
+    __table_args__ = (
+        # History pages and catch-up after a reconnect are id ranges within a conversation
+        Index("ix_messages_conversation_id", "conversation_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
+    sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class Job(Base):
+    """Job posting; searched through the in-memory index in services.jobs"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Delta sync of the job index
+        Index("ix_jobs_updated_at", "updated_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    poster_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # title, company, location and skills are indexed and never edited after posting
+    title = Column(String, nullable=False)
+    company = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    skills = Column(String, nullable=False, default="")  # comma-separated
+    seniority = Column(String, nullable=False)  # entry, mid, senior, executive
+    remote = Column(Boolean, nullable=False, default=False)
+    description = Column(Text, default="")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)  # set to now to close a posting early
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    poster = relationship("User")
+
+class BrokerEvent(Base):
+    """Pub/sub event relayed between worker processes by the database broker"""
+    __tablename__ = "broker_events"
+    
+    id = Column(Integer, primary_key=True)
+    channel = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    origin = Column(String, nullable=False)  # publishing process, which delivered it locally already
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+# In-memory side effects (e.g. the graph index) that must only happen once a write is committed
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Run callback when the session's current transaction commits; dropped if it rolls back"""
+    db.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop("after_commit", ()):
+        callback()
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session) -> None:
+    session.info.pop("after_commit", None)
+
+class SyncWatermark:
+    """Where the delta sync of an in-memory index resumes reading an updated_at column.
+
+    updated_at is stamped when a row is flushed, but other sessions only see
+    the row once its transaction commits, which may be a whole busy timeout
+    later. By then a sync can have moved past that timestamp, so every sync
+    re-reads SYNC_OVERLAP_SECONDS behind the newest timestamp seen and skips
+    the rows (by key and updated_at) it has already applied.
+    """
+
+    def __init__(self):
+        self.value: Optional[datetime] = None
+        self._seen: Dict[Hashable, datetime] = {}
+
+    def reset(self, value: Optional[datetime]) -> None:
+        """Start over from value, e.g. the newest updated_at of a full load"""
+        self.value = value
+        self._seen = {}
+
+    def since(self) -> Optional[datetime]:
+        """Lower bound (inclusive) of the next sync's updated_at filter; None reads everything"""
+        if self.value is None:
+            return None
+        return self.value - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+
+    def fresh(self, key: Hashable, updated_at: Optional[datetime]) -> bool:
+        """Record a row read by a sync; False if this version of it was applied before"""
+        if updated_at is None:
+            return True
+        if self._seen.get(key) == updated_at:
+            return False
+        self._seen[key] = updated_at
+        if self.value is None or updated_at > self.value:
+            self.value = updated_at
+        return True
+
+    def prune(self) -> None:
+        """Forget rows that have fallen out of the overlap window"""
+        since = self.since()
+        if since is not None:
+            self._seen = {key: updated_at for key, updated_at in self._seen.items() if updated_at >= since}
+
+# Dialect-aware INSERT that skips rows violating a unique/primary key
+def insert_ignore(db: Session, table):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table).on_conflict_do_nothing()
+
 # Dependency to get database session
 def get_db() -> Session:
     db = SessionLocal()
@@ -69,6 +361,34 @@ def get_db() -> Session:
     finally:
         db.close()
 
+# Dependency to get an async database session
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+# Schema migrations (alembic); see migrations/versions
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+BASELINE_REVISION = "0001"  # the schema before migrations existed
+
+def _alembic_config(connection) -> AlembicConfig:
+    config = AlembicConfig()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.attributes["connection"] = connection
+    return config
+
 # Initialize database
-def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+def init_db(bind: Optional[Engine] = None):
+    """Create a new database at the latest schema, or migrate an existing one to it"""
+    bind = bind or engine
+    with bind.begin() as connection:
+        config = _alembic_config(connection)
+        tables = inspect(connection).get_table_names()
+        if "users" not in tables:
+            Base.metadata.create_all(bind=connection)
+            command.stamp(config, "head")
+            return
+        if "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+        # Tables added since the baseline; create_all never alters existing ones
+        Base.metadata.create_all(bind=connection)
\ No newline at end of file
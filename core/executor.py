@@ -0,0 +1,129 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from app.config import settings
+
+class OverloadedError(RuntimeError):
+    """Raised when an executor's wait queue is full"""
+
+class BoundedExecutor:
+    """Run blocking callables off the event loop with a concurrency cap and a bounded queue.
+
+    At most ``max_workers`` calls run at once; up to ``max_queue`` more may
+    wait for a slot, after which calls fail fast with OverloadedError. Each
+    kind of work gets its own executor so a burst of one (e.g. logins)
+    cannot starve the other (e.g. feed reads).
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool and await its result"""
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedError(f"{self.name} executor queue is full")
+
+        self.queued += 1
+        try:
+            await self._get_semaphore().acquire()
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        try:
+            call = partial(fn, *args, **kwargs)
+            loop = asyncio.get_running_loop()
+            if self.kind == "thread":
+                # Carry request-scoped context (e.g. query counters) into the worker
+                call = partial(contextvars.copy_context().run, call)
+            return await loop.run_in_executor(self._get_executor(), call)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load figures for metrics/health endpoints"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker"
+                    )
+            return self._executor
+
+# bcrypt hashing/verification
+password_executor = BoundedExecutor(
+    "password",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE,
+    kind=settings.PASSWORD_HASH_EXECUTOR
+)
+
+# Synchronous SQLAlchemy session work
+db_executor = BoundedExecutor(
+    "db",
+    max_workers=settings.DB_THREADPOOL_WORKERS,
+    max_queue=settings.DB_THREADPOOL_QUEUE
+)
+
+# Image decoding/resizing for uploads
+image_executor = BoundedExecutor(
+    "image",
+    max_workers=settings.IMAGE_WORKERS,
+    max_queue=settings.IMAGE_QUEUE,
+    kind="process"
+)
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking database work on the DB threadpool"""
+    return await db_executor.run(fn, *args, **kwargs)
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {executor.name: executor.stats() for executor in (password_executor, db_executor, image_executor)}
+
+def shutdown_executors() -> None:
+    password_executor.shutdown()
+    db_executor.shutdown()
+    image_executor.shutdown()
@@ -0,0 +1,301 @@
+import asyncio
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Query counters of the current request/test; copied into threadpool workers with the context.
+# Counters nest (request > service method, benchmark > request), every active one records.
+_active_counters: ContextVar[Tuple["QueryCounter", ...]] = ContextVar("query_counters", default=())
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more SQL statements than allowed"""
+
+class QueryCounter:
+    """Record the SQL statements executed while the counter is active, with their durations"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self.durations: List[float] = []
+        self._token = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.durations)
+
+    def slowest(self, n: int = 5) -> List[Tuple[float, str]]:
+        """The n slowest statements as (seconds, sql)"""
+        return sorted(zip(self.durations, self.statements), reverse=True)[:n]
+
+    def __enter__(self) -> "QueryCounter":
+        self._token = _active_counters.set(_active_counters.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _active_counters.reset(self._token)
+
+# Prometheus metrics, rendered in the text exposition format by registry.render()
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"] + self.samples()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class CounterMetric(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in values]
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # per-bucket counts, then count, then sum
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        lines = []
+        for key, values in series:
+            for bound, count in zip(self.buckets, values):
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {values[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {values[-1]}")
+        return lines
+
+class GaugeCallback(Metric):
+    """Gauge whose samples are read from a callback at scrape time: {label values: value}"""
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]]
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in self.collect().items()]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_sql_queries", "SQL statements executed per HTTP request", ("route",), COUNT_BUCKETS
+))
+SLOW_REQUESTS = registry.register(CounterMetric(
+    "http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS", ("route",)
+))
+QUERY_DURATION = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("operation",)
+))
+POOL_CHECKOUT_WAIT = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection"
+))
+SERVICE_DURATION = registry.register(Histogram(
+    "service_method_duration_seconds", "Service method latency", ("service", "method")
+))
+SERVICE_QUERIES = registry.register(CounterMetric(
+    "service_method_sql_queries_total", "SQL statements executed by service methods", ("service", "method")
+))
+TEMPLATE_RENDER = registry.register(Histogram(
+    "template_render_duration_seconds", "Jinja2 template render time", ("template",)
+))
+
+_OPERATION_RE = re.compile(r"^\s*(\w+)")
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._instrumentation_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_instrumentation_started", None)
+    duration = time.perf_counter() - started if started is not None else 0.0
+    match = _OPERATION_RE.match(statement)
+    QUERY_DURATION.observe(duration, operation=match.group(1).upper() if match else "OTHER")
+    for counter in _active_counters.get():
+        counter.statements.append(statement)
+        counter.durations.append(duration)
+
+def instrument_pool(engine: Engine) -> None:
+    """Time connection checkouts from the engine's pool, including the wait for a free slot"""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+def instrument_service(cls):
+    """Class decorator timing every public method and counting its SQL statements"""
+    service = cls.__name__
+
+    def wrap(name: str, method: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed_async(*args, **kwargs):
+                started = time.perf_counter()
+                with QueryCounter() as counter:
+                    try:
+                        return await method(*args, **kwargs)
+                    finally:
+                        SERVICE_DURATION.observe(time.perf_counter() - started, service=service, method=name)
+                        SERVICE_QUERIES.inc(counter.count, service=service, method=name)
+            return timed_async
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            with QueryCounter() as counter:
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    SERVICE_DURATION.observe(time.perf_counter() - started, service=service, method=name)
+                    SERVICE_QUERIES.inc(counter.count, service=service, method=name)
+        return timed
+
+    for name, attr in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.isfunction(attr):
+            setattr(cls, name, wrap(name, attr))
+    return cls
+
+class TimedTemplate(Template):
+    """Jinja2 template class recording render time; set as Environment.template_class"""
+
+    def render(self, *args, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            TEMPLATE_RENDER.observe(time.perf_counter() - started, template=self.name or "<string>")
+
+def record_request(
+    method: str, route: str, status: int, duration: float, counter: QueryCounter, slow_threshold: float
+) -> None:
+    """Record a finished request and log it with its slowest SQL when over the threshold"""
+    REQUEST_DURATION.observe(duration, method=method, route=route, status=status)
+    REQUEST_QUERIES.observe(counter.count, route=route)
+    if slow_threshold and duration >= slow_threshold:
+        SLOW_REQUESTS.inc(route=route)
+        statements = "\n".join(
+            f"  {seconds * 1000:.1f}ms  {' '.join(sql.split())}" for seconds, sql in counter.slowest()
+        )
+        logger.warning(
+            "Slow request %s %s: %.1fms, %d queries (%.1fms in SQL)\n%s",
+            method, route, duration * 1000, counter.count, counter.total_time * 1000, statements
+        )
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryCounter]:
+    """Fail with QueryBudgetExceeded if the block runs more than max_queries statements
+
+    Usage in tests::
+
+        with query_budget(5):
+            client.get("/")
+    """
+    with QueryCounter() as counter:
+        yield counter
+
+    if counter.count > max_queries:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise QueryBudgetExceeded(
+            f"{counter.count} queries executed, budget is {max_queries}:\n{statements}"
+        )
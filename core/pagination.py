@@ -0,0 +1,43 @@
+import base64
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from sqlalchemy import tuple_
+
+# Keyset (cursor) pagination over (created_at, id), newest first.
+# Cursors are opaque to clients: urlsafe base64 of "<iso timestamp>|<id>".
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def keyset_page(query, created_at_column, id_column, limit: int, cursor: Optional[str] = None):
+    """Order a query newest first and restrict it to rows after the cursor.
+
+    Fetches ``limit + 1`` rows so the caller can tell whether another page exists.
+    """
+    if cursor:
+        query = query.filter(
+            tuple_(created_at_column, id_column) < tuple_(*decode_cursor(cursor))
+        )
+    return query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+def page_rows(
+    rows: List[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[datetime, int]]
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim a ``limit + 1`` result to one page and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
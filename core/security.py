@@ -1,5 +1,8 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
@@ -15,6 +18,16 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password executor, off the event loop"""
+    from core.executor import password_executor
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password executor, off the event loop"""
+    from core.executor import password_executor
+    return await password_executor.run(get_password_hash, password)
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -23,7 +36,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -33,4 +46,111 @@ def verify_token(token: str) -> Dict[str, Any]:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
-        raise ValueError("Invalid token")
\ No newline at end of file
+        raise ValueError("Invalid token")
+
+class AuthCache:
+    """Bounded TTL cache of verified token -> user snapshot.
+
+    Lets authenticated requests skip the user lookup. Entries are dropped
+    per user on profile changes/deactivation; profile claims embedded in
+    tokens issued before the last invalidation are no longer trusted.
+    The cache is per process, so AUTH_CACHE_TTL bounds how long another
+    worker can serve a stale snapshot, and profile claims are only trusted
+    while the token is younger than AUTH_CACHE_TTL for the same reason.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._invalidated_at: Dict[int, float] = {}
+
+    def get(self, token: str) -> Optional[Any]:
+        """Get the cached snapshot for a token, if still fresh"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, user_id, snapshot = entry
+            if expires_at <= time.monotonic():
+                self._drop(token)
+                return None
+            self._entries.move_to_end(token)
+            return snapshot
+
+    def put(self, token: str, user_id: int, snapshot: Any, token_exp: Optional[float] = None) -> None:
+        """Cache a snapshot, never beyond the token's own expiry"""
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._drop(token)
+            self._entries[token] = (time.monotonic() + ttl, user_id, snapshot)
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def discard(self, token: str) -> None:
+        """Forget a single token (e.g. on logout)"""
+        with self._lock:
+            self._drop(token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached snapshot of a user and distrust older profile claims"""
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+            now = time.time()
+            self._invalidated_at[user_id] = now
+            # Claims older than the token lifetime are expired anyway
+            horizon = now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            if len(self._invalidated_at) > self.max_entries:
+                self._invalidated_at = {
+                    uid: at for uid, at in self._invalidated_at.items() if at > horizon
+                }
+
+    def claims_trusted(self, user_id: int, issued_at: Optional[float]) -> bool:
+        """Whether profile claims issued at `issued_at` are recent and postdate the user's last invalidation"""
+        # Invalidations made by other workers are never seen here
+        if issued_at is None or time.time() - issued_at >= self.ttl:
+            return False
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(user_id)
+        return invalidated_at is None or issued_at > invalidated_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self._invalidated_at.clear()
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_user.get(entry[1])
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[entry[1]]
+
+auth_cache = AuthCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+
+# Profile fields embedded in session tokens when AUTH_PROFILE_CLAIMS is on
+PROFILE_CLAIM_FIELDS = (
+    "id", "email", "first_name", "last_name", "headline", "summary", "location",
+    "profile_picture", "is_active", "created_at", "updated_at",
+)
+
+def profile_claims(user) -> Dict[str, Any]:
+    """Build the signed profile claim for a user"""
+    claims = {}
+    for field in PROFILE_CLAIM_FIELDS:
+        value = getattr(user, field)
+        claims[field] = value.isoformat() if isinstance(value, datetime) else value
+    return claims
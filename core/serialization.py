@@ -0,0 +1,26 @@
+import json
+from datetime import date, datetime
+from typing import Any
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: without it responses are encoded with the stdlib json module
+    orjson = None
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts/lists/scalars (datetimes as ISO 8601) to compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse for content that is already plain data; nothing is validated or converted on the way out"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
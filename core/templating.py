@@ -0,0 +1,130 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, pass_environment
+from markupsafe import Markup
+from starlette.responses import StreamingResponse
+from app.config import settings
+from core.assets import load_manifest
+from core.instrumentation import CounterMetric, registry
+
+STREAM_CHUNK_SIZE = 4 * 1024  # bytes buffered per streamed write; Jinja yields many tiny strings
+
+FRAGMENT_CACHE = registry.register(CounterMetric(
+    "template_fragment_cache_total", "Fragment cache lookups by result", ("result",)
+))
+
+class FragmentCache:
+    """Thread-safe LRU of rendered HTML fragments"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Markup]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Markup]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+        FRAGMENT_CACHE.inc(result="hit" if html is not None else "miss")
+        return html
+
+    def set(self, key: Hashable, html: Markup) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+fragment_cache = FragmentCache(settings.FRAGMENT_CACHE_SIZE)
+
+def _version(value: Any) -> Hashable:
+    # Rows are keyed on identity and last change; anything else must be hashable itself
+    if hasattr(value, "updated_at") and hasattr(value, "id"):
+        return (type(value).__name__, value.id, value.updated_at)
+    return value
+
+def render_fragment(env: Environment, template_name: str, **context) -> Markup:
+    """Render a partial template, reusing the cached HTML while its rows are unchanged
+
+    Every keyword argument is part of the cache key: rows by (id, updated_at),
+    other values as-is. Pass every row the fragment displays (e.g. a post and
+    its author) and nothing viewer-specific.
+    """
+    key = (template_name,) + tuple((name, _version(value)) for name, value in sorted(context.items()))
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(env.get_template(template_name).render(**context))
+        fragment_cache.set(key, html)
+    return html
+
+# Template global: {{ fragment("partials/post_card.html", post=post, author=post.author) }}
+fragment = pass_environment(render_fragment)
+
+def configure_environment(env: Environment) -> None:
+    """Install the bytecode cache and the fragment helper on a Jinja environment"""
+    if settings.TEMPLATE_BYTECODE_CACHE:
+        # Compiled templates survive restarts and are shared by every worker process
+        env.bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATE_CACHE_DIR)
+    env.globals["fragment"] = fragment
+
+def warm_templates(env: Environment) -> int:
+    """Load every template up front so the first requests don't pay for compilation"""
+    names = env.list_templates(extensions=("html",))
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+def template_fingerprint(env: Environment) -> str:
+    """Hash of every template's source and the asset manifest; changes with any deploy that changes the HTML"""
+    digest = hashlib.sha256()
+    for name in sorted(env.list_templates(extensions=("html",))):
+        source, _, _ = env.loader.get_source(env, name)
+        digest.update(f"{name}\0{source}\0".encode())
+    digest.update(json.dumps(load_manifest(), sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+def _buffered(chunks: Iterable[str], size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+def stream_template(
+    env: Environment,
+    template_name: str,
+    context: Dict[str, Any],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> StreamingResponse:
+    """Stream a page as Jinja renders it, so the head goes out before the body is done
+
+    Starlette iterates the sync generator on its threadpool. Everything the
+    template reads must already be loaded: no lazy ORM attributes.
+    """
+    template = env.get_template(template_name)
+    return StreamingResponse(
+        _buffered(template.generate(context)),
+        status_code=status_code,
+        headers=headers,
+        media_type="text/html; charset=utf-8"
+    )
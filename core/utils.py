@@ -1,46 +1,117 @@
+import hashlib
 import os
-import uuid
-from typing import Optional
-from PIL import Image
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from PIL import Image, ImageOps
 from app.config import settings
 
-def save_upload_file(file, upload_dir: str = None) -> str:
-    """Save an uploaded file and return the file path"""
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Square avatar derivatives: name -> edge in pixels (2x the largest size templates display)
+IMAGE_VARIANTS: Dict[str, int] = {
+    "thumb": 96,
+    "medium": 320,
+}
+# Derivatives are WebP only: every browser the templates support decodes it
+DERIVATIVE_FORMAT = ("webp", "WEBP")
+# Pillow format of an accepted upload -> extension of the stored original
+UPLOAD_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+DEFAULT_AVATAR_URL = "https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w={size}&h={size}&fit=crop&crop=face"
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+class UnsupportedImage(ValueError):
+    """Raised when an upload is not a JPEG, PNG or WebP image"""
+
+def save_upload_file(file, upload_dir: str = None, max_size: Optional[int] = None) -> Tuple[str, str]:
+    """Stream an uploaded image to disk under a content-addressed name; returns (path, sha256)
+
+    The file is copied in chunks and abandoned as soon as it grows past
+    max_size (default settings.MAX_FILE_SIZE), so an oversized upload never
+    sits in memory or on disk in full. The extension comes from the format
+    Pillow detects in the header, never from the client's filename.
+    """
     if upload_dir is None:
         upload_dir = settings.UPLOAD_DIR
-    
+    if max_size is None:
+        max_size = settings.MAX_FILE_SIZE
+
     # Create upload directory if it doesn't exist
     os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        buffer.write(file.file.read())
-    
-    return file_path
-
-def resize_image(image_path: str, max_size: tuple = (800, 600)) -> str:
-    """Resize an image to fit within max_size while maintaining aspect ratio"""
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-")
     try:
-        with Image.open(image_path) as img:
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            img.save(image_path, optimize=True, quality=85)
-        return image_path
-    except Exception as e:
-        print(f"Error resizing image: {e}")
-        return image_path
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = file.file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(f"File exceeds the {max_size // (1024 * 1024)}MB limit")
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        file_extension = UPLOAD_EXTENSIONS.get(detect_image_format(temp_path))
+        if file_extension is None:
+            raise UnsupportedImage("Upload a JPEG, PNG or WebP image")
+
+        # Identical content maps to the same name
+        file_hash = digest.hexdigest()
+        file_path = os.path.join(upload_dir, f"{file_hash[:32]}{file_extension}")
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return file_path, file_hash
+
+def detect_image_format(path: str) -> Optional[str]:
+    """The Pillow format name of an image file (e.g. "JPEG"), or None when it is not one"""
+    try:
+        with Image.open(path) as img:  # reads the header only
+            return img.format
+    except OSError:  # includes UnidentifiedImageError
+        return None
+
+def generate_image_derivatives(image_path: str, output_dir: Optional[str] = None) -> Dict[str, str]:
+    """Write the square WebP derivatives of an image; returns {"<variant>.<ext>": path}
+
+    Runs in a worker process: decoding and LANCZOS resampling are CPU bound.
+    Derivatives are named after the source file's content hash, so they can
+    be cached forever and regenerating them is idempotent.
+    """
+    output_dir = output_dir or os.path.dirname(image_path)
+    key = os.path.splitext(os.path.basename(image_path))[0]
+    paths = {}
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        for variant, edge in IMAGE_VARIANTS.items():
+            resized = ImageOps.fit(img, (edge, edge), Image.Resampling.LANCZOS)
+            ext, image_format = DERIVATIVE_FORMAT
+            path = os.path.join(output_dir, f"{key}_{variant}.{ext}")
+            resized.save(path, image_format, optimize=True, quality=85)
+            paths[f"{variant}.{ext}"] = path
+    return paths
+
+def avatar_url(user, variant: str = "thumb") -> str:
+    """URL of a user's profile picture derivative, or the default avatar"""
+    key = getattr(user, "profile_picture", None)
+    if not key:
+        return DEFAULT_AVATAR_URL.format(size=IMAGE_VARIANTS[variant])
+    return f"/{settings.UPLOAD_DIR.strip('/')}/{key}_{variant}.{DERIVATIVE_FORMAT[0]}"
 
 def format_time_ago(dt: datetime) -> str:
     """Format a datetime as 'time ago' string"""
-    from datetime import datetime
-    
     now = datetime.utcnow()
     diff = now - dt
-    
+
     if diff.days > 0:
         return f"{diff.days}d ago"
     elif diff.seconds > 3600:
@@ -50,4 +121,4 @@ def format_time_ago(dt: datetime) -> str:
         minutes = diff.seconds // 60
         return f"{minutes}m ago"
     else:
-        return "Just now"
\ No newline at end of file
+        return "Just now"
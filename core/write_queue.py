@@ -0,0 +1,141 @@
+import asyncio
+import contextvars
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from core.database import SessionLocal
+from core.executor import run_db
+from core.instrumentation import registry, Histogram, COUNT_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WRITE_BATCH = registry.register(Histogram(
+    "write_queue_batch_size", "Writes committed per group-commit transaction", buckets=COUNT_BUCKETS
+))
+WRITE_REPLAYS = registry.register(Histogram(
+    "write_queue_batch_replays", "Times a batch was replayed after one of its writes failed", buckets=COUNT_BUCKETS
+))
+
+class WriteQueue:
+    """Group commit: coalesce writes arriving within a few milliseconds into one transaction.
+
+    Each submitted job stages its rows on a shared session without
+    committing. A single worker takes jobs in arrival order, runs up to
+    ``max_batch`` of them that arrive within ``max_delay`` seconds of the
+    first, and commits once; every caller's future resolves after that
+    commit returns. One worker and FIFO order mean a user's writes commit in
+    the order they were submitted. A job that raises is rolled back with its
+    batch and the remaining jobs are replayed without it, so one bad write
+    fails alone.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.writes = 0
+
+    async def submit(self, job: Callable[[Session], T]) -> T:
+        """Stage job(db) in the next batch and wait until it is committed"""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            # A fresh context: the worker outlives this request and must not inherit its
+            # context variables (e.g. the request's QueryCounter would record every batch)
+            self._task = contextvars.Context().run(asyncio.create_task, self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        return await future
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "writes": self.writes,
+        }
+
+    async def _collect(self) -> List[Tuple[Callable[[Session], Any], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                outcomes = await run_db(self._commit_batch, [job for job, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as exc:
+                # The commit itself (or the executor) failed: nothing in the batch is durable
+                logger.exception("Write batch of %d failed", len(batch))
+                outcomes = [(False, exc)] * len(batch)
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                if future.done():
+                    continue  # the caller went away; its write is committed regardless
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _commit_batch(self, jobs: List[Callable[[Session], Any]]) -> List[Tuple[bool, Any]]:
+        failed: Dict[int, BaseException] = {}
+        replays = 0
+        while True:
+            results: Dict[int, Any] = {}
+            # expire_on_commit=False: returned rows stay readable once the session is gone
+            with SessionLocal(expire_on_commit=False) as db:
+                for index, job in enumerate(jobs):
+                    if index in failed:
+                        continue
+                    try:
+                        results[index] = job(db)
+                    except Exception as exc:
+                        # Savepoints are unreliable under pysqlite; replay the others instead
+                        failed[index] = exc
+                        db.rollback()
+                        break
+                else:
+                    db.commit()
+                    break
+            replays += 1
+
+        self.batches += 1
+        self.writes += len(results)
+        WRITE_BATCH.observe(len(jobs))
+        if replays:
+            WRITE_REPLAYS.observe(replays)
+        return [
+            (False, failed[index]) if index in failed else (True, results[index])
+            for index in range(len(jobs))
+        ]
+
+write_queue = WriteQueue(settings.WRITE_BATCH_SIZE, settings.WRITE_BATCH_DELAY_MS / 1000)
@@ -0,0 +1,140 @@
+import argparse
+import sys
+from typing import Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from core.database import SessionLocal, init_db
+
+def print_progress(done: int, total: Optional[int]) -> None:
+    """Print a single-line progress counter to stderr; total is None for streamed input"""
+    if total is None:
+        sys.stderr.write(f"\r{done}")
+    else:
+        sys.stderr.write(f"\r{done}/{total}")
+        if done >= total:
+            sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def backfill_timelines(args: argparse.Namespace) -> None:
+    """Build home timelines from the existing connections"""
+    from services.timeline import TimelineService
+
+    db = SessionLocal()
+    try:
+        count = TimelineService(db).backfill(
+            batch_size=args.batch_size,
+            depth=args.depth,
+            progress=print_progress
+        )
+        print(f"Backfilled timelines for {count} users")
+    finally:
+        db.close()
+
+def reindex_search(args: argparse.Namespace) -> None:
+    """Rebuild the user search index from the users table"""
+    from services.search import init_search
+
+    backend = init_search()
+    db = SessionLocal()
+    try:
+        count = backend.rebuild(db, batch_size=args.batch_size, progress=print_progress)
+        print(f"Indexed {count} users with the {backend.name} backend")
+    finally:
+        db.close()
+
+def refresh_suggestions(args: argparse.Namespace) -> None:
+    """Recompute "People you may know" for every active user"""
+    from services.graph import init_graph
+    from services.suggestions import SuggestionService
+
+    db = SessionLocal()
+    try:
+        init_graph(db)
+        count = SuggestionService(db).refresh_all(batch_size=args.batch_size, progress=print_progress)
+        print(f"Refreshed suggestions for {count} users")
+    finally:
+        db.close()
+
+def reconcile_counters(args: argparse.Namespace) -> None:
+    """Recount connection, post and pending request counters from the source tables"""
+    from services.counters import CounterService
+
+    db = SessionLocal()
+    try:
+        repaired = CounterService(db).reconcile(batch_size=args.batch_size, progress=print_progress)
+        print(f"Repaired counters of {repaired} users")
+    finally:
+        db.close()
+
+def import_data(args: argparse.Namespace) -> None:
+    """Bulk import users, posts or connections from CSV/NDJSON, resuming an interrupted run"""
+    from services.importer import BulkImporter
+    from services.search import init_search
+
+    db = SessionLocal()
+    try:
+        importer = BulkImporter(db, batch_size=args.batch_size, workers=args.workers, progress=print_progress)
+        count = importer.run(args.kind, args.path, fmt=args.format)
+        sys.stderr.write("\n")
+        print(f"Imported {count - importer.skipped} {args.kind} ({importer.skipped} skipped)")
+
+        if args.kind == "users":
+            backend = init_search()
+            backend.rebuild(db, progress=print_progress)
+            print(f"Indexed users with the {backend.name} backend")
+        else:
+            print("Run backfill-timelines to add the imported rows to home timelines")
+    finally:
+        db.close()
+
+def build_assets(args: argparse.Namespace) -> None:
+    """Fingerprint static CSS/JS into static/dist with gzip and brotli variants"""
+    from core import assets
+
+    manifest = assets.build_assets(args.static_dir, progress=print_progress)
+    print(f"Built {len(manifest)} assets" + ("" if assets.brotli else " (brotli not installed: gzip only)"))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LinkedIn Clone management commands")
+    parser.set_defaults(needs_db=True)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-timelines", help=backfill_timelines.__doc__)
+    backfill.add_argument("--batch-size", type=int, default=500)
+    backfill.add_argument("--depth", type=int, default=None, help="posts per author (default: FEED_BACKFILL_DEPTH)")
+    backfill.set_defaults(handler=backfill_timelines)
+
+    reindex = commands.add_parser("reindex-search", help=reindex_search.__doc__)
+    reindex.add_argument("--batch-size", type=int, default=5000)
+    reindex.set_defaults(handler=reindex_search)
+
+    suggestions = commands.add_parser("refresh-suggestions", help=refresh_suggestions.__doc__)
+    suggestions.add_argument("--batch-size", type=int, default=500)
+    suggestions.set_defaults(handler=refresh_suggestions)
+
+    reconcile = commands.add_parser("reconcile-counters", help=reconcile_counters.__doc__)
+    reconcile.add_argument("--batch-size", type=int, default=1000)
+    reconcile.set_defaults(handler=reconcile_counters)
+
+    importer = commands.add_parser("import", help=import_data.__doc__)
+    importer.add_argument("kind", choices=["users", "posts", "connections"])
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "ndjson"], default=None, help="default: from the file extension")
+    importer.add_argument("--batch-size", type=int, default=1000)
+    importer.add_argument("--workers", type=int, default=None, help="password hashing processes (default: CPU count)")
+    importer.set_defaults(handler=import_data)
+
+    build = commands.add_parser("build-assets", help=build_assets.__doc__)
+    build.add_argument("--static-dir", default="static")
+    build.set_defaults(handler=build_assets, needs_db=False)
+
+    args = parser.parse_args()
+    if args.needs_db:
+        init_db()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
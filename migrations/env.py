@@ -0,0 +1,26 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from core.database import Base, engine
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+def run_migrations(connection) -> None:
+    # Batch mode: SQLite can only alter a column by copying the table
+    context.configure(connection=connection, target_metadata=Base.metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    context.configure(url=str(engine.url), target_metadata=Base.metadata, literal_binds=True, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+elif config.attributes.get("connection") is not None:
+    # Called from core.database.init_db on its own connection
+    run_migrations(config.attributes["connection"])
+else:
+    with engine.begin() as connection:
+        run_migrations(connection)
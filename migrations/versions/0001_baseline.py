@@ -0,0 +1,61 @@
+"""Baseline: the users, posts and connections tables before migrations existed
+
+Databases created before then are stamped with this revision by
+core.database.init_db and upgraded from here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("email", sa.String, nullable=False),
+        sa.Column("hashed_password", sa.String, nullable=False),
+        sa.Column("first_name", sa.String, nullable=False),
+        sa.Column("last_name", sa.String, nullable=False),
+        sa.Column("headline", sa.String),
+        sa.Column("summary", sa.Text),
+        sa.Column("location", sa.String),
+        sa.Column("profile_picture", sa.String),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "posts",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    op.create_index("ix_posts_id", "posts", ["id"])
+
+    op.create_table(
+        "connections",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("sender_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("receiver_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("status", sa.String),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    op.create_index("ix_connections_id", "connections", ["id"])
+
+def downgrade() -> None:
+    op.drop_table("connections")
+    op.drop_table("posts")
+    op.drop_table("users")
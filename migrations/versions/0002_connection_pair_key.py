@@ -0,0 +1,61 @@
+"""Canonical pair key on connections: one row per pair of users
+
+Adds user_low_id/user_high_id, fills them from sender_id/receiver_id, keeps
+one row per pair (an accepted row over a pending one over any other, then
+the oldest) and adds the unique key that connection request upserts
+conflict on.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("connections")}
+    keys = {index["name"] for index in inspector.get_indexes("connections")}
+    keys |= {constraint["name"] for constraint in inspector.get_unique_constraints("connections")}
+
+    # Databases created by create_all after the models gained the key already have it
+    added = "user_low_id" not in columns
+    if added:
+        with op.batch_alter_table("connections") as batch:
+            batch.add_column(sa.Column("user_low_id", sa.Integer))
+            batch.add_column(sa.Column("user_high_id", sa.Integer))
+    op.execute(
+        "UPDATE connections SET "
+        "user_low_id = CASE WHEN sender_id < receiver_id THEN sender_id ELSE receiver_id END, "
+        "user_high_id = CASE WHEN sender_id < receiver_id THEN receiver_id ELSE sender_id END "
+        "WHERE user_low_id IS NULL OR user_high_id IS NULL"
+    )
+
+    # A request sent both ways, or sent again after a rejection, left several rows per pair
+    op.execute(
+        "DELETE FROM connections WHERE id IN ("
+        "SELECT id FROM ("
+        "SELECT id, row_number() OVER ("
+        "PARTITION BY user_low_id, user_high_id "
+        "ORDER BY CASE status WHEN 'accepted' THEN 0 WHEN 'pending' THEN 1 ELSE 2 END, id"
+        ") AS pair_rank FROM connections"
+        ") AS ranked WHERE pair_rank > 1)"
+    )
+
+    if added:
+        with op.batch_alter_table("connections") as batch:
+            batch.alter_column("user_low_id", existing_type=sa.Integer, nullable=False)
+            batch.alter_column("user_high_id", existing_type=sa.Integer, nullable=False)
+    if "uq_connections_pair" not in keys:
+        op.create_index("uq_connections_pair", "connections", ["user_low_id", "user_high_id"], unique=True)
+
+def downgrade() -> None:
+    with op.batch_alter_table("connections") as batch:
+        batch.drop_index("uq_connections_pair")
+        batch.drop_column("user_high_id")
+        batch.drop_column("user_low_id")
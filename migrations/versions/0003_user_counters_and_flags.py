@@ -0,0 +1,72 @@
+"""Users: denormalized counters and bookkeeping flags; posts/connections: page indexes
+
+Adds the users columns the models gained after the baseline with server
+defaults, so the existing rows get values, then fills the counters from
+posts and connections in one set-based UPDATE (what `manage.py
+reconcile-counters` does in batches). Raw SQL, so updated_at is kept.
+Also adds the keyset pagination and delta sync indexes of posts and
+connections.
+
+feed_fanout_on_read starts false for everyone and the home timelines table
+starts empty: run `manage.py backfill-timelines` after upgrading.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def user_columns():
+    return [
+        sa.Column("feed_fanout_on_read", sa.Boolean, server_default=sa.false()),
+        sa.Column("suggestions_stale", sa.Boolean, server_default=sa.true()),
+        sa.Column("connections_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("posts_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("pending_requests_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("profile_version", sa.Integer, nullable=False, server_default="1"),
+    ]
+
+INDEXES = [
+    ("ix_posts_created_id", "posts", ["created_at", "id"]),
+    ("ix_posts_user_created_id", "posts", ["user_id", "created_at", "id"]),
+    ("ix_connections_sender_status_created", "connections", ["sender_id", "status", "created_at", "id"]),
+    ("ix_connections_receiver_status_created", "connections", ["receiver_id", "status", "created_at", "id"]),
+    ("ix_connections_updated_at", "connections", ["updated_at"]),
+]
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("users")}
+    # Databases created by create_all after the models gained them already have some
+    missing = [column for column in user_columns() if column.name not in existing]
+    if missing:
+        with op.batch_alter_table("users") as batch:
+            for column in missing:
+                batch.add_column(column)
+
+    if any(column.name.endswith("_count") for column in missing):
+        op.execute(
+            "UPDATE users SET "
+            "posts_count = (SELECT count(*) FROM posts WHERE posts.user_id = users.id), "
+            "connections_count = (SELECT count(*) FROM connections WHERE connections.status = 'accepted' "
+            "AND (connections.sender_id = users.id OR connections.receiver_id = users.id)), "
+            "pending_requests_count = (SELECT count(*) FROM connections WHERE connections.status = 'pending' "
+            "AND connections.receiver_id = users.id)"
+        )
+
+    for name, table, columns in INDEXES:
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    with op.batch_alter_table("users") as batch:
+        for column in reversed(user_columns()):
+            batch.drop_column(column.name)
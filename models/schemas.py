@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
+from app.config import settings
 
 # User schemas
 class UserBase(BaseModel):
@@ -31,6 +32,35 @@ class User(UserBase):
     class Config:
         from_attributes = True
 
+class UserPublic(BaseModel):
+    """A user as other members (and anonymous API callers) see them: no email or account state"""
+    id: int
+    first_name: str
+    last_name: str
+    headline: Optional[str] = ""
+    location: Optional[str] = ""
+    profile_picture: Optional[str] = ""
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class UserCounters(BaseModel):
+    connections_count: int = 0
+    posts_count: int = 0
+    pending_requests_count: int = 0
+    
+    class Config:
+        from_attributes = True
+
+class TypeaheadUser(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    headline: str = ""
+    avatar_url: str
+    connected: bool = False  # one of the viewer's connections
+
 # Post schemas
 class PostBase(BaseModel):
     content: str
@@ -43,7 +73,7 @@ class Post(PostBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
-    author: User
+    author: UserPublic
     
     class Config:
         from_attributes = True
@@ -67,18 +97,111 @@ class Connection(ConnectionBase):
     class Config:
         from_attributes = True
 
+class ConnectionsBulk(BaseModel):
+    action: Literal["send", "accept"]
+    # send: the receivers; accept: the senders, or None to accept every pending request
+    user_ids: Optional[List[int]] = Field(None, max_length=settings.CONNECTION_BULK_MAX)
+
+class ConnectionsBulkResult(BaseModel):
+    user_ids: List[int]  # requests actually sent or accepted; the rest already existed or were not pending
+
+# Messaging schemas
+class MessageCreate(BaseModel):
+    conversation_id: int
+    content: str = Field(min_length=1, max_length=settings.MESSAGE_MAX_LENGTH)
+
+class Message(BaseModel):
+    id: int
+    conversation_id: int
+    sender_id: int
+    content: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ConversationSummary(BaseModel):
+    id: int
+    other_user: User
+    last_message: Optional[Message] = None
+    updated_at: datetime
+
+# Job schemas
+Seniority = Literal["entry", "mid", "senior", "executive"]
+
+class JobBase(BaseModel):
+    title: str = Field(min_length=1, max_length=200)
+    company: str = Field(min_length=1, max_length=200)
+    location: str = Field(min_length=1, max_length=200)
+    skills: List[str] = Field(default_factory=list, max_length=30)
+    seniority: Seniority
+    remote: bool = False
+    description: str = ""
+
+class JobCreate(JobBase):
+    expires_in_days: int = Field(settings.JOB_DEFAULT_DAYS, ge=1, le=settings.JOB_MAX_DAYS)
+
+class Job(JobBase):
+    id: int
+    poster_id: int
+    created_at: datetime
+    expires_at: datetime
+    updated_at: datetime
+    
+    @field_validator("skills", mode="before")
+    @classmethod
+    def split_skills(cls, value):
+        # Stored comma-separated
+        if isinstance(value, str):
+            return [skill.strip() for skill in value.split(",") if skill.strip()]
+        return value
+    
+    class Config:
+        from_attributes = True
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+    selected: bool = False
+
 # Response schemas
 class UserProfile(BaseModel):
     user: User
     posts: List[Post]
     connections_count: int
+    posts_count: int = 0
     is_connected: bool = False
     connection_pending: bool = False
+    next_cursor: Optional[str] = None
+    profile_version: int = 0
+
+class PostCreated(BaseModel):
+    post: Post
+    html: str  # rendered feed card
 
 class FeedResponse(BaseModel):
     posts: List[Post]
     has_more: bool = False
+    next_cursor: Optional[str] = None
+
+class ConnectionsResponse(BaseModel):
+    users: List[UserPublic]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 class SearchResponse(BaseModel):
-    users: List[User]
-    total: int
\ No newline at end of file
+    users: List[UserPublic]
+    total: int
+
+class TypeaheadResponse(BaseModel):
+    query: str
+    users: List[TypeaheadUser]  # connections first
+
+class MessagesResponse(BaseModel):
+    messages: List[Message]  # oldest first
+    next_cursor: Optional[str] = None  # older messages
+
+class JobSearchResponse(BaseModel):
+    jobs: List[Job]  # newest first
+    total: int
+    facets: Dict[str, List[FacetCount]]  # location, seniority, remote; counts ignore the facet's own filter
@@ -0,0 +1,308 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.database import (
+    AsyncSessionLocal, User, Post, Connection, Conversation, Message, Job, connection_pair, get_async_engine
+)
+from core.instrumentation import instrument_service
+from core.pagination import decode_cursor, keyset_page, page_rows
+from models.schemas import (
+    UserCreate, UserUpdate, UserCounters, UserProfile, PostCreate,
+    ConversationSummary, MessageCreate, MessagesResponse, Message as MessageSchema, JobCreate, JobSearchResponse,
+    TypeaheadUser
+)
+from services.business import UserService, PostService, ConnectionService, connection_rows_query
+from services.graph import connection_ids_query, current_graph
+from services.jobs import JobService
+from services.messaging import MessageService, is_participant
+from services.projections import ProjectionService
+from services.suggestions import SuggestionService
+
+# AsyncSession counterparts of services/business.py.
+#
+# Simple lookups and pages (users by id/email, counters, recent posts, a
+# user's posts, connection checks and lists, a conversation's messages,
+# jobs by id) are written natively against the AsyncSession. Everything else runs the sync service on the async
+# connection through AsyncSession.run_sync, so that logic lives in one
+# place: writes and reads with side effects (timeline fan-out, search
+# indexing, cache invalidation), and reads built on shared sync helpers:
+# the home feed (TimelineService's push/pull merge), the profile page (the
+# one-query builder also used by the v1 API) and search (the search
+# backends and in-memory indexes take a sync Session).
+
+class _AsyncService:
+    sync_service: Callable[..., Any]
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run_sync(self, method: str, *args, **kwargs):
+        return await self.db.run_sync(
+            lambda session: getattr(self.sync_service(session), method)(*args, **kwargs)
+        )
+
+@instrument_service
+class AsyncUserService(_AsyncService):
+    sync_service = UserService
+
+    async def create_user(self, user_data: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user"""
+        return await self._run_sync("create_user", user_data, hashed_password=hashed_password)
+
+    async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+        """Update profile fields of a user"""
+        return await self._run_sync("update_user", user_id, user_data)
+
+    async def set_active(self, user_id: int, is_active: bool) -> Optional[User]:
+        """Activate or deactivate a user account"""
+        return await self._run_sync("set_active", user_id, is_active)
+
+    async def set_profile_picture(self, user_id: int, picture_key: str) -> Optional[User]:
+        """Point a user at a processed profile picture (see core.utils.avatar_url)"""
+        return await self._run_sync("set_profile_picture", user_id, picture_key)
+
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        return await self.db.scalar(select(User).where(User.email == email))
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID"""
+        return await self.db.get(User, user_id)
+
+    async def get_counters(self, user_id: int) -> Optional[UserCounters]:
+        """Get the connection, post and pending request counts of a user"""
+        row = (await self.db.execute(
+            select(User.connections_count, User.posts_count, User.pending_requests_count).where(User.id == user_id)
+        )).first()
+        return UserCounters.model_validate(row) if row else None
+
+    async def get_profile_version(self, user_id: int) -> Optional[int]:
+        """Get the profile version of a user, None if the user does not exist"""
+        return await self.db.scalar(select(User.profile_version).where(User.id == user_id))
+
+    async def get_profile(
+        self, user_id: int, viewer_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Optional[UserProfile]:
+        """Get a user's profile page as seen by viewer_id in one query"""
+        return await self._run_sync("get_profile", user_id, viewer_id=viewer_id, limit=limit, cursor=cursor)
+
+    async def search_users(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[User], int]:
+        """Search users by name or headline, best matches first, with the total match count"""
+        return await self._run_sync("search_users", query, limit=limit, offset=offset)
+
+    async def typeahead(self, query: str, viewer_id: Optional[int] = None, limit: int = 8) -> List[TypeaheadUser]:
+        """Suggest users whose names or headlines start with the typed words, viewer's connections first"""
+        return await self._run_sync("typeahead", query, viewer_id=viewer_id, limit=limit)
+
+    async def get_suggested_connections(self, user_id: int, limit: int = 10) -> List[User]:
+        """Get suggested connections for a user"""
+        return await self._run_sync("get_suggested_connections", user_id, limit=limit)
+
+    async def get_suggestions(self, user_id: int, limit: int = 10) -> List[Tuple[User, int]]:
+        """Get ranked "People you may know" suggestions with their mutual-connection counts"""
+        if self.db.info.get("read_only"):
+            # Stale suggestions are refreshed on read, which needs the write pool
+            async with AsyncSessionLocal(bind=get_async_engine()) as db:
+                return await db.run_sync(lambda session: SuggestionService(session).get(user_id, limit=limit))
+        return await self._run_sync("get_suggestions", user_id, limit=limit)
+
+@instrument_service
+class AsyncPostService(_AsyncService):
+    sync_service = PostService
+
+    async def create_post(self, post_data: PostCreate) -> Post:
+        """Create a new post"""
+        return await self._run_sync("create_post", post_data)
+
+    async def get_feed(
+        self, user_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get a page of the personalized home feed of a user"""
+        return await self._run_sync("get_feed", user_id, limit=limit, cursor=cursor)
+
+    async def get_recent_posts(
+        self, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get a page of the most recent posts across all users"""
+        rows = (await self.db.scalars(keyset_page(
+            select(Post).options(joinedload(Post.author)),
+            Post.created_at, Post.id, limit, cursor
+        ))).all()
+        return page_rows(list(rows), limit, key=lambda post: (post.created_at, post.id))
+
+    async def get_posts_by_user(
+        self, user_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get a page of posts by a specific user"""
+        rows = (await self.db.scalars(keyset_page(
+            select(Post).options(joinedload(Post.author)).where(Post.user_id == user_id),
+            Post.created_at, Post.id, limit, cursor
+        ))).all()
+        return page_rows(list(rows), limit, key=lambda post: (post.created_at, post.id))
+
+@instrument_service
+class AsyncConnectionService(_AsyncService):
+    sync_service = ConnectionService
+
+    async def send_connection_request(self, sender_id: int, receiver_id: int) -> Connection:
+        """Send a connection request"""
+        return await self._run_sync("send_connection_request", sender_id, receiver_id)
+
+    async def send_connection_requests(self, sender_id: int, receiver_ids: List[int]) -> List[int]:
+        """Send requests to many users in one transaction; returns the ids actually sent to"""
+        return await self._run_sync("send_connection_requests", sender_id, receiver_ids)
+
+    async def accept_connection_request(self, sender_id: int, receiver_id: int) -> Connection:
+        """Accept a connection request"""
+        return await self._run_sync("accept_connection_request", sender_id, receiver_id)
+
+    async def accept_connection_requests(self, receiver_id: int, sender_ids: Optional[List[int]] = None) -> List[int]:
+        """Accept pending requests, all of them or those from sender_ids, in one transaction"""
+        return await self._run_sync("accept_connection_requests", receiver_id, sender_ids)
+
+    async def get_connection_ids(self, user_id: int) -> List[int]:
+        """Ids of a user's accepted connections"""
+        return await self._run_sync("get_connection_ids", user_id)
+
+    async def are_connected(self, user1_id: int, user2_id: int) -> bool:
+        """Check if two users are connected"""
+        graph = await self.db.run_sync(current_graph)
+        if graph is not None:
+            return graph.are_connected(user1_id, user2_id)
+
+        low_id, high_id = connection_pair(user1_id, user2_id)
+        connection_id = await self.db.scalar(
+            select(Connection.id).where(
+                Connection.user_low_id == low_id,
+                Connection.user_high_id == high_id,
+                Connection.status == "accepted"
+            )
+        )
+        return connection_id is not None
+
+    async def is_connection_pending(self, sender_id: int, receiver_id: int) -> bool:
+        """Check if there's a pending connection request"""
+        graph = await self.db.run_sync(current_graph)
+        if graph is not None:
+            return graph.is_pending(sender_id, receiver_id)
+
+        connection_id = await self.db.scalar(
+            select(Connection.id).where(
+                Connection.sender_id == sender_id,
+                Connection.receiver_id == receiver_id,
+                Connection.status == "pending"
+            ).limit(1)
+        )
+        return connection_id is not None
+
+    async def get_connections(
+        self, user_id: int, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str]]:
+        """Get a page of a user's connections, most recently connected first"""
+        graph = await self.db.run_sync(current_graph)
+        other_ids = graph.connection_ids(user_id) if graph is not None else connection_ids_query(user_id)
+        rows = (await self.db.execute(connection_rows_query(user_id, other_ids, (User,), limit, cursor))).all()
+        rows, next_cursor = page_rows(rows, limit, key=lambda row: (row[-2], row[-1]))
+        return [row[0] for row in rows], next_cursor
+
+@instrument_service
+class AsyncMessageService(_AsyncService):
+    sync_service = MessageService
+
+    async def get_or_create_conversation(self, user_id: int, other_id: int) -> Conversation:
+        """The conversation between two connected users, created on first use"""
+        return await self._run_sync("get_or_create_conversation", user_id, other_id)
+
+    async def get_conversation(self, conversation_id: int, user_id: int) -> Optional[Conversation]:
+        """A conversation, or None unless user_id takes part in it"""
+        conversation = await self.db.get(Conversation, conversation_id)
+        if conversation is None or not is_participant(conversation, user_id):
+            return None
+        return conversation
+
+    async def list_conversations(self, user_id: int, limit: int = 50) -> List[ConversationSummary]:
+        """A user's conversations, most recently active first, with the other user and last message"""
+        return await self._run_sync("list_conversations", user_id, limit=limit)
+
+    async def get_messages(
+        self,
+        conversation_id: int,
+        user_id: int,
+        limit: int = 30,
+        cursor: Optional[str] = None,
+        after_id: Optional[int] = None
+    ) -> Optional[MessagesResponse]:
+        """A page of a conversation, oldest first; None unless user_id takes part in it"""
+        if await self.get_conversation(conversation_id, user_id) is None:
+            return None
+
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if after_id is not None:
+            rows = (await self.db.scalars(query.where(Message.id > after_id).order_by(Message.id).limit(limit))).all()
+            return MessagesResponse(messages=[MessageSchema.model_validate(row) for row in rows])
+
+        if cursor:
+            query = query.where(Message.id < decode_cursor(cursor)[1])
+        rows = (await self.db.scalars(query.order_by(Message.id.desc()).limit(limit + 1))).all()
+        rows, next_cursor = page_rows(list(rows), limit, key=lambda row: (row.created_at, row.id))
+        return MessagesResponse(
+            messages=[MessageSchema.model_validate(row) for row in reversed(rows)],
+            next_cursor=next_cursor
+        )
+
+    async def send_message(self, sender_id: int, message_data: MessageCreate) -> Tuple[MessageSchema, List[int]]:
+        """Store a message; returns it with the ids of the conversation's participants"""
+        return await self._run_sync("send_message", sender_id, message_data)
+
+@instrument_service
+class AsyncJobService(_AsyncService):
+    sync_service = JobService
+
+    async def create_job(self, poster_id: int, job_data: JobCreate) -> Job:
+        """Post a job, open for job_data.expires_in_days"""
+        return await self._run_sync("create_job", poster_id, job_data)
+
+    async def close_job(self, job_id: int, poster_id: int) -> Optional[Job]:
+        """Expire a posting now; None unless it is an open posting of poster_id"""
+        return await self._run_sync("close_job", job_id, poster_id)
+
+    async def get_job(self, job_id: int) -> Optional[Job]:
+        """Get a posting by id, open or not"""
+        return await self.db.get(Job, job_id)
+
+    async def search_jobs(
+        self, query: str = "", filters: Optional[Dict[str, str]] = None, limit: int = 20, offset: int = 0
+    ) -> JobSearchResponse:
+        """Open postings matching every keyword and the facet filters, newest first, with facet counts"""
+        # Expiry and delta sync of the index read through the sync session
+        return await self._run_sync("search_jobs", query, filters, limit=limit, offset=offset)
+
+@instrument_service
+class AsyncProjectionService(_AsyncService):
+    sync_service = ProjectionService
+
+    # The projections reuse the sync services' statements (timeline merge, graph lookups, search backends)
+
+    async def get_feed(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of a user's home timeline"""
+        return await self._run_sync("get_feed", user_id, limit=limit, cursor=cursor)
+
+    async def get_user_posts(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of posts by one user"""
+        return await self._run_sync("get_user_posts", user_id, limit=limit, cursor=cursor)
+
+    async def get_profile(
+        self, user_id: int, viewer_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """A user's profile as seen by viewer_id: the user, a page of their posts and the relationship"""
+        return await self._run_sync("get_profile", user_id, viewer_id=viewer_id, limit=limit, cursor=cursor)
+
+    async def get_network(self, user_id: int, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of a user's connections, most recent first, with their counters"""
+        return await self._run_sync("get_network", user_id, limit=limit, cursor=cursor)
+
+    async def search_users(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """A page of users matching a search, best first, with the total match count"""
+        return await self._run_sync("search_users", query, limit=limit, offset=offset)
@@ -1,19 +1,31 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, select, update
+from typing import Any, List, Optional, Sequence, Tuple
 from datetime import datetime
 
-from core.database import User, Post, Connection
-from core.security import get_password_hash, verify_password
-from models.schemas import UserCreate, PostCreate
+from core.database import SessionLocal, User, Post, Connection, after_commit, connection_pair, insert_ignore
+from core.security import get_password_hash, verify_password, auth_cache
+from core.instrumentation import instrument_service
+from core.pagination import keyset_page, page_rows
+from core.utils import avatar_url
+from models.schemas import UserCreate, UserUpdate, UserCounters, UserProfile, PostCreate, TypeaheadUser
+from services.counters import CounterService
+from services.graph import connection_ids, connection_ids_query, current_graph, get_graph
+from services.profile import ProfileService
+from services.search import current_search_backend, get_search_backend
+from services.suggestions import SuggestionService
+from services.timeline import TimelineService
+from services.typeahead import current_typeahead, on_user_changed
 
+@instrument_service
 class UserService:
     def __init__(self, db: Session):
         self.db = db
     
-    def create_user(self, user_data: UserCreate) -> User:
-        """Create a new user"""
-        hashed_password = get_password_hash(user_data.password)
+    def create_user(self, user_data: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user; pass hashed_password if it was hashed elsewhere"""
+        if hashed_password is None:
+            hashed_password = get_password_hash(user_data.password)
         
         db_user = User(
             email=user_data.email,
@@ -24,10 +36,62 @@ class UserService:
         )
         
         self.db.add(db_user)
+        self.db.flush()
+        get_search_backend().index_user(self.db, db_user)
+        on_user_changed(self.db, db_user)
         self.db.commit()
         self.db.refresh(db_user)
         return db_user
     
+    def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+        """Update profile fields of a user"""
+        db_user = self.get_user_by_id(user_id)
+        if not db_user:
+            return None
+        
+        for field, value in user_data.model_dump(exclude_unset=True).items():
+            setattr(db_user, field, value)
+        
+        self.db.flush()
+        ProfileService(self.db).touch(user_id)
+        get_search_backend().index_user(self.db, db_user)
+        on_user_changed(self.db, db_user)
+        self.db.commit()
+        auth_cache.invalidate_user(user_id)
+        self.db.refresh(db_user)
+        return db_user
+    
+    def set_active(self, user_id: int, is_active: bool) -> Optional[User]:
+        """Activate or deactivate a user account"""
+        db_user = self.get_user_by_id(user_id)
+        if not db_user:
+            return None
+        
+        db_user.is_active = is_active
+        self.db.flush()
+        ProfileService(self.db).touch(user_id)
+        get_search_backend().index_user(self.db, db_user)
+        on_user_changed(self.db, db_user)
+        self.db.commit()
+        auth_cache.invalidate_user(user_id)
+        self.db.refresh(db_user)
+        return db_user
+    
+    def set_profile_picture(self, user_id: int, picture_key: str) -> Optional[User]:
+        """Point a user at a processed profile picture (see core.utils.avatar_url)"""
+        db_user = self.get_user_by_id(user_id)
+        if not db_user:
+            return None
+        
+        db_user.profile_picture = picture_key
+        self.db.flush()
+        ProfileService(self.db).touch(user_id)
+        on_user_changed(self.db, db_user)
+        self.db.commit()
+        auth_cache.invalidate_user(user_id)
+        self.db.refresh(db_user)
+        return db_user
+    
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         return self.db.query(User).filter(User.email == email).first()
@@ -39,63 +103,153 @@ class UserService:
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
         user = self.get_user_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not user.is_active or not verify_password(password, user.hashed_password):
             return None
         return user
     
-    def search_users(self, query: str, limit: int = 20) -> List[User]:
-        """Search users by name or headline"""
-        return self.db.query(User).filter(
-            or_(
-                User.first_name.ilike(f"%{query}%"),
-                User.last_name.ilike(f"%{query}%"),
-                User.headline.ilike(f"%{query}%")
+    def search_users(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[User], int]:
+        """Search users by name or headline, best matches first, with the total match count"""
+        user_ids, total = current_search_backend(self.db).search(self.db, query, limit=limit, offset=offset)
+        if not user_ids:
+            return [], total
+        
+        users = {user.id: user for user in self.db.query(User).filter(User.id.in_(user_ids))}
+        return [users[user_id] for user_id in user_ids if user_id in users], total
+    
+    def typeahead(self, query: str, viewer_id: Optional[int] = None, limit: int = 8) -> List[TypeaheadUser]:
+        """Suggest users whose names or headlines start with the typed words, viewer's connections first"""
+        boost_ids = connection_ids(self.db, viewer_id) if viewer_id else ()
+        # One extra in case the viewer is among the matches
+        matches = current_typeahead(self.db).search(query, boost_ids, limit + 1)
+        return [
+            TypeaheadUser(
+                id=entry.id,
+                first_name=entry.first_name,
+                last_name=entry.last_name,
+                headline=entry.headline,
+                avatar_url=avatar_url(entry),
+                connected=connected
             )
-        ).limit(limit).all()
+            for entry, connected in matches if entry.id != viewer_id
+        ][:limit]
+    
+    def get_counters(self, user_id: int) -> Optional[UserCounters]:
+        """Get the connection, post and pending request counts of a user"""
+        row = self.db.query(
+            User.connections_count, User.posts_count, User.pending_requests_count
+        ).filter(User.id == user_id).first()
+        return UserCounters.model_validate(row) if row else None
+    
+    def get_profile_version(self, user_id: int) -> Optional[int]:
+        """Get the profile version of a user, None if the user does not exist"""
+        return ProfileService(self.db).get_version(user_id)
+    
+    def get_profile(
+        self, user_id: int, viewer_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Optional[UserProfile]:
+        """Get a user's profile page as seen by viewer_id in one query"""
+        return ProfileService(self.db).get_profile(user_id, viewer_id=viewer_id, limit=limit, cursor=cursor)
     
     def get_suggested_connections(self, user_id: int, limit: int = 10) -> List[User]:
         """Get suggested connections for a user"""
-        # Get users that are not connected and not the current user
-        connected_user_ids = self.db.query(Connection.receiver_id).filter(
-            Connection.sender_id == user_id,
-            Connection.status == "accepted"
-        ).union(
-            self.db.query(Connection.sender_id).filter(
-                Connection.receiver_id == user_id,
-                Connection.status == "accepted"
-            )
-        ).subquery()
-        
-        return self.db.query(User).filter(
-            User.id != user_id,
-            ~User.id.in_(connected_user_ids)
-        ).limit(limit).all()
+        return [user for user, _ in self.get_suggestions(user_id, limit=limit)]
+    
+    def get_suggestions(self, user_id: int, limit: int = 10) -> List[Tuple[User, int]]:
+        """Get ranked "People you may know" suggestions with their mutual-connection counts"""
+        if self.db.info.get("read_only"):
+            # Stale suggestions are refreshed on read, which needs the write pool
+            with SessionLocal() as db:
+                return SuggestionService(db).get(user_id, limit=limit)
+        return SuggestionService(self.db).get(user_id, limit=limit)
 
+@instrument_service
 class PostService:
     def __init__(self, db: Session):
         self.db = db
     
     def create_post(self, post_data: PostCreate) -> Post:
         """Create a new post"""
+        db_post = self.stage_post(post_data)
+        self.db.commit()
+        self.db.refresh(db_post)
+        db_post.author  # loaded here so callers can render the post after the session is gone
+        return db_post
+    
+    def stage_post(self, post_data: PostCreate) -> Post:
+        """Add a post and its side effects to the current transaction without committing"""
         db_post = Post(
             content=post_data.content,
             user_id=post_data.user_id
         )
         
         self.db.add(db_post)
-        self.db.commit()
-        self.db.refresh(db_post)
+        self.db.flush()
+        
+        # Push into the author's and their connections' timelines in the same transaction
+        TimelineService(self.db).fan_out(db_post)
+        CounterService(self.db).adjust(post_data.user_id, posts_count=1)
+        ProfileService(self.db).touch(post_data.user_id)
+        db_post.author  # queued writes return the post from a session that is closed after the commit
         return db_post
     
-    def get_recent_posts(self, limit: int = 20) -> List[Post]:
-        """Get recent posts for feed"""
-        return self.db.query(Post).order_by(desc(Post.created_at)).limit(limit).all()
+    def get_feed(
+        self, user_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get a page of the personalized home feed of a user"""
+        return TimelineService(self.db).get_timeline(user_id, limit=limit, cursor=cursor)
+    
+    def get_recent_posts(
+        self, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get a page of the most recent posts across all users"""
+        rows = keyset_page(
+            self.db.query(Post).options(joinedload(Post.author)),
+            Post.created_at, Post.id, limit, cursor
+        ).all()
+        return page_rows(rows, limit, key=lambda post: (post.created_at, post.id))
     
-    def get_posts_by_user(self, user_id: int, limit: int = 20) -> List[Post]:
-        """Get posts by a specific user"""
-        return self.db.query(Post).filter(
-            Post.user_id == user_id
-        ).order_by(desc(Post.created_at)).limit(limit).all()
+    def get_posts_by_user(
+        self, user_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get a page of posts by a specific user"""
+        rows = keyset_page(
+            self.db.query(Post).options(joinedload(Post.author)).filter(Post.user_id == user_id),
+            Post.created_at, Post.id, limit, cursor
+        ).all()
+        return page_rows(rows, limit, key=lambda post: (post.created_at, post.id))
+    
+    def get_post_rows_by_user(
+        self, user_id: int, columns: Sequence[Any], limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Like get_posts_by_user, but rows of the given Post and author columns (including Post.id and created_at)"""
+        rows = keyset_page(
+            self.db.query(*columns).select_from(Post).join(User, User.id == Post.user_id).filter(
+                Post.user_id == user_id
+            ),
+            Post.created_at, Post.id, limit, cursor
+        ).all()
+        return page_rows(rows, limit, key=lambda row: (row.created_at, row.id))
+
+@instrument_service
+def connection_rows_query(
+    user_id: int, other_ids: Any, columns: Sequence[Any], limit: int, cursor: Optional[str] = None
+):
+    """A page of a user's connections among other_ids (a list or a select), most recently accepted first"""
+    # Each other user meets the connection row through the canonical pair key
+    low_id = case((User.id < user_id, User.id), else_=user_id)
+    high_id = case((User.id < user_id, user_id), else_=User.id)
+    return keyset_page(
+        select(
+            *columns, Connection.updated_at.label("connected_at"), Connection.id.label("connection_id")
+        ).join(
+            Connection, and_(Connection.user_low_id == low_id, Connection.user_high_id == high_id)
+        ).where(
+            User.id.in_(other_ids),
+            Connection.status == "accepted"
+        ),
+        # Accepting a request is the connection row's last update
+        Connection.updated_at, Connection.id, limit, cursor
+    )
 
 class ConnectionService:
     def __init__(self, db: Session):
@@ -103,53 +257,140 @@ class ConnectionService:
     
     def send_connection_request(self, sender_id: int, receiver_id: int) -> Connection:
         """Send a connection request"""
-        # Check if connection already exists
-        existing = self.db.query(Connection).filter(
-            or_(
-                and_(Connection.sender_id == sender_id, Connection.receiver_id == receiver_id),
-                and_(Connection.sender_id == receiver_id, Connection.receiver_id == sender_id)
-            )
+        connection = self.stage_connection_request(sender_id, receiver_id)
+        self.db.commit()
+        self.db.refresh(connection)
+        return connection
+    
+    def stage_connection_request(self, sender_id: int, receiver_id: int) -> Connection:
+        """Add a connection request to the current transaction without committing"""
+        # One statement: the canonical pair key rejects a request in either direction
+        connection = self.db.scalars(
+            insert_ignore(self.db, Connection)
+            .values(sender_id=sender_id, receiver_id=receiver_id, status="pending")
+            .returning(Connection)
         ).first()
         
-        if existing:
+        if connection is None:
             raise ValueError("Connection already exists")
         
-        connection = Connection(
-            sender_id=sender_id,
-            receiver_id=receiver_id,
-            status="pending"
-        )
+        self._requested(sender_id, [receiver_id])
+        return connection
+    
+    def send_connection_requests(self, sender_id: int, receiver_ids: List[int]) -> List[int]:
+        """Send requests to many users in one transaction; returns the ids actually sent to"""
+        receiver_ids = set(receiver_ids) - {sender_id}
+        if not receiver_ids:
+            return []
+        receiver_ids = self.db.scalars(select(User.id).where(User.id.in_(receiver_ids)).order_by(User.id)).all()
+        
+        # Pairs that already have a row in either direction are skipped by the pair key
+        sent = self.db.scalars(
+            insert_ignore(self.db, Connection).returning(Connection.receiver_id),
+            [{"sender_id": sender_id, "receiver_id": receiver_id, "status": "pending"} for receiver_id in receiver_ids]
+        ).all()
         
-        self.db.add(connection)
+        self._requested(sender_id, sent)
         self.db.commit()
-        self.db.refresh(connection)
-        return connection
+        return sent
+    
+    def _requested(self, sender_id: int, receiver_ids: List[int]) -> None:
+        counter_service = CounterService(self.db)
+        suggestion_service = SuggestionService(self.db)
+        for receiver_id in receiver_ids:
+            counter_service.adjust(receiver_id, pending_requests_count=1)
+            suggestion_service.on_request(sender_id, receiver_id)
+        if receiver_ids:
+            ProfileService(self.db).touch(sender_id, *receiver_ids)
+        self._apply_to_graph([(sender_id, receiver_id) for receiver_id in receiver_ids], "pending")
     
     def accept_connection_request(self, sender_id: int, receiver_id: int) -> Connection:
         """Accept a connection request"""
-        connection = self.db.query(Connection).filter(
-            Connection.sender_id == sender_id,
-            Connection.receiver_id == receiver_id,
-            Connection.status == "pending"
+        connection = self.stage_connection_acceptance(sender_id, receiver_id)
+        self.db.commit()
+        self.db.refresh(connection)
+        return connection
+    
+    def stage_connection_acceptance(self, sender_id: int, receiver_id: int) -> Connection:
+        """Add the acceptance of a connection request to the current transaction without committing"""
+        # One conditional UPDATE; no row back means there was no pending request to accept
+        connection = self.db.scalars(
+            update(Connection)
+            .where(
+                Connection.sender_id == sender_id,
+                Connection.receiver_id == receiver_id,
+                Connection.status == "pending"
+            )
+            .values(status="accepted", updated_at=datetime.utcnow())
+            .returning(Connection)
         ).first()
         
-        if not connection:
+        if connection is None:
             raise ValueError("Connection request not found")
         
-        connection.status = "accepted"
-        connection.updated_at = datetime.utcnow()
+        self._accepted(receiver_id, [sender_id])
+        return connection
+    
+    def accept_connection_requests(self, receiver_id: int, sender_ids: Optional[List[int]] = None) -> List[int]:
+        """Accept pending requests, all of them or those from sender_ids, in one transaction"""
+        query = update(Connection).where(Connection.receiver_id == receiver_id, Connection.status == "pending")
+        if sender_ids is not None:
+            if not sender_ids:
+                return []
+            query = query.where(Connection.sender_id.in_(sender_ids))
+        
+        accepted = self.db.scalars(
+            query.values(status="accepted", updated_at=datetime.utcnow()).returning(Connection.sender_id)
+        ).all()
         
+        self._accepted(receiver_id, accepted)
         self.db.commit()
-        self.db.refresh(connection)
-        return connection
+        return accepted
+    
+    def _accepted(self, receiver_id: int, sender_ids: List[int]) -> None:
+        if not sender_ids:
+            return
+        
+        # Each side's timeline starts with the other's recent posts
+        timeline_service = TimelineService(self.db)
+        counter_service = CounterService(self.db)
+        suggestion_service = SuggestionService(self.db)
+        for sender_id in sender_ids:
+            timeline_service.seed(receiver_id, sender_id)
+            timeline_service.seed(sender_id, receiver_id)
+            counter_service.adjust(sender_id, connections_count=1)
+            
+            # Both neighbourhoods changed: their suggestions are recomputed on next read
+            suggestion_service.on_connected(sender_id, receiver_id)
+        
+        accepted = len(sender_ids)
+        counter_service.adjust(receiver_id, connections_count=accepted, pending_requests_count=-accepted)
+        ProfileService(self.db).touch(receiver_id, *sender_ids)
+        self._apply_to_graph([(sender_id, receiver_id) for sender_id in sender_ids], "accepted")
+    
+    def _apply_to_graph(self, pairs: List[Tuple[int, int]], status: str) -> None:
+        # Applied once the rows are committed; no sync here, it would read uncommitted rows
+        graph = get_graph()
+        if graph.loaded and pairs:
+            def apply() -> None:
+                for sender_id, receiver_id in pairs:
+                    graph.apply(sender_id, receiver_id, status)
+            after_commit(self.db, apply)
+    
+    def get_connection_ids(self, user_id: int) -> List[int]:
+        """Ids of a user's accepted connections"""
+        return connection_ids(self.db, user_id)
     
     def are_connected(self, user1_id: int, user2_id: int) -> bool:
         """Check if two users are connected"""
+        graph = current_graph(self.db)
+        if graph is not None:
+            return graph.are_connected(user1_id, user2_id)
+        
+        low_id, high_id = connection_pair(user1_id, user2_id)
         connection = self.db.query(Connection).filter(
-            or_(
-                and_(Connection.sender_id == user1_id, Connection.receiver_id == user2_id),
-                and_(Connection.sender_id == user2_id, Connection.receiver_id == user1_id)
-            ),
+            Connection.user_low_id == low_id,
+            Connection.user_high_id == high_id,
             Connection.status == "accepted"
         ).first()
         
@@ -157,6 +398,10 @@ class ConnectionService:
     
     def is_connection_pending(self, sender_id: int, receiver_id: int) -> bool:
         """Check if there's a pending connection request"""
+        graph = current_graph(self.db)
+        if graph is not None:
+            return graph.is_pending(sender_id, receiver_id)
+        
         connection = self.db.query(Connection).filter(
             Connection.sender_id == sender_id,
             Connection.receiver_id == receiver_id,
@@ -165,23 +410,18 @@ class ConnectionService:
         
         return connection is not None
     
-    def get_connections(self, user_id: int) -> List[User]:
-        """Get all connections for a user"""
-        # Get accepted connections where user is sender
-        sender_connections = self.db.query(User).join(
-            Connection, User.id == Connection.receiver_id
-        ).filter(
-            Connection.sender_id == user_id,
-            Connection.status == "accepted"
-        )
-        
-        # Get accepted connections where user is receiver
-        receiver_connections = self.db.query(User).join(
-            Connection, User.id == Connection.sender_id
-        ).filter(
-            Connection.receiver_id == user_id,
-            Connection.status == "accepted"
-        )
-        
-        # Combine and return
-        return sender_connections.union(receiver_connections).all()
\ No newline at end of file
+    def get_connections(
+        self, user_id: int, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[User], Optional[str]]:
+        """Get a page of a user's connections, most recently connected first"""
+        rows, next_cursor = self.get_connection_rows(user_id, (User,), limit=limit, cursor=cursor)
+        return [row[0] for row in rows], next_cursor
+    
+    def get_connection_rows(
+        self, user_id: int, columns: Sequence[Any], limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Like get_connections, but rows of the given User columns followed by connected_at and connection_id"""
+        graph = current_graph(self.db)
+        other_ids = graph.connection_ids(user_id) if graph is not None else connection_ids_query(user_id)
+        rows = self.db.execute(connection_rows_query(user_id, other_ids, columns, limit, cursor)).all()
+        return page_rows(rows, limit, key=lambda row: (row[-2], row[-1]))
@@ -0,0 +1,96 @@
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from core.database import User, Post, Connection
+
+COUNTER_FIELDS = ("connections_count", "posts_count", "pending_requests_count")
+
+class CounterService:
+    """Denormalized per-user counters.
+
+    Services adjust the counters with relative UPDATEs in the same
+    transaction as the row they count, so concurrent writers never lose an
+    increment. reconcile() recounts from the source tables to repair drift
+    left by bulk imports, manual edits or bugs.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def adjust(self, user_id: int, **deltas: int) -> None:
+        """Add deltas to a user's counters, e.g. adjust(user_id, posts_count=1)"""
+        values = {}
+        for field, delta in deltas.items():
+            if field not in COUNTER_FIELDS:
+                raise ValueError(f"Unknown counter: {field}")
+            if delta:
+                values[field] = getattr(User, field) + delta
+        if values:
+            # Bookkeeping, not a profile change: keep updated_at, which keys the fragment
+            # cache and drives the in-memory indexes' delta syncs
+            self.db.execute(
+                update(User).where(User.id == user_id).values(**values, updated_at=User.updated_at)
+            )
+
+    def recount(self, user_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """Actual counter values of the given users, read from the source tables"""
+        counts = {user_id: dict.fromkeys(COUNTER_FIELDS, 0) for user_id in user_ids}
+        if not user_ids:
+            return counts
+
+        for user_id, count in self.db.execute(
+            select(Post.user_id, func.count()).where(Post.user_id.in_(user_ids)).group_by(Post.user_id)
+        ):
+            counts[user_id]["posts_count"] = count
+
+        for column in (Connection.sender_id, Connection.receiver_id):
+            for user_id, count in self.db.execute(
+                select(column, func.count()).where(
+                    column.in_(user_ids), Connection.status == "accepted"
+                ).group_by(column)
+            ):
+                counts[user_id]["connections_count"] += count
+
+        for user_id, count in self.db.execute(
+            select(Connection.receiver_id, func.count()).where(
+                Connection.receiver_id.in_(user_ids), Connection.status == "pending"
+            ).group_by(Connection.receiver_id)
+        ):
+            counts[user_id]["pending_requests_count"] = count
+
+        return counts
+
+    def reconcile(
+        self, batch_size: int = 1000, progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Recount every user's counters, writing only the rows that drifted; returns rows repaired"""
+        total = self.db.scalar(select(func.count()).select_from(User))
+        done = 0
+        repaired = 0
+        last_id = 0
+        while True:
+            rows = self.db.execute(
+                select(User.id, User.updated_at, *(getattr(User, field) for field in COUNTER_FIELDS)).where(
+                    User.id > last_id
+                ).order_by(User.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            actual = self.recount([row.id for row in rows])
+            fixes = [
+                {"id": row.id, "updated_at": row.updated_at, **actual[row.id]}
+                for row in rows
+                if any(getattr(row, field) != actual[row.id][field] for field in COUNTER_FIELDS)
+            ]
+            if fixes:
+                self.db.execute(update(User), fixes)
+            self.db.commit()
+
+            repaired += len(fixes)
+            done += len(rows)
+            last_id = rows[-1].id
+            if progress:
+                progress(done, total)
+        return repaired
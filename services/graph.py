@@ -0,0 +1,196 @@
+import bisect
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.database import Connection, SyncWatermark
+from app.config import settings
+
+def _insert(adjacency: Dict[int, array], user_id: int, other_id: int) -> None:
+    ids = adjacency.get(user_id)
+    if ids is None:
+        adjacency[user_id] = array("l", [other_id])
+        return
+    index = bisect.bisect_left(ids, other_id)
+    if index == len(ids) or ids[index] != other_id:
+        ids.insert(index, other_id)
+
+def _remove(adjacency: Dict[int, array], user_id: int, other_id: int) -> None:
+    ids = adjacency.get(user_id)
+    if ids is None:
+        return
+    index = bisect.bisect_left(ids, other_id)
+    if index < len(ids) and ids[index] == other_id:
+        del ids[index]
+        if not ids:
+            del adjacency[user_id]
+
+def _contains(ids: Optional[array], other_id: int) -> bool:
+    if not ids:
+        return False
+    index = bisect.bisect_left(ids, other_id)
+    return index < len(ids) and ids[index] == other_id
+
+class SocialGraph:
+    """In-memory adjacency index of the connections table.
+
+    Keeps one sorted integer array per user for accepted connections and for
+    pending requests in each direction, so membership checks are a binary
+    search and neighbour lists are a copy. The database stays the source of
+    truth: writes made by this process are applied as they commit, and rows
+    changed elsewhere (other workers, imports) are picked up by a periodic
+    delta sync on Connection.updated_at.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._connected: Dict[int, array] = {}
+        self._pending_out: Dict[int, array] = {}
+        self._pending_in: Dict[int, array] = {}
+        self._watermark = SyncWatermark()
+        self._next_sync = 0.0
+        self.loaded = False
+
+    def load(self, db: Session, batch_size: int = 50000) -> int:
+        """(Re)build the index from the connections table"""
+        connected: Dict[int, List[int]] = {}
+        pending_out: Dict[int, List[int]] = {}
+        pending_in: Dict[int, List[int]] = {}
+        watermark = None
+        count = 0
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(
+                    Connection.id, Connection.sender_id, Connection.receiver_id,
+                    Connection.status, Connection.updated_at
+                ).where(Connection.id > last_id).order_by(Connection.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                if row.status == "accepted":
+                    connected.setdefault(row.sender_id, []).append(row.receiver_id)
+                    connected.setdefault(row.receiver_id, []).append(row.sender_id)
+                elif row.status == "pending":
+                    pending_out.setdefault(row.sender_id, []).append(row.receiver_id)
+                    pending_in.setdefault(row.receiver_id, []).append(row.sender_id)
+                if row.updated_at and (watermark is None or row.updated_at > watermark):
+                    watermark = row.updated_at
+            count += len(rows)
+            last_id = rows[-1].id
+
+        def pack(adjacency: Dict[int, List[int]]) -> Dict[int, array]:
+            return {user_id: array("l", sorted(set(ids))) for user_id, ids in adjacency.items()}
+
+        with self._lock:
+            self._connected = pack(connected)
+            self._pending_out = pack(pending_out)
+            self._pending_in = pack(pending_in)
+            self._watermark.reset(watermark)
+            self._next_sync = time.monotonic() + settings.GRAPH_SYNC_INTERVAL
+            self.loaded = True
+        return count
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Apply connection rows changed since the last load/sync; rate limited unless forced"""
+        if not self.loaded or (not force and time.monotonic() < self._next_sync):
+            return 0
+        self._next_sync = time.monotonic() + settings.GRAPH_SYNC_INTERVAL
+
+        query = select(
+            Connection.id, Connection.sender_id, Connection.receiver_id, Connection.status, Connection.updated_at
+        )
+        since = self._watermark.since()
+        if since is not None:
+            query = query.where(Connection.updated_at >= since)
+        applied = 0
+        for row in db.execute(query).all():
+            with self._lock:
+                if not self._watermark.fresh(row.id, row.updated_at):
+                    continue
+            self.apply(row.sender_id, row.receiver_id, row.status)
+            applied += 1
+        with self._lock:
+            self._watermark.prune()
+        return applied
+
+    def apply(self, sender_id: int, receiver_id: int, status: str) -> None:
+        """Record the current status of a sender -> receiver connection row"""
+        with self._lock:
+            _remove(self._pending_out, sender_id, receiver_id)
+            _remove(self._pending_in, receiver_id, sender_id)
+            if status == "accepted":
+                _insert(self._connected, sender_id, receiver_id)
+                _insert(self._connected, receiver_id, sender_id)
+            else:
+                _remove(self._connected, sender_id, receiver_id)
+                _remove(self._connected, receiver_id, sender_id)
+                if status == "pending":
+                    _insert(self._pending_out, sender_id, receiver_id)
+                    _insert(self._pending_in, receiver_id, sender_id)
+
+    def are_connected(self, user1_id: int, user2_id: int) -> bool:
+        with self._lock:
+            # Binary search the smaller of the two adjacency arrays
+            ids1 = self._connected.get(user1_id)
+            ids2 = self._connected.get(user2_id)
+            if ids1 is not None and (ids2 is None or len(ids1) <= len(ids2)):
+                return _contains(ids1, user2_id)
+            return _contains(ids2, user1_id)
+
+    def is_pending(self, sender_id: int, receiver_id: int) -> bool:
+        with self._lock:
+            return _contains(self._pending_out.get(sender_id), receiver_id)
+
+    def connection_ids(self, user_id: int) -> List[int]:
+        with self._lock:
+            return self._connected.get(user_id, array("l")).tolist()
+
+    def pending_in_ids(self, user_id: int) -> List[int]:
+        with self._lock:
+            return self._pending_in.get(user_id, array("l")).tolist()
+
+    def degree(self, user_id: int) -> int:
+        with self._lock:
+            return len(self._connected.get(user_id, ()))
+
+_graph = SocialGraph()
+
+def get_graph() -> SocialGraph:
+    """The process-wide graph index; check .loaded before trusting it"""
+    return _graph
+
+def init_graph(db: Session) -> SocialGraph:
+    """Load the graph index at startup"""
+    _graph.load(db)
+    return _graph
+
+def current_graph(db: Session) -> Optional[SocialGraph]:
+    """The graph index brought up to date with the database, or None when it is not loaded"""
+    if not _graph.loaded:
+        return None
+    _graph.sync(db)
+    return _graph
+
+def connection_ids_query(user_id: int):
+    """A select of the ids of a user's accepted connections, for when the index is not loaded"""
+    sent = select(Connection.receiver_id).where(
+        Connection.sender_id == user_id,
+        Connection.status == "accepted"
+    )
+    received = select(Connection.sender_id).where(
+        Connection.receiver_id == user_id,
+        Connection.status == "accepted"
+    )
+    return sent.union_all(received)
+
+def connection_ids(db: Session, user_id: int) -> List[int]:
+    """Ids of a user's accepted connections, from the index when loaded"""
+    graph = current_graph(db)
+    if graph is not None:
+        return graph.connection_ids(user_id)
+    return list(db.scalars(connection_ids_query(user_id)))
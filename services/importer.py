@@ -0,0 +1,233 @@
+import csv
+import json
+import os
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from core.database import User, Post, Connection, ImportCheckpoint, insert_ignore
+from core.security import get_password_hash
+
+IMPORT_KINDS = ("users", "posts", "connections")
+CONNECTION_STATUSES = ("pending", "accepted")
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream records from a CSV (header row) or NDJSON file"""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "ndjson":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unknown import format: {fmt}")
+
+def _parse_datetime(value: Any, default: datetime) -> datetime:
+    if not value:
+        return default
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+
+def _batches(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+class BulkImporter:
+    """Stream users, posts and connections from CSV/NDJSON into the database.
+
+    Records are inserted in batches with executemany-style INSERTs; each
+    batch commits together with the source's ImportCheckpoint row, so an
+    interrupted import resumes after the last committed batch when rerun.
+    Plain-text passwords are bcrypt-hashed across a process pool. Posts and
+    connections reference users by email.
+
+    Imported rows bypass the per-request services: counters, profile
+    versions and suggestion staleness are adjusted per batch, while home
+    timelines and the search index are rebuilt by the management commands
+    afterwards (backfill-timelines, reindex-search).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = 1000,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[int, Optional[int]], None]] = None
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self.skipped = 0
+
+    def run(self, kind: str, path: str, fmt: Optional[str] = None) -> int:
+        """Import one source file of the given kind; returns records processed in this run"""
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        handler = getattr(self, f"_import_{kind}")
+        source = f"{kind}:{os.path.abspath(path)}"
+
+        checkpoint = self.db.get(ImportCheckpoint, source)
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(source=source, records_done=0)
+            self.db.add(checkpoint)
+            self.db.commit()
+        resume_from = checkpoint.records_done
+
+        records = islice(read_records(path, fmt), resume_from, None)
+        done = resume_from
+        pool = ProcessPoolExecutor(max_workers=self.workers) if kind == "users" else None
+        try:
+            for batch in _batches(records, self.batch_size):
+                handler(batch, pool)
+                done += len(batch)
+                checkpoint.records_done = done
+                self.db.commit()
+                if self.progress:
+                    self.progress(done, None)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return done - resume_from
+
+    def _import_users(self, batch: List[Dict[str, Any]], pool: Executor) -> None:
+        now = datetime.utcnow()
+        rows = []
+        plain_passwords: List[Tuple[int, str]] = []
+        for record in batch:
+            if not record.get("email") or not record.get("first_name") or not record.get("last_name"):
+                self.skipped += 1
+                continue
+            hashed_password = record.get("hashed_password")
+            if not hashed_password:
+                if not record.get("password"):
+                    self.skipped += 1
+                    continue
+                plain_passwords.append((len(rows), record["password"]))
+            rows.append({
+                "email": record["email"].strip(),
+                "hashed_password": hashed_password,
+                "first_name": record["first_name"],
+                "last_name": record["last_name"],
+                "headline": record.get("headline") or "",
+                "summary": record.get("summary") or "",
+                "location": record.get("location") or "",
+                "is_active": True,
+                "created_at": _parse_datetime(record.get("created_at"), now),
+                "updated_at": now,
+            })
+
+        # bcrypt is CPU bound: spread it across processes, not threads
+        chunksize = max(1, len(plain_passwords) // (self.workers * 4))
+        hashes = pool.map(get_password_hash, [password for _, password in plain_passwords], chunksize=chunksize)
+        for (index, _), hashed_password in zip(plain_passwords, hashes):
+            rows[index]["hashed_password"] = hashed_password
+
+        if rows:
+            # Emails already present (earlier runs, existing members) are left untouched
+            self.db.execute(insert_ignore(self.db, User), rows)
+
+    def _import_posts(self, batch: List[Dict[str, Any]], pool: None) -> None:
+        now = datetime.utcnow()
+        user_ids = self._user_ids(record.get("author_email") for record in batch)
+        rows = []
+        for record in batch:
+            user_id = user_ids.get((record.get("author_email") or "").strip())
+            if user_id is None or not record.get("content"):
+                self.skipped += 1
+                continue
+            created_at = _parse_datetime(record.get("created_at"), now)
+            rows.append({"content": record["content"], "user_id": user_id, "created_at": created_at, "updated_at": now})
+
+        if rows:
+            self.db.execute(insert(Post), rows)
+            authors = Counter(row["user_id"] for row in rows)
+            self._adjust_users(authors, "posts_count")
+
+    def _import_connections(self, batch: List[Dict[str, Any]], pool: None) -> None:
+        now = datetime.utcnow()
+        user_ids = self._user_ids(
+            email for record in batch for email in (record.get("sender_email"), record.get("receiver_email"))
+        )
+        pairs: Dict[frozenset, Dict[str, Any]] = {}
+        for record in batch:
+            sender_id = user_ids.get((record.get("sender_email") or "").strip())
+            receiver_id = user_ids.get((record.get("receiver_email") or "").strip())
+            status = record.get("status") or "accepted"
+            pair = frozenset((sender_id, receiver_id))
+            if None in pair or len(pair) < 2 or status not in CONNECTION_STATUSES or pair in pairs:
+                self.skipped += 1
+                continue
+            pairs[pair] = {
+                "sender_id": sender_id,
+                "receiver_id": receiver_id,
+                "status": status,
+                "created_at": _parse_datetime(record.get("created_at"), now),
+                # updated_at is the import time so running graph indexes pick the rows up in their delta sync
+                "updated_at": now,
+            }
+
+        # Drop pairs that already have a connection row in either direction
+        member_ids = {user_id for pair in pairs for user_id in pair}
+        existing = self.db.execute(
+            select(Connection.sender_id, Connection.receiver_id).where(
+                Connection.sender_id.in_(member_ids), Connection.receiver_id.in_(member_ids)
+            )
+        ).all() if member_ids else []
+        for sender_id, receiver_id in existing:
+            if pairs.pop(frozenset((sender_id, receiver_id)), None) is not None:
+                self.skipped += 1
+
+        rows = list(pairs.values())
+        if not rows:
+            return
+        self.db.execute(insert(Connection), rows)
+
+        connections: Counter = Counter()
+        pending: Counter = Counter()
+        for row in rows:
+            if row["status"] == "accepted":
+                connections.update((row["sender_id"], row["receiver_id"]))
+            else:
+                pending[row["receiver_id"]] += 1
+        self._adjust_users(connections, "connections_count")
+        self._adjust_users(pending, "pending_requests_count")
+        if connections:
+            users = User.__table__
+            self.db.execute(
+                update(users).where(users.c.id.in_(list(connections))).values(
+                    suggestions_stale=True, updated_at=users.c.updated_at
+                )
+            )
+
+    def _user_ids(self, emails: Iterable[Optional[str]]) -> Dict[str, int]:
+        emails = {email.strip() for email in emails if email}
+        if not emails:
+            return {}
+        return dict(self.db.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+
+    def _adjust_users(self, deltas: Counter, counter: str) -> None:
+        # One executemany UPDATE per batch: bump the counter and the profile version of every touched user.
+        # Bookkeeping like CounterService.adjust, so updated_at (the delta sync key) is kept
+        if not deltas:
+            return
+        users = User.__table__
+        self.db.execute(
+            update(users).where(users.c.id == bindparam("user_id")).values({
+                counter: users.c[counter] + bindparam("delta"),
+                "profile_version": users.c.profile_version + 1,
+                "updated_at": users.c.updated_at,
+            }),
+            [{"user_id": user_id, "delta": delta} for user_id, delta in deltas.items()]
+        )
@@ -0,0 +1,466 @@
+import heapq
+import threading
+import time
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from core.database import Job, SyncWatermark, after_commit
+from core.instrumentation import instrument_service
+from models.schemas import FacetCount, Job as JobSchema, JobCreate, JobSearchResponse
+from services.search import tokenize
+
+# Facets reported with every search, in display order
+FACETS = ("location", "seniority", "remote")
+
+# A term's postings switch from a set of slots to a bitmap once it matches
+# more than 1/DENSE_RATIO of the slots: from there on the bitmap is smaller
+# than the set (a set entry costs ~40 bytes, a bitmap 1 bit per slot)
+DENSE_RATIO = 256
+MIN_DENSE = 64
+
+# Removed postings keep their slot (slots are bit positions) until the index
+# is reloaded, which happens once JOB_REPACK_RATIO of the slots are dead
+MIN_REPACK = 1024
+
+# Result of matching the keywords: a bitmap over slots, or a list of slots when few match
+Matches = Union[int, List[int]]
+
+class IndexedJob(NamedTuple):
+    """The fields of a posting the index reads"""
+    id: int
+    title: str
+    company: str
+    location: str
+    skills: str
+    seniority: str
+    remote: bool
+    expires_at: datetime
+
+    @classmethod
+    def of(cls, job: Job) -> "IndexedJob":
+        return cls(*(getattr(job, field) for field in cls._fields))
+
+def job_terms(job) -> Set[str]:
+    """Keyword terms of a posting: its title, company, location and skills"""
+    terms = set()
+    for value in (job.title, job.company, job.location, job.skills):
+        terms.update(tokenize(value))
+    return terms
+
+def job_facets(job) -> Dict[str, str]:
+    return {
+        "location": job.location.strip(),
+        "seniority": job.seniority,
+        "remote": "remote" if job.remote else "on-site",
+    }
+
+def _bitmap(slots: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+def _top_slots(bitmap: int, count: int) -> List[int]:
+    """The highest `count` set bits, highest first"""
+    slots = []
+    while bitmap and len(slots) < count:
+        slot = bitmap.bit_length() - 1
+        slots.append(slot)
+        bitmap ^= 1 << slot
+    return slots
+
+class JobIndex:
+    """In-memory inverted index of open job postings with facet counts.
+
+    Every posting gets a slot, assigned in id order, so the newest postings
+    have the highest slots. Keyword postings are sets of slots for rare terms
+    and integer bitmaps for common ones; facet values are always bitmaps.
+    Broad queries are then a few big-integer ANDs and popcounts and narrow
+    ones a set intersection, either way independent of how many postings
+    match. Postings are added and removed as this process commits or
+    expires them; rows changed by other workers are picked up by a periodic
+    delta sync on Job.updated_at, as for the social graph index. A removed
+    posting's slot stays dead until the index is reloaded with packed slots,
+    which current_job_index does once JOB_REPACK_RATIO of them are dead.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+        self._watermark = SyncWatermark()
+        self._next_sync = 0.0
+        self.loaded = False
+
+    def _clear(self) -> None:
+        self._slots: Dict[int, int] = {}  # job id -> slot
+        self._job_ids = array("q")  # slot -> job id
+        self._live = 0  # bitmap of indexed slots
+        self._dead = 0  # slots of removed postings
+        self._sparse: Dict[str, Set[int]] = {}
+        self._dense: Dict[str, int] = {}
+        self._values: Dict[str, List[str]] = {facet: [] for facet in FACETS}  # value id -> value
+        self._value_ids: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}  # lowercased value -> id
+        self._value_bitmaps: Dict[str, List[int]] = {facet: [] for facet in FACETS}
+        self._slot_values: Dict[str, array] = {facet: array("l") for facet in FACETS}  # slot -> value id
+        self._expiry: List[Tuple[datetime, int]] = []  # heap of (expires_at, job id)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def load(self, db: Session, batch_size: int = 50000) -> int:
+        """(Re)build the index from the open postings, packing slots"""
+        now = datetime.utcnow()
+        job_ids = array("q")
+        postings: Dict[str, List[int]] = {}
+        slot_values: Dict[str, array] = {facet: array("l") for facet in FACETS}
+        values: Dict[str, List[str]] = {facet: [] for facet in FACETS}
+        value_ids: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        expiry = []
+        watermark = db.scalar(select(func.max(Job.updated_at)))
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(
+                    Job.id, Job.title, Job.company, Job.location, Job.skills, Job.seniority, Job.remote,
+                    Job.expires_at
+                ).where(Job.id > last_id, Job.expires_at > now).order_by(Job.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                slot = len(job_ids)
+                job_ids.append(row.id)
+                for term in job_terms(row):
+                    postings.setdefault(term, []).append(slot)
+                for facet, value in job_facets(row).items():
+                    value_id = value_ids[facet].setdefault(value.lower(), len(values[facet]))
+                    if value_id == len(values[facet]):
+                        values[facet].append(value)
+                    slot_values[facet].append(value_id)
+                expiry.append((row.expires_at, row.id))
+            last_id = rows[-1].id
+
+        size = len(job_ids)
+        threshold = max(MIN_DENSE, size // DENSE_RATIO)
+        sparse = {term: set(slots) for term, slots in postings.items() if len(slots) <= threshold}
+        dense = {term: _bitmap(slots, size) for term, slots in postings.items() if len(slots) > threshold}
+        value_bitmaps = {}
+        for facet in FACETS:
+            slots_by_value: List[List[int]] = [[] for _ in values[facet]]
+            for slot, value_id in enumerate(slot_values[facet]):
+                slots_by_value[value_id].append(slot)
+            value_bitmaps[facet] = [_bitmap(slots, size) for slots in slots_by_value]
+        heapq.heapify(expiry)
+
+        with self._lock:
+            self._slots = {job_id: slot for slot, job_id in enumerate(job_ids)}
+            self._job_ids = job_ids
+            self._live = (1 << size) - 1
+            self._dead = 0
+            self._sparse = sparse
+            self._dense = dense
+            self._values = values
+            self._value_ids = value_ids
+            self._value_bitmaps = value_bitmaps
+            self._slot_values = slot_values
+            self._expiry = expiry
+            self._watermark.reset(watermark)
+            self._next_sync = time.monotonic() + settings.JOB_SYNC_INTERVAL
+            self.loaded = True
+        return size
+
+    def add(self, job) -> None:
+        """Index an open posting; postings already indexed are left as they are"""
+        if job.expires_at <= datetime.utcnow():
+            return
+        with self._lock:
+            if job.id in self._slots:
+                return
+            slot = len(self._job_ids)
+            bit = 1 << slot
+            self._slots[job.id] = slot
+            self._job_ids.append(job.id)
+            self._live |= bit
+            threshold = max(MIN_DENSE, len(self._slots) // DENSE_RATIO)
+            for term in job_terms(job):
+                if term in self._dense:
+                    self._dense[term] |= bit
+                    continue
+                slots = self._sparse.setdefault(term, set())
+                slots.add(slot)
+                if len(slots) > threshold:
+                    self._dense[term] = _bitmap(self._sparse.pop(term), slot + 1)
+            for facet, value in job_facets(job).items():
+                value_id = self._value_ids[facet].get(value.lower())
+                if value_id is None:
+                    value_id = self._value_ids[facet][value.lower()] = len(self._values[facet])
+                    self._values[facet].append(value)
+                    self._value_bitmaps[facet].append(0)
+                self._value_bitmaps[facet][value_id] |= bit
+                self._slot_values[facet].append(value_id)
+            heapq.heappush(self._expiry, (job.expires_at, job.id))
+
+    def remove(self, job) -> None:
+        """Drop a posting; needs its indexed fields, which never change after posting"""
+        with self._lock:
+            slot = self._slots.pop(job.id, None)
+            if slot is None:
+                return
+            mask = ~(1 << slot)
+            self._live &= mask
+            self._dead += 1
+            for term in job_terms(job):
+                if term in self._dense:
+                    self._dense[term] &= mask
+                else:
+                    slots = self._sparse.get(term)
+                    if slots is not None:
+                        slots.discard(slot)
+                        if not slots:
+                            del self._sparse[term]
+            for facet in FACETS:
+                value_id = self._slot_values[facet][slot]
+                self._value_bitmaps[facet][value_id] &= mask
+
+    def needs_repack(self) -> bool:
+        """Whether enough slots are dead that every bitmap is mostly padding"""
+        return self._dead >= max(MIN_REPACK, len(self._job_ids) * settings.JOB_REPACK_RATIO)
+
+    def expire(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Drop postings whose expires_at has passed"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            expired = []
+            while self._expiry and self._expiry[0][0] <= now:
+                expired.append(heapq.heappop(self._expiry)[1])
+            expired = [job_id for job_id in expired if job_id in self._slots]
+        if not expired:
+            return 0
+        for job in db.scalars(select(Job).where(Job.id.in_(expired))):
+            self.remove(job)
+        return len(expired)
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Apply postings created or closed elsewhere since the last load/sync; rate limited unless forced"""
+        if not self.loaded or (not force and time.monotonic() < self._next_sync):
+            return 0
+        self._next_sync = time.monotonic() + settings.JOB_SYNC_INTERVAL
+
+        query = select(Job)
+        since = self._watermark.since()
+        if since is not None:
+            query = query.where(Job.updated_at >= since)
+        now = datetime.utcnow()
+        applied = 0
+        for job in db.scalars(query.order_by(Job.id)).all():
+            with self._lock:
+                if not self._watermark.fresh(job.id, job.updated_at):
+                    continue
+            if job.expires_at > now:
+                self.add(job)
+            else:
+                self.remove(job)
+            applied += 1
+        with self._lock:
+            self._watermark.prune()
+        return applied
+
+    def search(
+        self, query: str = "", filters: Optional[Dict[str, str]] = None, limit: int = 20, offset: int = 0
+    ) -> Tuple[List[int], int, Dict[str, List[Tuple[str, int, bool]]]]:
+        """One page of matching job ids, newest first, the match count and facet counts
+
+        Every keyword must match. filters maps a facet to the one value it
+        must have. A facet's counts apply the other facets' filters but not
+        its own, so the alternatives to a selected value stay visible.
+        """
+        filters = {facet: value for facet, value in (filters or {}).items() if facet in FACETS and value}
+        with self._lock:
+            matches = self._match(tokenize(query))
+            selected: Dict[str, Optional[int]] = {
+                facet: self._value_ids[facet].get(value.strip().lower()) for facet, value in filters.items()
+            }
+            if isinstance(matches, int):
+                page, total, counts = self._search_bitmap(matches, selected, limit + offset)
+            else:
+                page, total, counts = self._search_slots(matches, selected, limit + offset)
+            job_ids = [self._job_ids[slot] for slot in page[offset:]]
+            facets = {facet: self._facet_counts(facet, counts[facet], selected.get(facet)) for facet in FACETS}
+        return job_ids, total, facets
+
+    def _match(self, tokens: Sequence[str]) -> Matches:
+        if not tokens:
+            return self._live
+        sparse: List[Set[int]] = []
+        dense: List[int] = []
+        for token in set(tokens):
+            if token in self._dense:
+                dense.append(self._dense[token])
+            elif token in self._sparse:
+                sparse.append(self._sparse[token])
+            else:
+                return []
+        if not sparse:
+            bitmap = self._live
+            for postings in dense:
+                bitmap &= postings
+            return bitmap
+
+        # A rare term bounds the result: intersect from the smallest set, then test the common terms' bits
+        sparse.sort(key=len)
+        slots = sparse[0].intersection(*sparse[1:])
+        if dense and slots:
+            bitmap = self._live
+            for postings in dense:
+                bitmap &= postings
+            bits = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+            slots = [slot for slot in slots if slot >> 3 < len(bits) and bits[slot >> 3] >> (slot & 7) & 1]
+        return list(slots)
+
+    def _search_bitmap(
+        self, matches: int, selected: Dict[str, Optional[int]], count: int
+    ) -> Tuple[List[int], int, Dict[str, List[int]]]:
+        filter_bitmaps = {
+            facet: self._value_bitmaps[facet][value_id] if value_id is not None else 0
+            for facet, value_id in selected.items()
+        }
+        counts = {}
+        for facet in FACETS:
+            scope = matches
+            for other, bitmap in filter_bitmaps.items():
+                if other != facet:
+                    scope &= bitmap
+            counts[facet] = [(scope & bitmap).bit_count() if scope else 0 for bitmap in self._value_bitmaps[facet]]
+        result = matches
+        for bitmap in filter_bitmaps.values():
+            result &= bitmap
+        return _top_slots(result, count), result.bit_count(), counts
+
+    def _search_slots(
+        self, matches: List[int], selected: Dict[str, Optional[int]], count: int
+    ) -> Tuple[List[int], int, Dict[str, List[int]]]:
+        columns = self._slot_values
+        counters = {}
+        for facet in FACETS:
+            others = [(columns[other], value_id) for other, value_id in selected.items() if other != facet]
+            counters[facet] = Counter(
+                columns[facet][slot] for slot in matches
+                if all(column[slot] == value_id for column, value_id in others)
+            )
+        counts = {
+            facet: [counters[facet].get(value_id, 0) for value_id in range(len(self._values[facet]))]
+            for facet in FACETS
+        }
+        result = [
+            slot for slot in matches
+            if all(columns[facet][slot] == value_id for facet, value_id in selected.items())
+        ]
+        return heapq.nlargest(count, result), len(result), counts
+
+    def _facet_counts(
+        self, facet: str, counts: List[int], selected_id: Optional[int]
+    ) -> List[Tuple[str, int, bool]]:
+        values = self._values[facet]
+        top = heapq.nsmallest(
+            settings.JOB_FACET_LIMIT,
+            (value_id for value_id, count in enumerate(counts) if count),
+            key=lambda value_id: (-counts[value_id], values[value_id])
+        )
+        if selected_id is not None and selected_id not in top:
+            top.append(selected_id)
+        return [(values[value_id], counts[value_id], value_id == selected_id) for value_id in top]
+
+_index = JobIndex()
+
+def get_job_index() -> JobIndex:
+    """The process-wide job index; check .loaded before trusting it"""
+    return _index
+
+def init_jobs(db: Session) -> JobIndex:
+    """Load the job index at startup"""
+    _index.load(db)
+    return _index
+
+def current_job_index(db: Session) -> JobIndex:
+    """The job index with expired postings dropped and other workers' changes applied, loading it on first use"""
+    if not _index.loaded:
+        _index.load(db)
+    _index.sync(db)
+    _index.expire(db)
+    if _index.needs_repack():
+        # Postings committed during the reload are re-read by the next sync's overlap window
+        _index.load(db)
+    return _index
+
+@instrument_service
+class JobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, poster_id: int, job_data: JobCreate) -> Job:
+        """Post a job, open for job_data.expires_in_days"""
+        now = datetime.utcnow()
+        job = Job(
+            poster_id=poster_id,
+            title=job_data.title.strip(),
+            company=job_data.company.strip(),
+            location=job_data.location.strip(),
+            skills=", ".join(skill.strip() for skill in job_data.skills if skill.strip()),
+            seniority=job_data.seniority,
+            remote=job_data.remote,
+            description=job_data.description,
+            created_at=now,
+            updated_at=now,
+            expires_at=now + timedelta(days=job_data.expires_in_days),
+        )
+        self.db.add(job)
+        self.db.flush()
+        _on_commit(self.db, _index.add, job)
+        self.db.commit()
+        return job
+
+    def close_job(self, job_id: int, poster_id: int) -> Optional[Job]:
+        """Expire a posting now; None unless it is an open posting of poster_id"""
+        now = datetime.utcnow()
+        job = self.db.scalars(
+            update(Job)
+            .where(Job.id == job_id, Job.poster_id == poster_id, Job.expires_at > now)
+            .values(expires_at=now, updated_at=now)
+            .returning(Job)
+        ).first()
+        if job is None:
+            return None
+        _on_commit(self.db, _index.remove, job)
+        self.db.commit()
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        """Get a posting by id, open or not"""
+        return self.db.get(Job, job_id)
+
+    def search_jobs(
+        self, query: str = "", filters: Optional[Dict[str, str]] = None, limit: int = 20, offset: int = 0
+    ) -> JobSearchResponse:
+        """Open postings matching every keyword and the facet filters, newest first, with facet counts"""
+        index = current_job_index(self.db)
+        job_ids, total, facets = index.search(query, filters, limit=limit, offset=offset)
+        jobs = {job.id: job for job in self.db.scalars(select(Job).where(Job.id.in_(job_ids)))} if job_ids else {}
+        return JobSearchResponse(
+            jobs=[JobSchema.model_validate(jobs[job_id]) for job_id in job_ids if job_id in jobs],
+            total=total,
+            facets={
+                facet: [FacetCount(value=value, count=count, selected=selected) for value, count, selected in counts]
+                for facet, counts in facets.items()
+            }
+        )
+
+def _on_commit(db: Session, apply: Callable[[IndexedJob], None], job: Job) -> None:
+    # The index only ever sees committed postings; the row is expired by then, so pass a snapshot
+    if _index.loaded:
+        indexed = IndexedJob.of(job)
+        after_commit(db, lambda: apply(indexed))
@@ -0,0 +1,33 @@
+import contextlib
+import logging
+import os
+
+from core.database import SessionLocal
+from core.executor import image_executor, run_db
+from core.utils import generate_image_derivatives
+from services.business import UserService
+
+logger = logging.getLogger(__name__)
+
+def _set_profile_picture(user_id: int, picture_key: str) -> None:
+    with SessionLocal() as db:
+        UserService(db).set_profile_picture(user_id, picture_key)
+
+async def process_profile_picture(user_id: int, image_path: str) -> None:
+    """Background task: build the derivatives of an uploaded picture, then switch the user to it
+
+    The user keeps their previous picture until every derivative exists, so
+    templates never link to a variant that is still being generated. Only the
+    derivatives are ever served, so the original is deleted either way.
+    """
+    try:
+        await image_executor.run(generate_image_derivatives, image_path)
+    except Exception:
+        logger.exception("Could not process profile picture %s of user %s", image_path, user_id)
+        return
+    finally:
+        with contextlib.suppress(FileNotFoundError):  # an identical upload may have removed it
+            os.remove(image_path)
+
+    picture_key = os.path.splitext(os.path.basename(image_path))[0]
+    await run_db(_set_profile_picture, user_id, picture_key)
@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from core.database import Conversation, Message, User, connection_pair, insert_ignore
+from core.instrumentation import instrument_service
+from core.pagination import decode_cursor, page_rows
+from models.schemas import ConversationSummary, MessageCreate, MessagesResponse
+from models.schemas import Message as MessageSchema, User as UserSchema
+
+def is_participant(conversation: Conversation, user_id: int) -> bool:
+    return user_id in (conversation.user_low_id, conversation.user_high_id)
+
+@instrument_service
+class MessageService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_or_create_conversation(self, user_id: int, other_id: int) -> Conversation:
+        """The conversation between two connected users, created on first use"""
+        from services.business import ConnectionService
+
+        if user_id == other_id:
+            raise ValueError("Cannot message yourself")
+        if not ConnectionService(self.db).are_connected(user_id, other_id):
+            raise ValueError("Only connections can message each other")
+
+        low, high = connection_pair(user_id, other_id)
+        query = select(Conversation).where(Conversation.user_low_id == low, Conversation.user_high_id == high)
+        conversation = self.db.scalar(query)
+        if conversation is None:
+            # Both users may open the thread at once: the unique pair decides, then re-read
+            now = datetime.utcnow()
+            self.db.execute(
+                insert_ignore(self.db, Conversation).values(
+                    user_low_id=low, user_high_id=high, created_at=now, updated_at=now
+                )
+            )
+            self.db.commit()
+            conversation = self.db.scalar(query)
+        return conversation
+
+    def get_conversation(self, conversation_id: int, user_id: int) -> Optional[Conversation]:
+        """A conversation, or None unless user_id takes part in it"""
+        conversation = self.db.get(Conversation, conversation_id)
+        if conversation is None or not is_participant(conversation, user_id):
+            return None
+        return conversation
+
+    def list_conversations(self, user_id: int, limit: int = 50) -> List[ConversationSummary]:
+        """A user's conversations, most recently active first, with the other user and last message"""
+        conversations = self.db.scalars(
+            select(Conversation)
+            .where(or_(Conversation.user_low_id == user_id, Conversation.user_high_id == user_id))
+            .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+            .limit(limit)
+        ).all()
+        if not conversations:
+            return []
+
+        # Other users and last messages in one query each
+        other_ids = {
+            c.user_high_id if c.user_low_id == user_id else c.user_low_id for c in conversations
+        }
+        users = {user.id: user for user in self.db.scalars(select(User).where(User.id.in_(other_ids)))}
+        message_ids = [c.last_message_id for c in conversations if c.last_message_id]
+        messages = {
+            message.id: message
+            for message in self.db.scalars(select(Message).where(Message.id.in_(message_ids)))
+        } if message_ids else {}
+
+        summaries = []
+        for conversation in conversations:
+            other_id = conversation.user_high_id if conversation.user_low_id == user_id else conversation.user_low_id
+            last_message = messages.get(conversation.last_message_id)
+            summaries.append(ConversationSummary(
+                id=conversation.id,
+                other_user=UserSchema.model_validate(users[other_id]),
+                last_message=MessageSchema.model_validate(last_message) if last_message else None,
+                updated_at=conversation.updated_at
+            ))
+        return summaries
+
+    def get_messages(
+        self,
+        conversation_id: int,
+        user_id: int,
+        limit: int = 30,
+        cursor: Optional[str] = None,
+        after_id: Optional[int] = None
+    ) -> Optional[MessagesResponse]:
+        """A page of a conversation, oldest first; None unless user_id takes part in it
+
+        Without after_id this is the newest page, or the page before cursor.
+        With after_id it is the messages that followed it, for a client
+        catching up after a reconnect (repeat while a full page comes back).
+        """
+        if self.get_conversation(conversation_id, user_id) is None:
+            return None
+
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if after_id is not None:
+            rows = self.db.scalars(query.where(Message.id > after_id).order_by(Message.id).limit(limit)).all()
+            return MessagesResponse(messages=[MessageSchema.model_validate(row) for row in rows])
+
+        if cursor:
+            query = query.where(Message.id < decode_cursor(cursor)[1])
+        rows = self.db.scalars(query.order_by(Message.id.desc()).limit(limit + 1)).all()
+        rows, next_cursor = page_rows(rows, limit, key=lambda row: (row.created_at, row.id))
+        return MessagesResponse(
+            messages=[MessageSchema.model_validate(row) for row in reversed(rows)],
+            next_cursor=next_cursor
+        )
+
+    def send_message(self, sender_id: int, message_data: MessageCreate) -> Tuple[MessageSchema, List[int]]:
+        """Store a message; returns it with the ids of the conversation's participants"""
+        conversation = self.get_conversation(message_data.conversation_id, sender_id)
+        if conversation is None:
+            raise ValueError("Conversation not found")
+
+        message = Message(
+            conversation_id=conversation.id,
+            sender_id=sender_id,
+            content=message_data.content,
+            created_at=datetime.utcnow()
+        )
+        self.db.add(message)
+        self.db.flush()
+        conversation.last_message_id = message.id
+        conversation.updated_at = message.created_at
+        # Read everything needed before commit expires the instances
+        result = MessageSchema.model_validate(message), [conversation.user_low_id, conversation.user_high_id]
+        self.db.commit()
+        return result
@@ -0,0 +1,101 @@
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import Row, and_, exists, false, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.database import User, Post, Connection, connection_pair
+from core.pagination import decode_cursor, page_rows
+from models.schemas import UserProfile
+
+class ProfileService:
+    """Read model of the profile page.
+
+    get_profile() loads the user, one page of their posts and the viewer's
+    relationship to them in a single statement. Every write that changes
+    what the page shows bumps User.profile_version through touch(), so the
+    version alone is enough to validate a cached rendering.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_version(self, user_id: int) -> Optional[int]:
+        """Current profile version of a user, None if the user does not exist"""
+        return self.db.scalar(select(User.profile_version).where(User.id == user_id))
+
+    def touch(self, *user_ids: int) -> None:
+        """Bump the profile version of users whose profile page content changed"""
+        if user_ids:
+            self.db.execute(
+                update(User)
+                .where(User.id.in_(user_ids))
+                .values(profile_version=User.profile_version + 1, updated_at=User.updated_at)
+            )
+
+    def get_profile(
+        self, user_id: int, viewer_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Optional[UserProfile]:
+        """Get a user's profile page: the user, a page of posts and the viewer relationship"""
+        rows = self.get_profile_rows(user_id, (User,), (Post,), viewer_id=viewer_id, limit=limit, cursor=cursor)
+        if not rows:
+            return None
+
+        user = rows[0].User
+        posts = [row.Post for row in rows if row.Post is not None]
+        for post in posts:
+            set_committed_value(post, "author", user)
+        posts, next_cursor = page_rows(posts, limit, key=lambda post: (post.created_at, post.id))
+
+        return UserProfile.model_validate({
+            "user": user,
+            "posts": posts,
+            "connections_count": user.connections_count,
+            "posts_count": user.posts_count,
+            "is_connected": bool(rows[0].is_connected),
+            "connection_pending": bool(rows[0].connection_pending),
+            "next_cursor": next_cursor,
+            "profile_version": user.profile_version,
+        }, from_attributes=True)
+
+    def get_profile_rows(
+        self,
+        user_id: int,
+        user_columns: Sequence[Any],
+        post_columns: Sequence[Any],
+        viewer_id: Optional[int] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> List[Row]:
+        """The profile statement with only the given columns, plus is_connected and connection_pending.
+
+        One row per post, newest first, up to limit + 1 rows; a user without
+        (more) posts yields one row with NULL post columns, an unknown user none.
+        """
+        if viewer_id is not None and viewer_id != user_id:
+            # Both look up the pair's single row through uq_connections_pair
+            low_id, high_id = connection_pair(viewer_id, user_id)
+            pair = and_(Connection.user_low_id == low_id, Connection.user_high_id == high_id)
+            is_connected = exists().where(pair, Connection.status == "accepted")
+            connection_pending = exists().where(
+                pair,
+                Connection.sender_id == viewer_id,
+                Connection.status == "pending"
+            )
+        else:
+            is_connected = connection_pending = false()
+
+        # The cursor goes in the join condition so a user without (more) posts still yields a row
+        post_join = Post.user_id == User.id
+        if cursor:
+            post_join = and_(post_join, tuple_(Post.created_at, Post.id) < tuple_(*decode_cursor(cursor)))
+
+        return self.db.execute(
+            select(
+                *user_columns,
+                is_connected.label("is_connected"),
+                connection_pending.label("connection_pending"),
+                *post_columns
+            ).outerjoin(Post, post_join).where(User.id == user_id).order_by(
+                Post.created_at.desc(), Post.id.desc()
+            ).limit(limit + 1)
+        ).all()
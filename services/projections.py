@@ -0,0 +1,151 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.database import User, Post
+from core.instrumentation import instrument_service
+from core.pagination import page_rows
+from core.utils import avatar_url
+from services.business import ConnectionService, PostService
+from services.profile import ProfileService
+from services.search import current_search_backend
+from services.timeline import TimelineService
+
+# Only the columns the v1 API returns
+CARD_COLUMNS = (User.id, User.first_name, User.last_name, User.headline, User.profile_picture)
+POST_COLUMNS = (Post.id, Post.user_id, Post.content, Post.created_at, Post.updated_at)
+# Posts joined to their author: the author's id is Post.user_id, so it is not selected twice
+POST_AUTHOR_COLUMNS = POST_COLUMNS + (User.first_name, User.last_name, User.headline, User.profile_picture)
+
+def user_card(row: Any, user_id: Optional[int] = None) -> Dict[str, Any]:
+    """A user as the v1 API shows them in lists and next to posts"""
+    return {
+        "id": row.id if user_id is None else user_id,
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "headline": row.headline or "",
+        "avatar_url": avatar_url(row),
+    }
+
+def post_item(row: Any) -> Dict[str, Any]:
+    """A post without its author, who is listed once per response under "authors" """
+    return {
+        "id": row.id,
+        "author_id": row.user_id,
+        "content": row.content,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+def _posts_page(rows: List[Any], next_cursor: Optional[str]) -> Dict[str, Any]:
+    authors: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        if row.user_id not in authors:
+            authors[row.user_id] = user_card(row, user_id=row.user_id)
+    return {
+        "posts": [post_item(row) for row in rows],
+        "authors": list(authors.values()),
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
+
+@instrument_service
+class ProjectionService:
+    """Read models of the /api/v1 JSON API.
+
+    Every response is built from column projections straight into plain
+    dicts for core.serialization: no ORM objects are loaded and no pydantic
+    models are validated. Posts carry an author_id and each author is
+    listed once per page under "authors", instead of being repeated on
+    every post.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_feed(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of a user's home timeline"""
+        rows, next_cursor = TimelineService(self.db).get_timeline_rows(
+            user_id, POST_AUTHOR_COLUMNS, limit=limit, cursor=cursor
+        )
+        return _posts_page(rows, next_cursor)
+
+    def get_user_posts(self, user_id: int, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of posts by one user"""
+        rows, next_cursor = PostService(self.db).get_post_rows_by_user(
+            user_id, POST_AUTHOR_COLUMNS, limit=limit, cursor=cursor
+        )
+        return _posts_page(rows, next_cursor)
+
+    def get_profile(
+        self, user_id: int, viewer_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """A user's profile as seen by viewer_id: the user, a page of their posts and the relationship"""
+        rows = ProfileService(self.db).get_profile_rows(
+            user_id,
+            CARD_COLUMNS + (
+                User.summary, User.location, User.connections_count, User.posts_count, User.profile_version,
+                User.created_at
+            ),
+            (
+                Post.id.label("post_id"), Post.content, Post.created_at.label("post_created_at"),
+                Post.updated_at.label("post_updated_at")
+            ),
+            viewer_id=viewer_id, limit=limit, cursor=cursor
+        )
+        if not rows:
+            return None
+
+        user = rows[0]
+        post_rows, next_cursor = page_rows(
+            [row for row in rows if row.post_id is not None], limit,
+            key=lambda row: (row.post_created_at, row.post_id)
+        )
+        return {
+            "user": dict(
+                user_card(user), summary=user.summary or "", location=user.location or "", created_at=user.created_at
+            ),
+            "posts": [
+                {
+                    "id": row.post_id,
+                    "author_id": user_id,
+                    "content": row.content,
+                    "created_at": row.post_created_at,
+                    "updated_at": row.post_updated_at,
+                }
+                for row in post_rows
+            ],
+            "connections_count": user.connections_count,
+            "posts_count": user.posts_count,
+            "is_connected": bool(user.is_connected),
+            "connection_pending": bool(user.connection_pending),
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+            "profile_version": user.profile_version,
+        }
+
+    def get_network(self, user_id: int, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of a user's connections, most recent first, with their counters"""
+        rows, next_cursor = ConnectionService(self.db).get_connection_rows(
+            user_id, CARD_COLUMNS, limit=limit, cursor=cursor
+        )
+        counters = self.db.execute(
+            select(User.connections_count, User.posts_count, User.pending_requests_count).where(User.id == user_id)
+        ).first()
+        return {
+            "users": [user_card(row) for row in rows],
+            "counters": dict(counters._mapping) if counters else None,
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+        }
+
+    def search_users(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """A page of users matching a search, best first, with the total match count"""
+        user_ids, total = current_search_backend(self.db).search(self.db, query, limit=limit, offset=offset)
+        rows = {}
+        if user_ids:
+            rows = {row.id: row for row in self.db.execute(select(*CARD_COLUMNS).where(User.id.in_(user_ids)))}
+        return {
+            "users": [user_card(rows[user_id]) for user_id in user_ids if user_id in rows],
+            "total": total,
+        }
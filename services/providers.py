@@ -0,0 +1,119 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from fastapi import Request
+from app.config import settings
+from core.database import SessionLocal, ReadSessionLocal, AsyncSessionLocal, get_async_engine
+from core.executor import run_db
+from core.write_queue import write_queue
+from services.business import UserService, PostService, ConnectionService
+from services.async_business import (
+    AsyncUserService, AsyncPostService, AsyncConnectionService, AsyncMessageService, AsyncJobService,
+    AsyncProjectionService
+)
+from services.jobs import JobService
+from services.messaging import MessageService
+from services.projections import ProjectionService
+
+class ThreadedService:
+    """Expose a sync service's methods as coroutines that run on the DB threadpool"""
+
+    def __init__(self, service: Any):
+        self._service = service
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._service, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await run_db(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+# Write methods that can be group-committed, mapped to the method staging them without a commit
+QUEUED_WRITES = {
+    PostService: {"create_post": "stage_post"},
+    ConnectionService: {
+        "send_connection_request": "stage_connection_request",
+        "accept_connection_request": "stage_connection_acceptance",
+    },
+}
+
+class QueuedWriteService:
+    """Send a service's QUEUED_WRITES through the write queue; other methods go to the service"""
+
+    def __init__(self, service: Any, service_class: type):
+        self._service = service
+        self._service_class = service_class
+        self._staged = QUEUED_WRITES[service_class]
+
+    def __getattr__(self, name: str) -> Any:
+        stage = self._staged.get(name)
+        if stage is None:
+            return getattr(self._service, name)
+        service_class = self._service_class
+
+        async def call(*args, **kwargs):
+            return await write_queue.submit(lambda db: getattr(service_class(db), stage)(*args, **kwargs))
+
+        call.__name__ = name
+        return call
+
+def _queued(service: Any, service_class: type, read_only: bool) -> Any:
+    if settings.WRITE_QUEUE_ENABLED and not read_only:
+        return QueuedWriteService(service, service_class)
+    return service
+
+class Services:
+    """The services of one request; every method is awaitable on either DB stack"""
+
+    def __init__(
+        self, users: Any, posts: Any, connections: Any, messages: Any, jobs: Any, projections: Any, db: Any
+    ):
+        self.users = users
+        self.posts = posts
+        self.connections = connections
+        self.messages = messages
+        self.jobs = jobs
+        self.projections = projections  # plain-dict read models of the /api/v1 routes
+        self.db = db
+
+# Safe methods run on the read-only pool when DB_READ_SPLIT is on
+READ_METHODS = ("GET", "HEAD")
+
+async def get_services(request: Request) -> AsyncIterator[Services]:
+    """Dependency providing the services of the configured DB stack (settings.DB_STACK)"""
+    async with open_services(read_only=request.method in READ_METHODS) as services:
+        yield services
+
+@asynccontextmanager
+async def open_services(read_only: bool = False) -> AsyncIterator[Services]:
+    """Services on a new session; for code outside a request, e.g. one WebSocket frame"""
+    if settings.DB_STACK == "async":
+        session_options = {"info": {"read_only": True}} if read_only and settings.DB_READ_SPLIT else {}
+        async with AsyncSessionLocal(bind=get_async_engine(read_only=read_only), **session_options) as db:
+            yield Services(
+                AsyncUserService(db),
+                _queued(AsyncPostService(db), PostService, read_only),
+                _queued(AsyncConnectionService(db), ConnectionService, read_only),
+                AsyncMessageService(db),
+                AsyncJobService(db),
+                AsyncProjectionService(db),
+                db
+            )
+        return
+
+    db = ReadSessionLocal() if read_only else SessionLocal()
+    try:
+        yield Services(
+            ThreadedService(UserService(db)),
+            _queued(ThreadedService(PostService(db)), PostService, read_only),
+            _queued(ThreadedService(ConnectionService(db)), ConnectionService, read_only),
+            ThreadedService(MessageService(db)),
+            ThreadedService(JobService(db)),
+            ThreadedService(ProjectionService(db)),
+            db
+        )
+    finally:
+        db.close()
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import delete, func, insert, select
+
+from app.config import settings
+from core.database import BrokerEvent, SessionLocal
+from core.executor import run_db
+
+logger = logging.getLogger(__name__)
+
+# In-process publish/subscribe for pushing events to open sockets.
+#
+# The hub fans an event out to every local subscription of its channel
+# (e.g. "user:42"). Each subscription has a bounded queue: a consumer that
+# falls WS_QUEUE_SIZE events behind is cut off instead of buffering without
+# limit, and its client resynchronizes from the database after reconnecting.
+# Events reach the hub through a broker: LocalBroker delivers within this
+# process; DatabaseBroker also relays them to the other workers through the
+# broker_events table, a stand-in for Redis pub/sub or similar.
+
+class SlowConsumer(Exception):
+    """Raised by a subscription whose queue overflowed"""
+
+class Subscription:
+    def __init__(self, hub: "PubSubHub", channels: Set[str], maxsize: int):
+        self.hub = hub
+        self.channels = channels
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event: Dict[str, Any]) -> bool:
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.hub.dropped += 1
+            # Wake a consumer blocked in get() so it notices
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def get(self) -> Dict[str, Any]:
+        """The next event; raises SlowConsumer once the subscription has overflowed"""
+        if self.overflowed:
+            raise SlowConsumer()
+        event = await self.queue.get()
+        if event is None or self.overflowed:
+            raise SlowConsumer()
+        return event
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class PubSubHub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self.broker: Optional["LocalBroker"] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, *channels: str) -> Subscription:
+        subscription = Subscription(self, set(channels), self.queue_size)
+        for channel in channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def dispatch(self, channel: str, event: Dict[str, Any]) -> int:
+        """Deliver an event to this process's subscribers of a channel; returns how many took it"""
+        delivered = 0
+        for subscription in list(self._channels.get(channel, ())):
+            if subscription.deliver(event):
+                delivered += 1
+        self.delivered += delivered
+        return delivered
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        """Publish an event to every worker's subscribers of a channel"""
+        if self.broker is None:
+            self.dispatch(channel, event)
+        else:
+            await self.broker.publish(channel, event)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "channels": len(self._channels),
+            "subscriptions": sum(len(subscribers) for subscribers in self._channels.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+class LocalBroker:
+    name = "local"
+
+    def __init__(self, hub: PubSubHub):
+        self.hub = hub
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        self.hub.dispatch(channel, event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+class DatabaseBroker(LocalBroker):
+    """Relay events between worker processes through the broker_events table
+
+    Events are delivered locally at once and written to the table; every
+    worker polls for rows written by other processes every
+    PUBSUB_POLL_INTERVAL seconds. Rows older than PUBSUB_RETENTION are pruned.
+    """
+    name = "database"
+
+    def __init__(self, hub: PubSubHub, poll_interval: float, retention: int, batch_size: int = 500):
+        super().__init__(hub)
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.batch_size = batch_size
+        self.origin = uuid.uuid4().hex
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        self.hub.dispatch(channel, event)
+        await run_db(self._insert, channel, json.dumps(event, default=str))
+
+    def _insert(self, channel: str, payload: str) -> None:
+        with SessionLocal() as db:
+            db.execute(insert(BrokerEvent).values(
+                channel=channel, payload=payload, origin=self.origin, created_at=datetime.utcnow()
+            ))
+            db.commit()
+
+    def _fetch(self) -> List[Any]:
+        with SessionLocal() as db:
+            return db.execute(
+                select(BrokerEvent.id, BrokerEvent.channel, BrokerEvent.payload, BrokerEvent.origin)
+                .where(BrokerEvent.id > self._last_id)
+                .order_by(BrokerEvent.id)
+                .limit(self.batch_size)
+            ).all()
+
+    def _prune(self) -> None:
+        with SessionLocal() as db:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+            db.execute(delete(BrokerEvent).where(BrokerEvent.created_at < cutoff))
+            db.commit()
+
+    async def start(self) -> None:
+        def last_id() -> int:
+            with SessionLocal() as db:
+                return db.scalar(select(func.max(BrokerEvent.id))) or 0
+
+        # Only events published from now on are relayed
+        self._last_id = await run_db(last_id)
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll(self) -> None:
+        polls = 0
+        while True:
+            try:
+                rows = await run_db(self._fetch)
+                for row in rows:
+                    self._last_id = row.id
+                    if row.origin != self.origin:
+                        self.hub.dispatch(row.channel, json.loads(row.payload))
+                polls += 1
+                if polls % max(1, int(60 / self.poll_interval)) == 0:
+                    await run_db(self._prune)
+                if len(rows) == self.batch_size:
+                    continue  # behind: read the next batch right away
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broker poll failed")
+            await asyncio.sleep(self.poll_interval)
+
+hub = PubSubHub(settings.WS_QUEUE_SIZE)
+
+async def init_pubsub() -> LocalBroker:
+    """Attach the broker chosen by settings.PUBSUB_BROKER to the hub and start it"""
+    if settings.PUBSUB_BROKER == "database":
+        broker = DatabaseBroker(hub, settings.PUBSUB_POLL_INTERVAL, settings.PUBSUB_RETENTION)
+    elif settings.PUBSUB_BROKER == "local":
+        broker = LocalBroker(hub)
+    else:
+        raise ValueError(f"Unknown PUBSUB_BROKER: {settings.PUBSUB_BROKER}")
+    await broker.start()
+    hub.broker = broker
+    return broker
+
+async def shutdown_pubsub() -> None:
+    if hub.broker is not None:
+        await hub.broker.stop()
+        hub.broker = None
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def author_channel(user_id: int) -> str:
+    """Channel of a user's new posts, followed by their connections' feed streams"""
+    return f"posts:{user_id}"
@@ -0,0 +1,336 @@
+import bisect
+from abc import ABC, abstractmethod
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection as DBConnection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from core.database import SyncWatermark, User, after_commit, engine
+from app.config import settings
+
+# Indexed user fields and their relevance weights
+SEARCH_FIELDS: Dict[str, float] = {
+    "first_name": 10.0,
+    "last_name": 10.0,
+    "headline": 2.0,
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(value.lower()) if value else []
+
+class SearchBackend(ABC):
+    """Interface shared by the user search backends"""
+    name = "base"
+
+    @abstractmethod
+    def index_user(self, db: Session, user: User) -> None:
+        """Add or refresh a user in the index"""
+
+    @abstractmethod
+    def remove_user(self, db: Session, user_id: int) -> None:
+        """Drop a user from the index"""
+
+    @abstractmethod
+    def search(self, db: Session, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[int], int]:
+        """Return one page of matching user ids, best first, and the total match count"""
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Apply users changed by other processes; only backends held in memory need to"""
+        return 0
+
+    def rebuild(
+        self,
+        db: Session,
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Re-index every active user"""
+        self.clear(db)
+        total = db.scalar(select(func.count()).select_from(User).where(User.is_active == True))
+        indexed = 0
+        last_id = 0
+        while True:
+            # Plain rows expose the same attributes as User without the ORM overhead
+            users = db.execute(
+                select(User.id, User.is_active, *[getattr(User, field) for field in SEARCH_FIELDS])
+                .where(User.is_active == True, User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            ).all()
+            if not users:
+                break
+            for user in users:
+                self.index_user(db, user)
+            db.commit()
+            indexed += len(users)
+            last_id = users[-1].id
+            if progress:
+                progress(indexed, total)
+        return indexed
+
+    @abstractmethod
+    def clear(self, db: Session) -> None:
+        """Drop every user from the index, in db's transaction when the index lives in the database"""
+
+class Fts5SearchBackend(SearchBackend):
+    """SQLite FTS5 virtual table kept in the same transaction as the users table"""
+    name = "fts5"
+
+    @staticmethod
+    def create_schema(conn: DBConnection) -> None:
+        """Create the users_fts table; raises OperationalError when FTS5 is unavailable"""
+        columns = ", ".join(SEARCH_FIELDS)
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+            f"{columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+
+    def rebuild(
+        self,
+        db: Session,
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        # One set-based INSERT ... SELECT instead of per-user round trips
+        self.clear(db)
+        columns = ", ".join(SEARCH_FIELDS)
+        sources = ", ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+        indexed = db.execute(text(
+            f"INSERT INTO users_fts (rowid, {columns}) "
+            f"SELECT id, {sources} FROM users WHERE is_active = 1"
+        )).rowcount
+        db.commit()
+        if progress:
+            progress(indexed, indexed)
+        return indexed
+
+    def index_user(self, db: Session, user: User) -> None:
+        self.remove_user(db, user.id)
+        if not user.is_active:
+            return
+        columns = ", ".join(SEARCH_FIELDS)
+        params = ", ".join(f":{field}" for field in SEARCH_FIELDS)
+        db.execute(
+            text(f"INSERT INTO users_fts (rowid, {columns}) VALUES (:id, {params})"),
+            {"id": user.id, **{field: getattr(user, field) or "" for field in SEARCH_FIELDS}}
+        )
+
+    def remove_user(self, db: Session, user_id: int) -> None:
+        db.execute(text("DELETE FROM users_fts WHERE rowid = :id"), {"id": user_id})
+
+    def search(self, db: Session, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[int], int]:
+        match = self._match_expression(query)
+        if not match:
+            return [], 0
+
+        weights = ", ".join(str(weight) for weight in SEARCH_FIELDS.values())
+        total = db.execute(
+            text("SELECT count(*) FROM users_fts WHERE users_fts MATCH :match"),
+            {"match": match}
+        ).scalar()
+        ids = db.execute(
+            text(
+                f"SELECT rowid FROM users_fts WHERE users_fts MATCH :match "
+                f"ORDER BY bm25(users_fts, {weights}), rowid LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "limit": limit, "offset": offset}
+        ).scalars().all()
+        return list(ids), total
+
+    def clear(self, db: Session) -> None:
+        db.execute(text("DELETE FROM users_fts"))
+
+    def is_empty(self, db: Session) -> bool:
+        return db.execute(text("SELECT 1 FROM users_fts LIMIT 1")).first() is None
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        # Every token must match, the last one as a prefix (search-as-you-type)
+        tokens = tokenize(query)
+        return " ".join(
+            f'"{token}"*' if i == len(tokens) - 1 else f'"{token}"'
+            for i, token in enumerate(tokens)
+        )
+
+class InvertedIndexSearchBackend(SearchBackend):
+    """In-process inverted index used when FTS5 is not available.
+
+    Each worker process holds its own copy, built at startup and updated when
+    the writes that go through that process commit; users changed by other
+    workers are picked up by a periodic delta sync on User.updated_at.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix range lookups
+        self._watermark = SyncWatermark()
+        self._next_sync = 0.0
+
+    def index_user(self, db: Session, user: User) -> None:
+        # The index only ever sees committed users; the row is expired by then, so weigh it now
+        user_id, weights = user.id, self._weights(user)
+        after_commit(db, lambda: self._apply(user_id, weights))
+
+    def remove_user(self, db: Session, user_id: int) -> None:
+        after_commit(db, lambda: self._apply(user_id, None))
+
+    def rebuild(
+        self,
+        db: Session,
+        batch_size: int = 5000,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        watermark = db.scalar(select(func.max(User.updated_at)))
+        indexed = super().rebuild(db, batch_size=batch_size, progress=progress)
+        with self._lock:
+            self._watermark.reset(watermark)
+            self._next_sync = time.monotonic() + settings.SEARCH_SYNC_INTERVAL
+        return indexed
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Apply users changed since the last rebuild/sync; rate limited unless forced"""
+        if not force and time.monotonic() < self._next_sync:
+            return 0
+        self._next_sync = time.monotonic() + settings.SEARCH_SYNC_INTERVAL
+
+        query = select(User.id, User.is_active, User.updated_at, *[getattr(User, field) for field in SEARCH_FIELDS])
+        since = self._watermark.since()
+        if since is not None:
+            query = query.where(User.updated_at >= since)
+        applied = 0
+        for row in db.execute(query).all():
+            with self._lock:
+                if not self._watermark.fresh(row.id, row.updated_at):
+                    continue
+            self._apply(row.id, self._weights(row))  # already committed
+            applied += 1
+        with self._lock:
+            self._watermark.prune()
+        return applied
+
+    def search(self, db: Session, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[int], int]:
+        tokens = tokenize(query)
+        if not tokens:
+            return [], 0
+
+        with self._lock:
+            doc_count = max(len(self._doc_terms), 1)
+            scores: Optional[Dict[int, float]] = None
+            for i, token in enumerate(tokens):
+                token_scores: Dict[int, float] = defaultdict(float)
+                terms = self._prefix_terms(token) if i == len(tokens) - 1 else [token]
+                for term in terms:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + doc_count / len(postings))
+                    for user_id, weight in postings.items():
+                        token_scores[user_id] = max(token_scores[user_id], weight * idf)
+                # AND semantics: keep users matching every token
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        user_id: score + token_scores[user_id]
+                        for user_id, score in scores.items() if user_id in token_scores
+                    }
+                if not scores:
+                    return [], 0
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [user_id for user_id, _ in ranked[offset:offset + limit]], len(ranked)
+
+    def clear(self, db: Session) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._vocabulary.clear()
+
+    @staticmethod
+    def _weights(user) -> Optional[Dict[str, float]]:
+        """Token weights of a user's indexed fields, or None when the user is not searchable"""
+        if not user.is_active:
+            return None
+        weights: Dict[str, float] = defaultdict(float)
+        for field, weight in SEARCH_FIELDS.items():
+            for token in tokenize(getattr(user, field)):
+                weights[token] += weight
+        return weights
+
+    def _apply(self, user_id: int, weights: Optional[Dict[str, float]]) -> None:
+        with self._lock:
+            self._remove(user_id)
+            if weights is None:
+                return
+            for token, weight in weights.items():
+                postings = self._postings[token]
+                if not postings:
+                    bisect.insort(self._vocabulary, token)
+                postings[user_id] = weight
+            self._doc_terms[user_id] = list(weights)
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def _remove(self, user_id: int) -> None:
+        for token in self._doc_terms.pop(user_id, []):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(user_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+
+_backend: Optional[SearchBackend] = None
+
+def init_search(bind=None) -> SearchBackend:
+    """Pick the search backend from settings.SEARCH_BACKEND and prepare it"""
+    global _backend
+    bind = bind or engine
+    choice = settings.SEARCH_BACKEND
+
+    if choice in ("auto", "fts5") and bind.dialect.name == "sqlite":
+        try:
+            with bind.begin() as conn:
+                Fts5SearchBackend.create_schema(conn)
+            _backend = Fts5SearchBackend()
+            with Session(bind) as db:
+                # A table just created (or emptied) would answer every search with nothing
+                if _backend.is_empty(db) and db.scalar(select(User.id).where(User.is_active == True).limit(1)):
+                    _backend.rebuild(db)
+            return _backend
+        except OperationalError:
+            if choice == "fts5":
+                raise
+
+    _backend = InvertedIndexSearchBackend()
+    with Session(bind) as db:
+        _backend.rebuild(db)
+    return _backend
+
+def get_search_backend() -> SearchBackend:
+    """Get the active search backend, initializing it on first use"""
+    return _backend or init_search()
+
+def current_search_backend(db: Session) -> SearchBackend:
+    """The active search backend brought up to date with the database"""
+    backend = get_search_backend()
+    backend.sync(db)
+    return backend
@@ -0,0 +1,199 @@
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, desc, insert, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from core.database import User, Connection, ConnectionSuggestion
+from services.graph import connection_ids, current_graph
+from services.search import tokenize
+from app.config import settings
+
+# Weight of one shared headline/location token relative to one mutual connection
+SHARED_TOKEN_WEIGHT = 0.25
+
+# Tokens too common in headlines to say anything about two people
+STOPWORDS = frozenset({"a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with", "professional"})
+
+def profile_tokens(user: User) -> Set[str]:
+    """Distinct headline and location tokens of a user"""
+    tokens = set(tokenize(user.headline)) | set(tokenize(user.location))
+    return tokens - STOPWORDS
+
+def _sample(ids: List[int], size: int, seed: int) -> List[int]:
+    # Deterministic per user, so refreshes of an unchanged graph give the same suggestions
+    if len(ids) <= size:
+        return ids
+    return random.Random(seed).sample(sorted(ids), size)
+
+class SuggestionService:
+    """"People you may know", precomputed per user.
+
+    Candidates are friends-of-friends ranked by mutual connections, with
+    shared headline/location tokens as a tie-breaker. The ranked list is
+    stored in connection_suggestions and only recomputed when the user is
+    marked stale, which happens when their connection neighbourhood changes.
+    Expansion is capped at SUGGESTION_MAX_NEIGHBORS neighbours of
+    SUGGESTION_MAX_SECOND_DEGREE connections each, so highly connected users
+    cost the same as everyone else.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: int, limit: int = 10) -> List[Tuple[User, int]]:
+        """Stored suggestions of a user with their mutual-connection counts, refreshing if stale"""
+        stale = self.db.scalar(select(User.suggestions_stale).where(User.id == user_id))
+        if stale is None:
+            return []
+        if stale:
+            self.refresh(user_id)
+
+        rows = self.db.execute(
+            select(ConnectionSuggestion).options(joinedload(ConnectionSuggestion.candidate)).where(
+                ConnectionSuggestion.user_id == user_id
+            ).order_by(
+                desc(ConnectionSuggestion.score), ConnectionSuggestion.candidate_id
+            ).limit(limit)
+        ).scalars().all()
+        return [(row.candidate, row.mutual_count) for row in rows]
+
+    def compute(self, user_id: int) -> List[Tuple[int, float, int]]:
+        """Rank candidates for a user as (candidate_id, score, mutual_count), best first"""
+        user = self.db.get(User, user_id)
+        if user is None:
+            return []
+
+        neighbour_ids = connection_ids(self.db, user_id)
+        excluded = self._related_ids(user_id)
+        excluded.add(user_id)
+
+        mutuals: Counter = Counter()
+        sampled = _sample(neighbour_ids, settings.SUGGESTION_MAX_NEIGHBORS, user_id)
+        for neighbour_id, second_ids in self._neighbour_connections(sampled).items():
+            second_ids = _sample(second_ids, settings.SUGGESTION_MAX_SECOND_DEGREE, neighbour_id)
+            mutuals.update(candidate_id for candidate_id in second_ids if candidate_id not in excluded)
+
+        if mutuals:
+            candidate_ids = [candidate_id for candidate_id, _ in mutuals.most_common(settings.SUGGESTION_CANDIDATES)]
+            candidates = self.db.scalars(
+                select(User).where(User.id.in_(candidate_ids), User.is_active == True)
+            ).all()
+        else:
+            # Cold start: no friends-of-friends yet, fall back to the newest members
+            candidates = [
+                candidate for candidate in self.db.scalars(
+                    select(User).where(User.id != user_id, User.is_active == True).order_by(
+                        desc(User.id)
+                    ).limit(settings.SUGGESTION_CANDIDATES + len(excluded))
+                ) if candidate.id not in excluded
+            ][:settings.SUGGESTION_CANDIDATES]
+
+        tokens = profile_tokens(user)
+        ranked = []
+        for candidate in candidates:
+            mutual = mutuals.get(candidate.id, 0)
+            shared = len(tokens & profile_tokens(candidate))
+            ranked.append((candidate.id, mutual + shared * SHARED_TOKEN_WEIGHT, mutual))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:settings.SUGGESTION_STORE]
+
+    def refresh(self, user_id: int, commit: bool = True) -> int:
+        """Recompute and store the suggestions of one user"""
+        ranked = self.compute(user_id)
+        now = datetime.utcnow()
+        self.db.execute(delete(ConnectionSuggestion).where(ConnectionSuggestion.user_id == user_id))
+        if ranked:
+            self.db.execute(insert(ConnectionSuggestion), [
+                {
+                    "user_id": user_id,
+                    "candidate_id": candidate_id,
+                    "score": score,
+                    "mutual_count": mutual,
+                    "updated_at": now,
+                }
+                for candidate_id, score, mutual in ranked
+            ])
+        self.db.execute(
+            update(User).where(User.id == user_id).values(suggestions_stale=False, updated_at=User.updated_at)
+        )
+        if commit:
+            self.db.commit()
+        return len(ranked)
+
+    def refresh_all(
+        self, batch_size: int = 500, progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Recompute the suggestions of every active user, committing per batch"""
+        total = self.db.query(User).filter(User.is_active == True).count()
+        done = 0
+        last_id = 0
+        while True:
+            user_ids = list(self.db.scalars(
+                select(User.id).where(User.id > last_id, User.is_active == True).order_by(User.id).limit(batch_size)
+            ))
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                self.refresh(user_id, commit=False)
+            self.db.commit()
+            done += len(user_ids)
+            last_id = user_ids[-1]
+            if progress:
+                progress(done, total)
+        return done
+
+    def on_request(self, sender_id: int, receiver_id: int) -> None:
+        """Drop the pair from each other's suggestions once a request exists between them"""
+        self.db.execute(delete(ConnectionSuggestion).where(
+            ((ConnectionSuggestion.user_id == sender_id) & (ConnectionSuggestion.candidate_id == receiver_id))
+            | ((ConnectionSuggestion.user_id == receiver_id) & (ConnectionSuggestion.candidate_id == sender_id))
+        ))
+
+    def on_connected(self, user1_id: int, user2_id: int) -> None:
+        """Mark everyone whose friends-of-friends changed with a new connection as stale"""
+        # The two users gain a neighbour; their neighbours gain a second-degree candidate
+        affected = {user1_id, user2_id}
+        affected.update(connection_ids(self.db, user1_id))
+        affected.update(connection_ids(self.db, user2_id))
+        self.invalidate(affected)
+
+    def invalidate(self, user_ids: Iterable[int], chunk_size: int = 500) -> None:
+        """Flag users for a suggestions refresh on their next read"""
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), chunk_size):
+            # The flag is internal state: the users themselves did not change
+            self.db.execute(
+                update(User)
+                .where(User.id.in_(user_ids[start:start + chunk_size]))
+                .values(suggestions_stale=True, updated_at=User.updated_at)
+            )
+
+    def _related_ids(self, user_id: int) -> Set[int]:
+        # Anyone with a connection row to the user in any status: connected, pending either way, or rejected
+        sent = select(Connection.receiver_id).where(Connection.sender_id == user_id)
+        received = select(Connection.sender_id).where(Connection.receiver_id == user_id)
+        return set(self.db.scalars(sent.union_all(received)))
+
+    def _neighbour_connections(self, user_ids: List[int]) -> Dict[int, List[int]]:
+        if not user_ids:
+            return {}
+
+        graph = current_graph(self.db)
+        if graph is not None:
+            return {user_id: graph.connection_ids(user_id) for user_id in user_ids}
+
+        adjacency: Dict[int, List[int]] = {user_id: [] for user_id in user_ids}
+        rows = self.db.execute(
+            select(Connection.sender_id, Connection.receiver_id).where(
+                (Connection.sender_id.in_(user_ids)) | (Connection.receiver_id.in_(user_ids)),
+                Connection.status == "accepted"
+            )
+        ).all()
+        for sender_id, receiver_id in rows:
+            if sender_id in adjacency:
+                adjacency[sender_id].append(receiver_id)
+            if receiver_id in adjacency:
+                adjacency[receiver_id].append(sender_id)
+        return adjacency
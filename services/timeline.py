@@ -0,0 +1,181 @@
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, and_, desc, func, literal, select, update
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.database import User, Post, Connection, TimelineEntry, insert_ignore
+from core.pagination import keyset_page, page_rows
+from services.graph import connection_ids, current_graph
+from app.config import settings
+
+def _post_key(post: Post):
+    return post.created_at, post.id
+
+class TimelineService:
+    """Per-user home timelines.
+
+    Posts are pushed into the timelines of the author and their accepted
+    connections when they are written (fan-out-on-write). Authors with more
+    than ``FEED_FANOUT_THRESHOLD`` connections are flagged instead and their
+    posts are pulled at read time (fan-out-on-read).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_connection_ids(self, user_id: int) -> List[int]:
+        """Get the ids of all accepted connections of a user"""
+        return connection_ids(self.db, user_id)
+
+    def fan_out(self, post: Post) -> int:
+        """Push a freshly flushed post into its readers' timelines"""
+        connected_ids = self.get_connection_ids(post.user_id)
+        pull_on_read = len(connected_ids) > settings.FEED_FANOUT_THRESHOLD
+
+        self.db.execute(
+            update(User)
+            .where(User.id == post.user_id, User.feed_fanout_on_read != pull_on_read)
+            .values(feed_fanout_on_read=pull_on_read, updated_at=User.updated_at)
+        )
+
+        # High-fanout authors only write to their own timeline
+        reader_ids = [post.user_id] if pull_on_read else [post.user_id] + connected_ids
+        self.db.execute(
+            insert_ignore(self.db, TimelineEntry),
+            [
+                {"user_id": reader_id, "post_id": post.id, "created_at": post.created_at}
+                for reader_id in reader_ids
+            ]
+        )
+        return len(reader_ids)
+
+    def seed(self, reader_id: int, author_id: int, depth: Optional[int] = None) -> None:
+        """Copy an author's recent posts into a reader's timeline (e.g. on a new connection)"""
+        author = self.db.get(User, author_id)
+        if author is None or author.feed_fanout_on_read:
+            return
+
+        self._copy_posts(reader_id, [author_id], depth or settings.FEED_SEED_DEPTH)
+
+    def get_timeline(
+        self, user_id: int, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get one page of a user's home timeline, newest first"""
+        return self._page(self.db.query(Post).options(joinedload(Post.author)), user_id, limit, cursor)
+
+    def get_timeline_rows(
+        self, user_id: int, columns: Sequence[Any], limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Like get_timeline, but rows of the given Post and author columns (including Post.id and created_at)"""
+        return self._page(
+            self.db.query(*columns).select_from(Post).join(User, User.id == Post.user_id), user_id, limit, cursor
+        )
+
+    def _page(self, query, user_id: int, limit: int, cursor: Optional[str]) -> Tuple[List[Any], Optional[str]]:
+        pushed = keyset_page(
+            query.join(TimelineEntry, TimelineEntry.post_id == Post.id).filter(TimelineEntry.user_id == user_id),
+            TimelineEntry.created_at, TimelineEntry.post_id, limit, cursor
+        ).all()
+
+        pull_author_ids = self._pull_author_ids(user_id)
+        if not pull_author_ids:
+            return page_rows(pushed, limit, key=_post_key)
+
+        pulled = keyset_page(
+            query.filter(Post.user_id.in_(pull_author_ids)),
+            Post.created_at, Post.id, limit, cursor
+        ).all()
+
+        # Merge both sources; a post may be in both if its author crossed the threshold
+        merged = {post.id: post for post in pushed + pulled}
+        rows = sorted(merged.values(), key=_post_key, reverse=True)[:limit + 1]
+        return page_rows(rows, limit, key=_post_key)
+
+    def backfill(
+        self,
+        batch_size: int = 500,
+        depth: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Build timelines for every user from the existing Connection rows"""
+        depth = depth or settings.FEED_BACKFILL_DEPTH
+        degrees = self._connection_degrees()
+
+        # Refresh the fan-out-on-read flags before deciding whose posts to copy
+        self.db.execute(update(User).values(feed_fanout_on_read=False, updated_at=User.updated_at))
+        pull_ids = [
+            user_id for user_id, degree in degrees.items()
+            if degree > settings.FEED_FANOUT_THRESHOLD
+        ]
+        if pull_ids:
+            self.db.execute(
+                update(User).where(User.id.in_(pull_ids)).values(feed_fanout_on_read=True, updated_at=User.updated_at)
+            )
+        self.db.commit()
+
+        pull_set = set(pull_ids)
+        user_ids = list(self.db.scalars(select(User.id).order_by(User.id)))
+        for start in range(0, len(user_ids), batch_size):
+            for user_id in user_ids[start:start + batch_size]:
+                author_ids = [user_id] + [
+                    connection_id for connection_id in self.get_connection_ids(user_id)
+                    if connection_id not in pull_set
+                ]
+                self._copy_posts(user_id, author_ids, depth)
+            self.db.commit()
+            if progress:
+                progress(min(start + batch_size, len(user_ids)), len(user_ids))
+
+        return len(user_ids)
+
+    def _copy_posts(self, reader_id: int, author_ids: Iterable[int], depth: int) -> None:
+        """INSERT ... SELECT the newest posts of some authors into one timeline"""
+        recent = select(
+            literal(reader_id), Post.id, Post.created_at
+        ).where(
+            Post.user_id.in_(list(author_ids))
+        ).order_by(desc(Post.created_at), desc(Post.id)).limit(depth)
+
+        self.db.execute(
+            insert_ignore(self.db, TimelineEntry).from_select(
+                ["user_id", "post_id", "created_at"], recent
+            )
+        )
+
+    def _pull_author_ids(self, user_id: int) -> List[int]:
+        """Get the connections of a user whose posts are fanned out on read"""
+        flagged = select(User.id).where(User.feed_fanout_on_read == True)
+        graph = current_graph(self.db)
+        if graph is not None:
+            # Few authors are flagged; test each against the index
+            return [
+                author_id for author_id in self.db.scalars(flagged)
+                if graph.are_connected(user_id, author_id)
+            ]
+
+        return list(self.db.scalars(
+            select(
+                func.coalesce(
+                    func.nullif(Connection.sender_id, user_id), Connection.receiver_id
+                )
+            ).where(
+                Connection.status == "accepted",
+                or_(
+                    and_(Connection.sender_id == user_id, Connection.receiver_id.in_(flagged)),
+                    and_(Connection.receiver_id == user_id, Connection.sender_id.in_(flagged))
+                )
+            )
+        ))
+
+    def _connection_degrees(self) -> Dict[int, int]:
+        """Count accepted connections per user in one pass over the table"""
+        endpoints = select(Connection.sender_id.label("user_id")).where(
+            Connection.status == "accepted"
+        ).union_all(
+            select(Connection.receiver_id.label("user_id")).where(
+                Connection.status == "accepted"
+            )
+        ).subquery()
+
+        return dict(self.db.execute(
+            select(endpoints.c.user_id, func.count()).group_by(endpoints.c.user_id)
+        ).all())
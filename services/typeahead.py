@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from core.database import User, SyncWatermark, after_commit
+from services.search import tokenize
+
+MAX_QUERY_TOKENS = 5
+
+class TypeaheadEntry(NamedTuple):
+    """What a suggestion displays, kept in memory so a lookup never reads the database"""
+    id: int
+    first_name: str
+    last_name: str
+    headline: str
+    profile_picture: str
+
+    @classmethod
+    def of(cls, user) -> "TypeaheadEntry":
+        return cls(
+            user.id, user.first_name or "", user.last_name or "", user.headline or "", user.profile_picture or ""
+        )
+
+    def name_tokens(self) -> List[str]:
+        return tokenize(self.first_name) + tokenize(self.last_name)
+
+class _PrefixArray:
+    """Sorted (token, user id) pairs in two parallel arrays; a prefix is one bisect away"""
+
+    def __init__(self, pairs: Sequence[Tuple[str, int]] = ()):
+        pairs = sorted(pairs)
+        self.tokens: List[str] = [token for token, _ in pairs]
+        self.ids = array("q", (user_id for _, user_id in pairs))
+
+    def insert(self, token: str, user_id: int) -> None:
+        lo = bisect.bisect_left(self.tokens, token)
+        hi = bisect.bisect_right(self.tokens, token, lo)
+        index = bisect.bisect_left(self.ids, user_id, lo, hi)
+        if index < hi and self.ids[index] == user_id:
+            return
+        self.tokens.insert(index, token)
+        self.ids.insert(index, user_id)
+
+    def remove(self, token: str, user_id: int) -> None:
+        lo = bisect.bisect_left(self.tokens, token)
+        hi = bisect.bisect_right(self.tokens, token, lo)
+        index = bisect.bisect_left(self.ids, user_id, lo, hi)
+        if index < hi and self.ids[index] == user_id:
+            del self.tokens[index]
+            del self.ids[index]
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        return bisect.bisect_left(self.tokens, prefix), bisect.bisect_left(self.tokens, prefix + "\uffff")
+
+def _matches(query_tokens: Sequence[str], tokens: Sequence[str]) -> bool:
+    # Every query token is a prefix of some token
+    return all(any(token.startswith(query_token) for token in tokens) for query_token in query_tokens)
+
+def _rank(entry: TypeaheadEntry, query_tokens: Sequence[str]) -> Optional[int]:
+    """0 if the name alone matches, 1 if the headline is needed, None if the user does not match"""
+    # A substring test rejects most candidates before anything is tokenized
+    text = f"{entry.first_name} {entry.last_name} {entry.headline}".lower()
+    if not all(query_token in text for query_token in query_tokens):
+        return None
+    name_tokens = entry.name_tokens()
+    if _matches(query_tokens, name_tokens):
+        return 0
+    if _matches(query_tokens, name_tokens + tokenize(entry.headline)):
+        return 1
+    return None
+
+class TypeaheadIndex:
+    """Prefix index of active users' names and headlines for search-as-you-type.
+
+    Tokens live in sorted arrays searched with bisect, names and headlines
+    separately so name matches rank first. The caller's connections are
+    checked before anyone else and rank above them; the rest is read off the
+    sorted arrays from the most selective query token, scanning at most
+    TYPEAHEAD_SCAN_LIMIT entries, so a lookup costs the same at any size.
+    Writes made by this process are applied as they commit; users changed
+    elsewhere are picked up by a periodic delta sync on User.updated_at.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users: Dict[int, TypeaheadEntry] = {}
+        self._names = _PrefixArray()
+        self._headlines = _PrefixArray()
+        self._watermark = SyncWatermark()
+        self._next_sync = 0.0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def load(self, db: Session, batch_size: int = 50000) -> int:
+        """(Re)build the index from the active users"""
+        users: Dict[int, TypeaheadEntry] = {}
+        names: List[Tuple[str, int]] = []
+        headlines: List[Tuple[str, int]] = []
+        watermark = db.scalar(select(func.max(User.updated_at)))
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(User.id, User.first_name, User.last_name, User.headline, User.profile_picture)
+                .where(User.is_active == True, User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                entry = users[row.id] = TypeaheadEntry.of(row)
+                names.extend((token, row.id) for token in set(entry.name_tokens()))
+                headlines.extend((token, row.id) for token in set(tokenize(entry.headline)))
+            last_id = rows[-1].id
+
+        names_array = _PrefixArray(names)
+        headlines_array = _PrefixArray(headlines)
+        with self._lock:
+            self._users = users
+            self._names = names_array
+            self._headlines = headlines_array
+            self._watermark.reset(watermark)
+            self._next_sync = time.monotonic() + settings.TYPEAHEAD_SYNC_INTERVAL
+            self.loaded = True
+        return len(users)
+
+    def index_user(self, entry: TypeaheadEntry, is_active: bool = True) -> None:
+        """Add, refresh or (if inactive) drop a user"""
+        with self._lock:
+            current = self._users.get(entry.id)
+            if is_active and current == entry:
+                return
+            if current is not None:
+                self._apply(current, self._names.remove, self._headlines.remove)
+                del self._users[entry.id]
+            if is_active:
+                self._users[entry.id] = entry
+                self._apply(entry, self._names.insert, self._headlines.insert)
+
+    def _apply(self, entry: TypeaheadEntry, on_name, on_headline) -> None:
+        for token in set(entry.name_tokens()):
+            on_name(token, entry.id)
+        for token in set(tokenize(entry.headline)):
+            on_headline(token, entry.id)
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Apply users changed since the last load/sync; rate limited unless forced"""
+        if not self.loaded or (not force and time.monotonic() < self._next_sync):
+            return 0
+        self._next_sync = time.monotonic() + settings.TYPEAHEAD_SYNC_INTERVAL
+
+        query = select(
+            User.id, User.first_name, User.last_name, User.headline, User.profile_picture,
+            User.is_active, User.updated_at
+        )
+        since = self._watermark.since()
+        if since is not None:
+            query = query.where(User.updated_at >= since)
+        applied = 0
+        for row in db.execute(query).all():
+            with self._lock:
+                if not self._watermark.fresh(row.id, row.updated_at):
+                    continue
+            self.index_user(TypeaheadEntry.of(row), row.is_active)
+            applied += 1
+        with self._lock:
+            self._watermark.prune()
+        return applied
+
+    def search(
+        self, query: str, boost_ids: Iterable[int] = (), limit: int = 8
+    ) -> List[Tuple[TypeaheadEntry, bool]]:
+        """Up to limit (user, is boosted) suggestions: boosted users first, then name before headline matches"""
+        tokens = tokenize(query)[:MAX_QUERY_TOKENS]
+        if not tokens:
+            return []
+
+        with self._lock:
+            boosted = []
+            for user_id in boost_ids:
+                entry = self._users.get(user_id)
+                rank = _rank(entry, tokens) if entry is not None else None
+                if rank is not None:
+                    boosted.append((rank, entry.first_name, entry.last_name, entry.id, entry))
+            boosted.sort(key=lambda item: item[:4])
+            results = [(item[-1], True) for item in boosted[:limit]]
+            if len(results) >= limit:
+                return results
+            seen = {entry.id for entry, _ in results}
+
+            # The longest token has the narrowest range; the others are checked per candidate.
+            # Users whose name matches every token come first, so the name range is read
+            # until enough of those turn up and the headline range only to fill the rest.
+            driver = max(tokens, key=len)
+            budget = settings.TYPEAHEAD_SCAN_LIMIT
+            found: List[List[TypeaheadEntry]] = [[], []]
+            wanted = limit - len(results)
+            for prefix_array, enough in ((self._names, 0), (self._headlines, 1)):
+                start, end = prefix_array.prefix_range(driver)
+                end = min(end, start + budget)
+                budget -= end - start
+                for index in range(start, end):
+                    user_id = prefix_array.ids[index]
+                    if user_id in seen:
+                        continue
+                    seen.add(user_id)
+                    entry = self._users[user_id]
+                    rank = _rank(entry, tokens)
+                    if rank is not None:
+                        found[rank].append(entry)
+                        if len(found[0]) + (len(found[1]) if enough else 0) >= wanted:
+                            break
+                if len(found[0]) + len(found[1]) >= wanted or budget <= 0:
+                    break
+        results.extend((entry, False) for entry in found[0] + found[1])
+        return results[:limit]
+
+_index = TypeaheadIndex()
+
+def get_typeahead_index() -> TypeaheadIndex:
+    """The process-wide typeahead index; check .loaded before trusting it"""
+    return _index
+
+def init_typeahead(db: Session) -> TypeaheadIndex:
+    """Load the typeahead index at startup"""
+    _index.load(db)
+    return _index
+
+def current_typeahead(db: Session) -> TypeaheadIndex:
+    """The typeahead index brought up to date with the database, loading it on first use"""
+    if not _index.loaded:
+        _index.load(db)
+    _index.sync(db)
+    return _index
+
+def on_user_changed(db: Session, user: User) -> None:
+    """Refresh a user's suggestions once the current transaction commits"""
+    if _index.loaded:
+        # The row is expired by the commit; snapshot it now
+        entry, is_active = TypeaheadEntry.of(user), bool(user.is_active)
+        after_commit(db, lambda: _index.index_user(entry, is_active))
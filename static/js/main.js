@@ -33,11 +33,7 @@ document.addEventListener('DOMContentLoaded', function() {
     if (searchForm) {
         const searchInput = searchForm.querySelector('input[name="q"]');
         if (searchInput) {
-            searchInput.addEventListener('keyup', function(e) {
-                if (e.key === 'Enter') {
-                    searchForm.submit();
-                }
-            });
+            initTypeahead(searchForm, searchInput);
         }
     }
 
@@ -55,9 +51,41 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // Initial state
             postButton.disabled = postTextarea.value.trim().length === 0;
+
+            // Post through the JSON endpoint and insert the returned card; the plain form is the fallback
+            postForm.addEventListener('submit', async function(e) {
+                e.preventDefault();
+                postButton.disabled = true;
+                try {
+                    const response = await fetch('/api/posts', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ content: postTextarea.value })
+                    });
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    const created = await response.json();
+                    prependPostCard(created.post.id, created.html);
+                    postTextarea.value = '';
+                    postTextarea.style.height = 'auto';
+                } catch (error) {
+                    postForm.submit();
+                }
+            });
         }
     }
 
+    // Live feed: cards of new posts by connections arrive over Server-Sent Events
+    const feedPosts = document.getElementById('feed-posts');
+    if (feedPosts && feedPosts.hasAttribute('data-live') && window.EventSource) {
+        const feedStream = new EventSource('/feed/stream');
+        feedStream.addEventListener('post', function(e) {
+            const event = JSON.parse(e.data);
+            prependPostCard(event.id, event.html);
+        });
+    }
+
     // Connection requests
     const connectionForms = document.querySelectorAll('form[action*="/connections/send/"]');
     connectionForms.forEach(form => {
@@ -70,35 +98,10 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Messaging - conversation selection
-    const conversationItems = document.querySelectorAll('.conversation-item');
-    conversationItems.forEach(item => {
-        item.addEventListener('click', function() {
-            // Remove active class from all items
-            conversationItems.forEach(i => i.classList.remove('active'));
-            // Add active class to clicked item
-            this.classList.add('active');
-        });
-    });
-
-    // Messaging - send message
-    const messageInput = document.querySelector('input[placeholder="Type a message..."]');
-    const sendButton = document.querySelector('.btn[type="button"] i.bi-send');
-    
-    if (messageInput && sendButton) {
-        messageInput.addEventListener('keypress', function(e) {
-            if (e.key === 'Enter' && this.value.trim()) {
-                sendMessage(this.value.trim());
-                this.value = '';
-            }
-        });
-        
-        sendButton.parentElement.addEventListener('click', function() {
-            if (messageInput.value.trim()) {
-                sendMessage(messageInput.value.trim());
-                messageInput.value = '';
-            }
-        });
+    // Messaging
+    const chat = document.getElementById('chat');
+    if (chat) {
+        initChat(chat);
     }
 
     // Smooth scrolling for anchor links
@@ -132,25 +135,316 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 // Utility functions
-function sendMessage(message) {
-    // This would typically send the message to the server
-    console.log('Sending message:', message);
-    
-    // For demo purposes, add the message to the chat
-    const messagesContainer = document.querySelector('.overflow-auto');
-    if (messagesContainer) {
-        const messageElement = document.createElement('div');
-        messageElement.className = 'd-flex justify-content-end mb-3';
-        messageElement.innerHTML = `
-            <div class="text-end">
-                <div class="bg-primary text-white rounded p-2 mb-1">
-                    <p class="mb-0">${escapeHtml(message)}</p>
+
+// Real-time chat over /ws/messages. Messages are appended when the server
+// echoes them back; a socket dropped for falling behind (or by the network)
+// reconnects with backoff and catches up through the history API.
+function initChat(chat) {
+    const conversationId = Number(chat.dataset.conversationId);
+    const userId = Number(chat.dataset.userId);
+    const messagesContainer = document.getElementById('chat-messages');
+    const statusLabel = document.getElementById('chat-status');
+    const messageInput = chat.querySelector('input[placeholder="Type a message..."]');
+    const sendButton = chat.querySelector('.btn i.bi-send').parentElement;
+    const avatarTemplate = document.getElementById('chat-received-avatar');
+    const pending = new Map();  // client_id -> optimistic element
+    let nextCursor = chat.dataset.nextCursor || null;
+    let socket = null;
+    let retryDelay = 500;
+
+    const lastMessageId = () => {
+        const rendered = messagesContainer.querySelectorAll('[data-message-id]');
+        return rendered.length ? Number(rendered[rendered.length - 1].dataset.messageId) : 0;
+    };
+
+    const messageElement = (message, mine) => {
+        const element = document.createElement('div');
+        element.className = mine ? 'd-flex justify-content-end mb-3' : 'd-flex mb-3';
+        if (message.id) {
+            element.dataset.messageId = message.id;
+        }
+        element.innerHTML = `
+            <div class="${mine ? 'text-end' : ''}">
+                <div class="${mine ? 'bg-primary text-white' : 'bg-light'} rounded p-2 mb-1">
+                    <p class="mb-0">${escapeHtml(message.content)}</p>
                 </div>
-                <small class="text-muted">Just now</small>
+                <small class="text-muted">${message.id ? 'Just now' : 'Sending...'}</small>
             </div>
         `;
-        messagesContainer.appendChild(messageElement);
+        if (!mine && avatarTemplate) {
+            element.prepend(avatarTemplate.content.firstElementChild.cloneNode(true));
+        }
+        return element;
+    };
+
+    const appendMessage = (message) => {
+        if (messagesContainer.querySelector(`[data-message-id="${message.id}"]`)) {
+            return;
+        }
+        messagesContainer.appendChild(messageElement(message, message.sender_id === userId));
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    };
+
+    const bumpConversation = (message) => {
+        const item = document.querySelector(`.conversation-item[data-conversation-id="${message.conversation_id}"]`);
+        if (!item) {
+            return;
+        }
+        item.querySelector('.conversation-preview').textContent = message.content;
+        if (message.conversation_id !== conversationId) {
+            const badge = item.querySelector('.conversation-unread');
+            badge.textContent = Number(badge.textContent) + 1;
+            badge.classList.remove('d-none');
+        }
+        item.parentElement.prepend(item);
+    };
+
+    const catchUp = async () => {
+        // Messages that arrived while the socket was down, a page at a time
+        const pageSize = 50;
+        for (;;) {
+            const response = await fetch(
+                `/api/conversations/${conversationId}/messages?after_id=${lastMessageId()}&limit=${pageSize}`
+            );
+            if (!response.ok) {
+                return;
+            }
+            const page = await response.json();
+            page.messages.forEach(appendMessage);
+            if (page.messages.length < pageSize) {
+                return;
+            }
+        }
+    };
+
+    const connect = () => {
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        socket = new WebSocket(`${scheme}://${window.location.host}/ws/messages`);
+        statusLabel.textContent = 'Connecting...';
+
+        socket.addEventListener('open', () => {
+            statusLabel.textContent = '';
+            retryDelay = 500;
+            catchUp();
+        });
+
+        socket.addEventListener('message', (e) => {
+            const frame = JSON.parse(e.data);
+            if (frame.type === 'message') {
+                const message = frame.message;
+                bumpConversation(message);
+                if (message.conversation_id !== conversationId) {
+                    return;
+                }
+                const optimistic = frame.client_id && pending.get(frame.client_id);
+                if (optimistic) {
+                    pending.delete(frame.client_id);
+                    optimistic.replaceWith(messageElement(message, true));
+                } else {
+                    appendMessage(message);
+                }
+            } else if (frame.type === 'error') {
+                const optimistic = frame.client_id && pending.get(frame.client_id);
+                if (optimistic) {
+                    pending.delete(frame.client_id);
+                    optimistic.remove();
+                }
+                showNotification(escapeHtml(frame.detail), 'danger');
+            }
+        });
+
+        socket.addEventListener('close', () => {
+            statusLabel.textContent = 'Reconnecting...';
+            setTimeout(connect, retryDelay);
+            retryDelay = Math.min(retryDelay * 2, 15000);
+        });
+    };
+
+    const sendMessage = (content) => {
+        if (!socket || socket.readyState !== WebSocket.OPEN) {
+            showNotification('Not connected, try again in a moment', 'warning');
+            return false;
+        }
+        const clientId = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+        const optimistic = messageElement({ content: content }, true);
+        pending.set(clientId, optimistic);
+        messagesContainer.appendChild(optimistic);
         messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        socket.send(JSON.stringify({
+            type: 'send', conversation_id: conversationId, content: content, client_id: clientId
+        }));
+        return true;
+    };
+
+    const submit = () => {
+        const content = messageInput.value.trim();
+        if (content && sendMessage(content)) {
+            messageInput.value = '';
+        }
+    };
+    messageInput.addEventListener('keypress', (e) => {
+        if (e.key === 'Enter') {
+            submit();
+        }
+    });
+    sendButton.addEventListener('click', submit);
+
+    // Older history, prepended above the current view
+    const olderButton = document.getElementById('chat-older');
+    if (olderButton) {
+        olderButton.addEventListener('click', async () => {
+            const response = await fetch(
+                `/api/conversations/${conversationId}/messages?cursor=${encodeURIComponent(nextCursor)}`
+            );
+            if (!response.ok) {
+                return;
+            }
+            const page = await response.json();
+            const anchor = olderButton.parentElement.nextSibling;
+            page.messages.forEach((message) => {
+                messagesContainer.insertBefore(messageElement(message, message.sender_id === userId), anchor);
+            });
+            nextCursor = page.next_cursor;
+            if (!nextCursor) {
+                olderButton.parentElement.remove();
+            }
+        });
+    }
+
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    connect();
+}
+
+// Search-as-you-type under the navbar search box. Lookups are debounced, a
+// request superseded by further typing is aborted, and recent answers are
+// cached so backspacing over a query costs nothing. Enter without a
+// highlighted suggestion still submits the full search page.
+function initTypeahead(form, input) {
+    const debounceMs = 150;
+    const cacheSize = 50;
+    const cache = new Map();  // query -> users, least recently used first
+    const menu = document.createElement('div');
+    menu.className = 'typeahead-menu list-group shadow-sm d-none';
+    form.appendChild(menu);
+    let timer = null;
+    let controller = null;
+    let active = -1;
+
+    const items = () => menu.querySelectorAll('.list-group-item');
+
+    const highlight = (index) => {
+        const links = items();
+        active = links.length ? (index + links.length) % links.length : -1;
+        links.forEach((link, i) => link.classList.toggle('active', i === active));
+    };
+
+    const hide = () => {
+        menu.classList.add('d-none');
+        active = -1;
+    };
+
+    const render = (users) => {
+        if (!users.length) {
+            hide();
+            return;
+        }
+        menu.innerHTML = users.map(user => `
+            <a href="/profile/${user.id}" class="list-group-item list-group-item-action d-flex align-items-center">
+                <img src="${escapeHtml(user.avatar_url)}" alt="" class="rounded-circle me-2" width="32" height="32">
+                <div class="text-truncate">
+                    <div class="fw-semibold">
+                        ${escapeHtml(`${user.first_name} ${user.last_name}`)}
+                        ${user.connected ? '<small class="text-muted fw-normal">· 1st</small>' : ''}
+                    </div>
+                    <small class="text-muted">${escapeHtml(user.headline || '')}</small>
+                </div>
+            </a>
+        `).join('');
+        menu.classList.remove('d-none');
+        active = -1;
+    };
+
+    const remember = (query, users) => {
+        cache.delete(query);
+        cache.set(query, users);
+        if (cache.size > cacheSize) {
+            cache.delete(cache.keys().next().value);
+        }
+    };
+
+    const lookup = async (query) => {
+        if (cache.has(query)) {
+            const users = cache.get(query);
+            remember(query, users);
+            render(users);
+            return;
+        }
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        try {
+            const response = await fetch(`/api/typeahead?q=${encodeURIComponent(query)}`, { signal: controller.signal });
+            if (!response.ok) {
+                return;
+            }
+            const result = await response.json();
+            remember(query, result.users);
+            if (input.value.trim().toLowerCase() === query) {
+                render(result.users);
+            }
+        } catch (error) {
+            // Aborted by a newer lookup, or offline: the full search page still works
+        }
+    };
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        const query = input.value.trim().toLowerCase();
+        if (!query) {
+            hide();
+            return;
+        }
+        if (cache.has(query)) {
+            lookup(query);
+            return;
+        }
+        timer = setTimeout(() => lookup(query), debounceMs);
+    });
+
+    input.addEventListener('keydown', (e) => {
+        if (menu.classList.contains('d-none')) {
+            return;
+        }
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight(active + (e.key === 'ArrowDown' ? 1 : -1));
+        } else if (e.key === 'Enter' && active >= 0) {
+            e.preventDefault();
+            window.location.href = items()[active].getAttribute('href');
+        } else if (e.key === 'Escape') {
+            hide();
+        }
+    });
+
+    input.addEventListener('blur', () => setTimeout(hide, 150));
+    input.addEventListener('focus', () => {
+        const query = input.value.trim().toLowerCase();
+        if (query && cache.has(query)) {
+            render(cache.get(query));
+        }
+    });
+}
+
+function prependPostCard(postId, html) {
+    const feedPosts = document.getElementById('feed-posts');
+    if (!feedPosts || feedPosts.querySelector(`[data-post-id="${postId}"]`)) {
+        return;
+    }
+    feedPosts.insertAdjacentHTML('afterbegin', html);
+    const empty = document.getElementById('feed-empty');
+    if (empty) {
+        empty.remove();
     }
 }
 
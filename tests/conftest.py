@@ -0,0 +1,93 @@
+import itertools
+import os
+import tempfile
+
+# Settings and engines are created at import time: point them at a scratch database first
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from core.database import Base, SessionLocal, engine, init_db
+from core.security import auth_cache, get_password_hash
+from core.templating import fragment_cache
+from models.schemas import PostCreate, UserCreate
+from services.business import ConnectionService, PostService, UserService
+from services.graph import init_graph
+from services.jobs import init_jobs
+from services.search import init_search
+from services.typeahead import init_typeahead
+
+PASSWORD = "password"
+PASSWORD_HASH = get_password_hash(PASSWORD)  # bcrypt is slow: hash once for every test user
+
+@pytest.fixture
+def db():
+    """A session on an empty database, with the in-memory indexes and caches reset to match"""
+    init_db()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    session = SessionLocal()
+    init_search().clear(session)
+    session.commit()
+    init_graph(session)
+    init_jobs(session)
+    init_typeahead(session)
+    auth_cache.clear()
+    fragment_cache.clear()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def client(app_client, db):
+    """The app's test client, logged out"""
+    app_client.cookies.clear()
+    yield app_client
+
+@pytest.fixture
+def make_user(db):
+    """Create an active user: make_user("Ada", "Lovelace", headline="Engineer")"""
+    numbers = itertools.count(1)
+
+    def make(first_name: str = "Test", last_name: str = "User", **fields):
+        data = UserCreate(
+            email=fields.pop("email", f"user{next(numbers)}@example.com"),
+            first_name=first_name,
+            last_name=last_name,
+            password=PASSWORD,
+            **fields
+        )
+        return UserService(db).create_user(data, hashed_password=PASSWORD_HASH)
+    return make
+
+@pytest.fixture
+def connect(db):
+    """Connect two users: connect(sender, receiver)"""
+    def connect(sender, receiver):
+        service = ConnectionService(db)
+        service.send_connection_request(sender.id, receiver.id)
+        return service.accept_connection_request(sender.id, receiver.id)
+    return connect
+
+@pytest.fixture
+def make_post(db):
+    def make(author, content: str = "Hello"):
+        return PostService(db).create_post(PostCreate(content=content, user_id=author.id))
+    return make
+
+@pytest.fixture
+def login(client):
+    """Log the test client in as a user"""
+    def login(user) -> None:
+        response = client.post("/login", data={"email": user.email, "password": PASSWORD}, follow_redirects=False)
+        assert response.status_code == 302
+    return login
@@ -0,0 +1,36 @@
+import pytest
+
+@pytest.fixture
+def members(make_user, make_post, connect):
+    viewer = make_user("Ada", "Lovelace", email="ada@example.com")
+    friend = make_user("Grace", "Hopper", email="grace@example.com")
+    connect(friend, viewer)
+    make_post(friend, "Hello")
+    return viewer, friend
+
+def test_user_lists_never_include_email(client, login, members):
+    viewer, friend = members
+    paths = [f"/api/users/{friend.id}/posts", "/api/search?q=hopper", f"/api/v1/users/{friend.id}/posts"]
+    for path in paths:  # public
+        response = client.get(path)
+        assert response.status_code == 200
+        assert "@example.com" not in response.text, path
+
+    login(viewer)
+    for path in paths + ["/api/feed", "/api/connections", "/api/v1/feed", "/api/v1/network"]:
+        response = client.get(path)
+        assert response.status_code == 200
+        assert "Hopper" in response.text, path
+        assert "@example.com" not in response.text, path
+
+def test_v1_feed_lists_each_author_once(client, login, members, make_post):
+    viewer, friend = members
+    make_post(friend, "Again")
+    login(viewer)
+    page = client.get("/api/v1/feed").json()
+    assert [post["author_id"] for post in page["posts"]] == [friend.id, friend.id]
+    assert [author["id"] for author in page["authors"]] == [friend.id]
+
+def test_v1_requires_a_session_for_private_pages(client):
+    assert client.get("/api/v1/feed").status_code == 401
+    assert client.get("/api/v1/network").status_code == 401
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from core.database import AsyncSessionLocal, Connection, User, get_async_engine
+from services.async_business import AsyncConnectionService
+from services.business import ConnectionService
+from services.graph import get_graph
+from services.profile import ProfileService
+
+def connection_rows(db):
+    return db.scalar(select(func.count()).select_from(Connection))
+
+def pending_requests(db, user):
+    db.expire_all()
+    return db.scalar(select(User.pending_requests_count).where(User.id == user.id))
+
+def test_request_in_either_direction_is_one_row(db, make_user):
+    alice, bob = make_user(), make_user()
+    service = ConnectionService(db)
+    connection = service.send_connection_request(alice.id, bob.id)
+    assert (connection.user_low_id, connection.user_high_id) == (min(alice.id, bob.id), max(alice.id, bob.id))
+
+    with pytest.raises(ValueError):
+        service.send_connection_request(alice.id, bob.id)
+    with pytest.raises(ValueError):
+        service.send_connection_request(bob.id, alice.id)
+    assert connection_rows(db) == 1
+    assert pending_requests(db, bob) == 1
+    assert pending_requests(db, alice) == 0
+
+def test_bulk_requests_skip_existing_pairs(db, make_user):
+    sender, *others = [make_user() for _ in range(5)]
+    service = ConnectionService(db)
+    service.send_connection_request(others[0].id, sender.id)  # the reverse direction exists
+    service.send_connection_request(sender.id, others[1].id)
+
+    sent = service.send_connection_requests(sender.id, [user.id for user in others] + [sender.id, 10_000])
+    assert sent == [others[2].id, others[3].id]
+    assert connection_rows(db) == 4
+    assert service.send_connection_requests(sender.id, [others[2].id]) == []
+    assert [pending_requests(db, user) for user in others] == [0, 1, 1, 1]
+
+def test_accept_only_a_pending_request(db, make_user):
+    alice, bob = make_user(), make_user()
+    service = ConnectionService(db)
+    with pytest.raises(ValueError):
+        service.accept_connection_request(alice.id, bob.id)
+    service.send_connection_request(alice.id, bob.id)
+    assert service.accept_connection_request(alice.id, bob.id).status == "accepted"
+    with pytest.raises(ValueError):
+        service.accept_connection_request(alice.id, bob.id)
+    assert service.are_connected(bob.id, alice.id)
+
+def test_accept_all_pending_requests(db, make_user):
+    receiver, *senders = [make_user() for _ in range(3)]
+    service = ConnectionService(db)
+    for sender in senders:
+        service.send_connection_request(sender.id, receiver.id)
+
+    assert sorted(service.accept_connection_requests(receiver.id)) == sorted(sender.id for sender in senders)
+    assert service.accept_connection_requests(receiver.id) == []
+    assert all(service.are_connected(receiver.id, sender.id) for sender in senders)
+    assert pending_requests(db, receiver) == 0
+
+@pytest.mark.parametrize("graph_loaded", [True, False])
+def test_connections_list_most_recently_accepted_first(db, make_user, monkeypatch, graph_loaded):
+    user, first, second, third = [make_user() for _ in range(4)]
+    service = ConnectionService(db)
+    for other in (first, second, third):
+        service.send_connection_request(user.id, other.id)
+    # Accepted in the opposite order to the requests
+    for other in (third, first, second):
+        service.accept_connection_request(user.id, other.id)
+    make_user()  # a stranger, not listed
+    monkeypatch.setattr(get_graph(), "loaded", graph_loaded)
+
+    users, cursor = service.get_connections(user.id, limit=2)
+    assert [other.id for other in users] == [second.id, first.id]
+    users, cursor = service.get_connections(user.id, limit=2, cursor=cursor)
+    assert ([other.id for other in users], cursor) == ([third.id], None)
+
+    async def async_page():
+        async with AsyncSessionLocal(bind=get_async_engine()) as session:
+            users, _ = await AsyncConnectionService(session).get_connections(user.id)
+            return [other.id for other in users]
+    assert asyncio.run(async_page()) == [second.id, first.id, third.id]
+
+def test_profile_shows_the_viewers_relationship_from_either_side(db, make_user):
+    alice, bob = make_user(), make_user()
+    profiles = ProfileService(db)
+
+    def relationship(user, viewer):
+        profile = profiles.get_profile(user.id, viewer_id=viewer.id)
+        return profile.is_connected, profile.connection_pending
+
+    service = ConnectionService(db)
+    service.send_connection_request(bob.id, alice.id)
+    assert relationship(alice, bob) == (False, True)  # pending is only shown to the sender
+    assert relationship(bob, alice) == (False, False)
+    service.accept_connection_request(bob.id, alice.id)
+    assert relationship(alice, bob) == (True, False)
+    assert relationship(bob, alice) == (True, False)
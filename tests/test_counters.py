@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from sqlalchemy import select, update
+
+from core.database import User
+from services.business import ConnectionService, UserService
+from services.counters import CounterService
+from services.importer import BulkImporter
+
+def stored_counters(db, user):
+    db.expire_all()
+    row = db.execute(
+        select(User.connections_count, User.posts_count, User.pending_requests_count).where(User.id == user.id)
+    ).one()
+    return dict(row._mapping)
+
+def test_counters_follow_requests_connections_and_posts(db, make_user, make_post):
+    alice, bob, carol = make_user(), make_user(), make_user()
+    service = ConnectionService(db)
+    service.send_connection_request(alice.id, bob.id)
+    service.send_connection_request(alice.id, carol.id)
+    assert stored_counters(db, bob) == {"connections_count": 0, "posts_count": 0, "pending_requests_count": 1}
+
+    service.accept_connection_request(alice.id, bob.id)
+    assert stored_counters(db, alice) == {"connections_count": 1, "posts_count": 0, "pending_requests_count": 0}
+    assert stored_counters(db, bob) == {"connections_count": 1, "posts_count": 0, "pending_requests_count": 0}
+    assert stored_counters(db, carol)["pending_requests_count"] == 1
+
+    service.accept_connection_request(alice.id, carol.id)
+    make_post(alice)
+    make_post(alice)
+    assert stored_counters(db, alice) == {"connections_count": 2, "posts_count": 2, "pending_requests_count": 0}
+    assert stored_counters(db, carol) == {"connections_count": 1, "posts_count": 0, "pending_requests_count": 0}
+
+    for user in (alice, bob, carol):
+        assert stored_counters(db, user) == CounterService(db).recount([user.id])[user.id]
+    assert UserService(db).get_counters(alice.id).connections_count == 2
+
+def test_counter_updates_keep_updated_at(db, make_user):
+    user = make_user()
+    updated_at = user.updated_at
+    CounterService(db).adjust(user.id, posts_count=3)
+    db.commit()
+    db.expire_all()
+    assert (user.posts_count, user.updated_at) == (3, updated_at)
+
+def test_reconcile_repairs_drift(db, make_user, make_post, connect):
+    alice, bob = make_user(), make_user()
+    connect(alice, bob)
+    make_post(bob)
+    db.execute(update(User).values(connections_count=7, posts_count=0, pending_requests_count=2))
+    db.commit()
+    updated_at = [user.updated_at for user in (alice, bob)]
+
+    assert CounterService(db).reconcile(batch_size=1) == 2
+    assert stored_counters(db, alice) == {"connections_count": 1, "posts_count": 0, "pending_requests_count": 0}
+    assert stored_counters(db, bob) == {"connections_count": 1, "posts_count": 1, "pending_requests_count": 0}
+    assert CounterService(db).reconcile() == 0
+    assert [user.updated_at for user in (alice, bob)] == updated_at
+
+def test_unknown_counter_is_an_error(db, make_user):
+    with pytest.raises(ValueError):
+        CounterService(db).adjust(make_user().id, followers_count=1)
+
+def test_imported_connections_adjust_counters_and_keep_updated_at(db, make_user, tmp_path):
+    alice, bob, carol = make_user(), make_user(), make_user()
+    updated_at = [user.updated_at for user in (alice, bob, carol)]
+    source = tmp_path / "connections.ndjson"
+    source.write_text("\n".join(json.dumps(record) for record in [
+        {"sender_email": alice.email, "receiver_email": bob.email},
+        {"sender_email": carol.email, "receiver_email": alice.email, "status": "pending"},
+    ]))
+
+    assert BulkImporter(db).run("connections", str(source)) == 2
+    assert stored_counters(db, alice) == {"connections_count": 1, "posts_count": 0, "pending_requests_count": 1}
+    assert (bob.connections_count, bob.suggestions_stale, bob.profile_version) == (1, True, 2)
+    assert [user.updated_at for user in (alice, bob, carol)] == updated_at
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from core.database import Connection
+from services.business import ConnectionService
+from services.graph import SocialGraph, get_graph
+
+# Rows below are written straight through the session, as another worker
+# process would: no in-process hook applies them, only a delta sync can.
+
+def add_connection(db, sender, receiver, status="accepted", **fields):
+    db.add(Connection(sender_id=sender.id, receiver_id=receiver.id, status=status, **fields))
+    db.commit()
+
+def test_requests_and_acceptances_update_the_graph(db, make_user):
+    alice, bob = make_user(), make_user()
+    service = ConnectionService(db)
+    graph = get_graph()
+
+    service.send_connection_request(alice.id, bob.id)
+    assert graph.is_pending(alice.id, bob.id)
+    assert graph.pending_in_ids(bob.id) == [alice.id]
+    assert not graph.are_connected(alice.id, bob.id)
+
+    service.accept_connection_request(alice.id, bob.id)
+    assert not graph.is_pending(alice.id, bob.id)
+    assert graph.are_connected(bob.id, alice.id)
+    assert graph.connection_ids(alice.id) == [bob.id]
+    assert graph.degree(bob.id) == 1
+
+def test_graph_sync_applies_other_workers_rows(db, make_user):
+    alice, bob, carol = make_user(), make_user(), make_user()
+    graph = SocialGraph()
+    graph.load(db)
+
+    add_connection(db, alice, bob)
+    add_connection(db, carol, alice, status="pending")
+    assert not graph.are_connected(alice.id, bob.id)
+    graph.sync(db, force=True)
+    assert graph.are_connected(bob.id, alice.id)
+    assert graph.is_pending(carol.id, alice.id)
+
+    db.execute(update(Connection).where(Connection.sender_id == carol.id).values(status="accepted"))
+    db.commit()
+    graph.sync(db, force=True)
+    assert graph.are_connected(alice.id, carol.id)
+    assert not graph.is_pending(carol.id, alice.id)
+
+def test_graph_sync_picks_up_a_late_commit(db, make_user):
+    alice, bob, carol = make_user(), make_user(), make_user()
+    graph = SocialGraph()
+    graph.load(db)
+    add_connection(db, alice, bob)
+    graph.sync(db, force=True)
+
+    # Stamped before the row the last sync saw, committed after that sync
+    add_connection(db, alice, carol, updated_at=datetime.utcnow() - timedelta(seconds=2))
+    assert graph.sync(db, force=True) == 1
+    assert graph.are_connected(alice.id, carol.id)
+    assert graph.sync(db, force=True) == 0  # already applied rows in the overlap window are skipped
+
+def test_graph_sync_is_rate_limited(db, make_user):
+    alice, bob = make_user(), make_user()
+    graph = SocialGraph()
+    graph.load(db)
+    add_connection(db, alice, bob)
+    assert graph.sync(db) == 0
+    assert not graph.are_connected(alice.id, bob.id)
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from core.database import Job
+from models.schemas import JobCreate
+from services import jobs
+from services.jobs import JobIndex, JobService
+
+# Rows below are written straight through the session, as another worker
+# process would: no in-process hook applies them, only a delta sync can.
+
+def add_job(db, poster, title, days=30, **fields):
+    job = Job(
+        poster_id=poster.id, title=title, company=fields.pop("company", "Acme"),
+        location=fields.pop("location", "Berlin"), skills=fields.pop("skills", "python"),
+        seniority=fields.pop("seniority", "mid"), remote=fields.pop("remote", False),
+        expires_at=datetime.utcnow() + timedelta(days=days), **fields
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+def post_job(db, poster, title, location="Berlin", skill="python", remote=False):
+    return JobService(db).create_job(poster.id, JobCreate(
+        title=title, company="Acme", location=location, skills=[skill], seniority="mid", remote=remote
+    ))
+
+def test_job_sync_applies_new_and_closed_postings(db, make_user):
+    poster = make_user()
+    index = JobIndex()
+    index.load(db)
+
+    job = add_job(db, poster, "Rust Engineer", skills="rust")
+    index.sync(db, force=True)
+    assert index.search("rust")[:2] == ([job.id], 1)
+
+    db.execute(update(Job).where(Job.id == job.id).values(expires_at=datetime.utcnow(), updated_at=datetime.utcnow()))
+    db.commit()
+    index.sync(db, force=True)
+    assert index.search("rust")[:2] == ([], 0)
+
+def test_job_sync_picks_up_a_late_commit(db, make_user):
+    poster = make_user()
+    index = JobIndex()
+    index.load(db)
+    add_job(db, poster, "Python Developer")
+    index.sync(db, force=True)
+
+    late = add_job(db, poster, "Go Engineer", skills="go", updated_at=datetime.utcnow() - timedelta(seconds=2))
+    index.sync(db, force=True)
+    assert index.search("go")[0] == [late.id]
+
+def test_posted_and_closed_jobs_update_the_index_on_commit(db, make_user):
+    poster = make_user()
+    service = JobService(db)
+    job = post_job(db, poster, "Rust Engineer", skill="rust")
+    assert jobs.get_job_index().search("rust")[:2] == ([job.id], 1)
+
+    assert service.close_job(job.id, make_user().id) is None  # not the poster
+    assert service.close_job(job.id, poster.id) is not None
+    assert jobs.get_job_index().search("rust")[:2] == ([], 0)
+
+def test_job_facets_and_filters(db, make_user):
+    poster = make_user()
+    post_job(db, poster, "Python Engineer", "Berlin", "python", remote=True)
+    post_job(db, poster, "Data Engineer", "berlin", "sql")
+    post_job(db, poster, "Python Developer", "London", "python")
+    index = jobs.current_job_index(db)
+
+    _, total, facets = index.search("engineer", filters={"location": "BERLIN"})
+    assert total == 2  # facet values match case-insensitively
+    _, total, facets = index.search("python", filters={"location": "berlin"})
+    assert total == 1
+    # A facet's counts apply the other filters but not its own
+    assert facets["location"] == [("Berlin", 1, True), ("London", 1, False)]
+    assert facets["remote"] == [("remote", 1, False)]
+
+def test_job_index_reloads_once_enough_slots_are_dead(db, make_user, monkeypatch):
+    monkeypatch.setattr(jobs, "MIN_REPACK", 4)
+    poster = make_user()
+    created = [add_job(db, poster, f"Engineer {i}") for i in range(10)]
+    index = jobs.init_jobs(db)
+
+    for job in created[:3]:
+        index.remove(job)
+    assert not index.needs_repack()
+    index.remove(created[3])
+    assert index.needs_repack()
+
+    # Expired in the database too, or the reload would index them again
+    db.execute(update(Job).where(Job.id.in_([job.id for job in created[:4]])).values(expires_at=datetime.utcnow()))
+    db.commit()
+    jobs.current_job_index(db)
+    assert not index.needs_repack()
+    assert index.search("engineer")[:2] == ([job.id for job in reversed(created[4:])], 6)
@@ -0,0 +1,44 @@
+import asyncio
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from core.utils import UnsupportedImage, avatar_url, save_upload_file
+from services import media
+
+def upload(content: bytes, filename: str):
+    return SimpleNamespace(file=io.BytesIO(content), filename=filename)
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), "navy").save(buffer, "PNG")
+    return buffer.getvalue()
+
+def test_upload_extension_comes_from_the_content(tmp_path):
+    path, _ = save_upload_file(upload(png_bytes(), "avatar.html"), upload_dir=str(tmp_path))
+    assert path.endswith(".png")
+
+    with pytest.raises(UnsupportedImage):
+        save_upload_file(upload(b"<script>alert(1)</script>", "avatar.jpg"), upload_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+def test_only_webp_derivatives_are_kept(tmp_path, monkeypatch):
+    path, _ = save_upload_file(upload(png_bytes(), "avatar.png"), upload_dir=str(tmp_path))
+    key = os.path.splitext(os.path.basename(path))[0]
+    switched = []
+
+    async def run_inline(function, *args):
+        return function(*args)
+    monkeypatch.setattr(media.image_executor, "run", run_inline)
+    monkeypatch.setattr(media, "run_db", run_inline)
+    monkeypatch.setattr(media, "_set_profile_picture", lambda user_id, picture_key: switched.append(picture_key))
+    asyncio.run(media.process_profile_picture(1, path))
+
+    assert switched == [key]
+    assert sorted(os.listdir(tmp_path)) == [f"{key}_medium.webp", f"{key}_thumb.webp"]
+    assert avatar_url(SimpleNamespace(profile_picture=key), "medium").endswith(f"/{key}_medium.webp")
+    with Image.open(tmp_path / f"{key}_medium.webp") as img:
+        assert img.size == (320, 320)
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+from alembic import command
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.database import Base, Connection, User, _alembic_config, init_db
+from services.counters import CounterService
+
+def head_revision(connection):
+    return ScriptDirectory.from_config(_alembic_config(connection)).get_current_head()
+
+def stored_revision(bind):
+    with bind.connect() as connection:
+        return connection.scalar(text("SELECT version_num FROM alembic_version"))
+
+@pytest.fixture
+def scratch_engine(tmp_path):
+    scratch = create_engine(f"sqlite:///{tmp_path / 'scratch.db'}")
+    yield scratch
+    scratch.dispose()
+
+@pytest.fixture
+def legacy_engine(scratch_engine):
+    """A database at the schema from before migrations existed, with four users"""
+    with scratch_engine.begin() as connection:
+        command.upgrade(_alembic_config(connection), "0001")
+        connection.execute(text("DROP TABLE alembic_version"))
+        now = datetime.utcnow()
+        for user_id in range(1, 5):
+            connection.execute(
+                text(
+                    "INSERT INTO users (id, email, hashed_password, first_name, last_name, is_active, "
+                    "created_at, updated_at) VALUES (:id, :email, 'x', 'User', :last, 1, :now, :now)"
+                ),
+                {"id": user_id, "email": f"user{user_id}@example.com", "last": str(user_id), "now": now}
+            )
+    return scratch_engine
+
+def add_legacy_connection(bind, sender_id, receiver_id, status):
+    with bind.begin() as connection:
+        return connection.execute(
+            text(
+                "INSERT INTO connections (sender_id, receiver_id, status, created_at, updated_at) "
+                "VALUES (:sender, :receiver, :status, :now, :now)"
+            ),
+            {"sender": sender_id, "receiver": receiver_id, "status": status, "now": datetime.utcnow()}
+        ).lastrowid
+
+def test_a_new_database_is_created_at_the_latest_revision(scratch_engine):
+    init_db(scratch_engine)
+    with scratch_engine.connect() as connection:
+        assert stored_revision(scratch_engine) == head_revision(connection)
+    init_db(scratch_engine)  # and starting again is a no-op
+
+def test_a_database_from_create_all_is_only_stamped(scratch_engine):
+    Base.metadata.create_all(bind=scratch_engine)
+    init_db(scratch_engine)
+    with scratch_engine.connect() as connection:
+        assert stored_revision(scratch_engine) == head_revision(connection)
+
+def test_connections_get_a_canonical_pair_key(legacy_engine):
+    accepted = add_legacy_connection(legacy_engine, 2, 1, "accepted")
+    add_legacy_connection(legacy_engine, 1, 2, "pending")  # the same pair, the other way
+    first = add_legacy_connection(legacy_engine, 3, 1, "pending")
+    add_legacy_connection(legacy_engine, 1, 3, "pending")
+    add_legacy_connection(legacy_engine, 4, 1, "rejected")
+    pending = add_legacy_connection(legacy_engine, 1, 4, "pending")
+
+    init_db(legacy_engine)
+
+    with Session(legacy_engine) as db:
+        rows = db.execute(
+            select(Connection.id, Connection.user_low_id, Connection.user_high_id).order_by(Connection.id)
+        ).all()
+        assert [tuple(row) for row in rows] == [(accepted, 1, 2), (first, 1, 3), (pending, 1, 4)]
+
+        db.add(Connection(sender_id=2, receiver_id=1, status="pending"))
+        with pytest.raises(IntegrityError):
+            db.commit()
+    columns = {column["name"]: column for column in inspect(legacy_engine).get_columns("connections")}
+    assert not columns["user_low_id"]["nullable"]
+
+def test_users_get_counters_and_flags(legacy_engine):
+    add_legacy_connection(legacy_engine, 1, 2, "accepted")
+    add_legacy_connection(legacy_engine, 3, 1, "pending")
+    add_legacy_connection(legacy_engine, 1, 4, "pending")
+    with legacy_engine.begin() as connection:
+        for content in ("first", "second"):
+            connection.execute(
+                text("INSERT INTO posts (content, user_id, created_at) VALUES (:content, 1, :now)"),
+                {"content": content, "now": datetime.utcnow()}
+            )
+        updated_at = connection.execute(text("SELECT id, updated_at FROM users ORDER BY id")).all()
+
+    init_db(legacy_engine)
+
+    with Session(legacy_engine) as db:
+        counters = {
+            user.id: (user.connections_count, user.posts_count, user.pending_requests_count)
+            for user in db.scalars(select(User))
+        }
+        assert counters == {1: (1, 2, 1), 2: (1, 0, 0), 3: (0, 0, 0), 4: (0, 0, 1)}
+        assert CounterService(db).reconcile() == 0
+        user = db.get(User, 1)
+        assert (user.suggestions_stale, user.feed_fanout_on_read, user.profile_version) == (True, False, 1)
+    with legacy_engine.connect() as connection:
+        assert connection.execute(text("SELECT id, updated_at FROM users ORDER BY id")).all() == updated_at
+    indexes = {index["name"] for index in inspect(legacy_engine).get_indexes("posts")}
+    assert {"ix_posts_created_id", "ix_posts_user_created_id"} <= indexes
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from core.database import Post, TimelineEntry
+from core.pagination import decode_cursor, encode_cursor
+from services.business import PostService
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 9, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm9waXBl", "MjAyNHwx"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def read_all(fetch, limit):
+    """Follow next cursors until the last page; returns the ids in page order"""
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = fetch(limit=limit, cursor=cursor)
+        ids.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+def test_user_posts_pages_break_timestamp_ties_by_id(db, make_user, make_post):
+    author = make_user()
+    post_ids = [make_post(author, f"post {i}").id for i in range(7)]
+    # Posts created in the same instant: only the id orders them
+    db.execute(update(Post).values(created_at=datetime(2024, 1, 1)))
+    db.commit()
+
+    ids, pages = read_all(lambda **page: PostService(db).get_posts_by_user(author.id, **page), limit=3)
+    assert ids == sorted(post_ids, reverse=True)
+    assert pages == 3
+
+def test_feed_pages_cover_every_post_once(db, make_user, make_post, connect):
+    reader, friend, stranger = make_user(), make_user(), make_user()
+    connect(reader, friend)
+    expected = [make_post(author, "post").id for author in (reader, friend, friend, reader, friend)]
+    make_post(stranger, "not in the feed")
+    tie = datetime(2024, 1, 1)
+    db.execute(update(Post).where(Post.id.in_(expected[1:3])).values(created_at=tie))
+    db.execute(update(TimelineEntry).where(TimelineEntry.post_id.in_(expected[1:3])).values(created_at=tie))
+    db.commit()
+
+    ids, _ = read_all(lambda **page: PostService(db).get_feed(reader.id, **page), limit=2)
+    assert sorted(ids) == sorted(expected)
+    assert len(ids) == len(set(ids))
+
+def test_api_rejects_a_malformed_cursor(client, make_user, login):
+    user = make_user()
+    login(user)
+    assert client.get("/api/feed", params={"cursor": "garbage"}).status_code == 400
+    assert client.get(f"/api/users/{user.id}/posts", params={"cursor": "garbage"}).status_code == 400
+
+def test_api_feed_follows_next_cursor(client, make_user, make_post, login):
+    user = make_user()
+    post_ids = [make_post(user, f"post {i}").id for i in range(5)]
+    login(user)
+
+    ids, cursor = [], None
+    while True:
+        page = client.get("/api/feed", params={"limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+        ids.extend(post["id"] for post in page["posts"])
+        assert page["has_more"] == (page["next_cursor"] is not None)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == sorted(post_ids, reverse=True)
@@ -0,0 +1,56 @@
+import pytest
+
+from core.instrumentation import QueryBudgetExceeded, query_budget
+
+# Statements per page, whatever the number of connections and posts shown.
+# Each includes the session user lookup of the first request after login;
+# the network page also the refresh of the viewer's stale suggestions.
+FEED_BUDGET = 3
+PROFILE_BUDGET = 3
+NETWORK_BUDGET = 12
+
+@pytest.fixture(params=[2, 12], ids=["small", "large"])
+def network(request, make_user, make_post, connect):
+    """A viewer connected to n users with two posts each"""
+    viewer = make_user("Viewer")
+    friends = [make_user(f"Friend{i}") for i in range(request.param)]
+    for friend in friends:
+        connect(friend, viewer)
+        make_post(friend, "first")
+        make_post(friend, "second")
+    make_post(viewer, "mine")
+    connect(friends[0], make_user("Stranger"))  # suggested to the viewer
+    return viewer, friends
+
+def test_feed_page(client, login, network):
+    viewer, _ = network
+    login(viewer)
+    with query_budget(FEED_BUDGET):
+        response = client.get("/")
+    assert response.status_code == 200
+    assert "second" in response.text
+
+def test_profile_page(client, login, network):
+    viewer, friends = network
+    login(viewer)
+    for user in (viewer, friends[0]):
+        with query_budget(PROFILE_BUDGET):
+            response = client.get(f"/profile/{user.id}")
+        assert response.status_code == 200
+
+def test_network_page(client, login, network):
+    viewer, friends = network
+    login(viewer)
+    for _ in range(2):  # with stale suggestions, then with fresh ones
+        with query_budget(NETWORK_BUDGET):
+            response = client.get("/network")
+        assert response.status_code == 200
+        assert friends[-1].first_name in response.text
+        assert "Stranger" in response.text
+
+def test_budget_reports_the_statements(db, make_user):
+    user = make_user()
+    with pytest.raises(QueryBudgetExceeded, match="2 queries executed, budget is 1"):
+        with query_budget(1):
+            db.get(type(user), user.id + 1)
+            db.get(type(user), user.id + 2)
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from core.database import User
+from models.schemas import UserUpdate
+from services.business import UserService
+from services.search import Fts5SearchBackend, InvertedIndexSearchBackend, init_search
+
+@pytest.fixture(params=[Fts5SearchBackend, InvertedIndexSearchBackend], ids=["fts5", "memory"])
+def backend(request, db, make_user):
+    make_user("Ada", "Lovelace", headline="Mathematician")
+    make_user("Alan", "Turing", headline="Computer scientist")
+    backend = request.param()
+    backend.rebuild(db)
+    return backend
+
+def first_names(db, user_ids):
+    return [db.get(User, user_id).first_name for user_id in user_ids]
+
+@pytest.mark.parametrize("query, expected", [
+    ("lov", ["Ada"]), ("ada lov", ["Ada"]), ("ada tur", []), ("scien", ["Alan"]), ("", [])
+])
+def test_search_matches_every_token_and_prefixes_the_last(db, backend, query, expected):
+    user_ids, total = backend.search(db, query)
+    assert first_names(db, user_ids) == expected
+    assert total == len(expected)
+
+def test_search_drops_inactive_users(db, backend):
+    ada = db.query(User).filter(User.first_name == "Ada").one()
+    ada.is_active = False
+    backend.index_user(db, ada)
+    db.commit()
+    assert backend.search(db, "lovelace") == ([], 0)
+
+def test_memory_index_only_sees_committed_users(db, make_user):
+    backend = InvertedIndexSearchBackend()
+    backend.rebuild(db)
+    grace = User(email="grace@example.com", hashed_password="x", first_name="Grace", last_name="Hopper")
+    db.add(grace)
+    db.flush()
+    backend.index_user(db, grace)
+    assert backend.search(db, "hopper") == ([], 0)
+    db.rollback()
+    assert backend.search(db, "hopper") == ([], 0)
+
+    db.add(grace)
+    db.flush()
+    backend.index_user(db, grace)
+    db.commit()
+    assert backend.search(db, "hopper") == ([grace.id], 1)
+
+def test_user_writes_keep_the_index_current(db, make_user):
+    service = UserService(db)
+    ada = make_user("Ada", "Lovelace")
+    assert service.search_users("lovelace")[1] == 1
+
+    service.update_user(ada.id, UserUpdate(last_name="Byron"))
+    assert service.search_users("lovelace") == ([], 0)
+    assert [user.id for user in service.search_users("byron")[0]] == [ada.id]
+
+    service.set_active(ada.id, False)
+    assert service.search_users("byron") == ([], 0)
+
+def test_an_empty_fts_table_is_filled_at_startup(db, make_user):
+    make_user("Ada", "Lovelace")
+    backend = init_search()
+    backend.clear(db)
+    db.commit()
+    assert UserService(db).search_users("lovelace") == ([], 0)
+
+    init_search()
+    assert UserService(db).search_users("lovelace")[1] == 1
+
+def test_memory_search_sync_applies_other_workers_users(db, make_user):
+    make_user("Ada", "Lovelace")
+    backend = InvertedIndexSearchBackend()
+    backend.rebuild(db)
+
+    # Indexed by the app's backend only: this index, like another worker's, needs a sync
+    grace = make_user("Grace", "Lovelace")
+    assert backend.search(db, "lovelace")[1] == 1
+    backend.sync(db, force=True)
+    assert backend.search(db, "lovelace")[1] == 2
+
+    db.execute(update(User).where(User.id == grace.id).values(is_active=False, updated_at=datetime.utcnow()))
+    db.commit()
+    backend.sync(db, force=True)
+    assert backend.search(db, "grace") == ([], 0)
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from core.database import User
+from services.typeahead import TypeaheadIndex
+
+# Rows below are written straight through the session, as another worker
+# process would: no in-process hook applies them, only a delta sync can.
+
+def names(results):
+    return [entry.first_name for entry, _ in results]
+
+def test_typeahead_sync_applies_renames_and_deactivations(db, make_user):
+    ada = make_user("Ada", "Lovelace", headline="Mathematician")
+    make_user("Alan", "Turing")
+    index = TypeaheadIndex()
+    index.load(db)
+    assert names(index.search("lov")) == ["Ada"]
+
+    db.execute(update(User).where(User.id == ada.id).values(last_name="Byron", updated_at=datetime.utcnow()))
+    db.commit()
+    index.sync(db, force=True)
+    assert names(index.search("lov")) == []
+    assert names(index.search("byr")) == ["Ada"]
+
+    db.execute(update(User).where(User.id == ada.id).values(is_active=False, updated_at=datetime.utcnow()))
+    db.commit()
+    index.sync(db, force=True)
+    assert names(index.search("a")) == ["Alan"]
+
+def test_typeahead_sync_picks_up_a_late_commit(db, make_user):
+    make_user("Ada", "Lovelace")
+    index = TypeaheadIndex()
+    index.load(db)
+    make_user("Grace", "Hopper")
+    index.sync(db, force=True)
+
+    late = make_user("Katherine", "Johnson")
+    db.execute(
+        update(User).where(User.id == late.id).values(updated_at=datetime.utcnow() - timedelta(seconds=2))
+    )
+    db.commit()
+    index.sync(db, force=True)
+    assert names(index.search("kath")) == ["Katherine"]
+
+def test_typeahead_ranks_connections_then_names(db, make_user):
+    friend = make_user("Robert", "Stone", headline="Engineer")
+    make_user("Rob", "Rivers", headline="Designer")
+    make_user("Sam", "Hill", headline="Robotics engineer")
+    index = TypeaheadIndex()
+    index.load(db)
+
+    results = index.search("rob", boost_ids=[friend.id])
+    assert names(results) == ["Robert", "Rob", "Sam"]
+    assert [boosted for _, boosted in results] == [True, False, False]
+
+@pytest.fixture
+def members(make_user, connect):
+    viewer = make_user("Ada", "Lovelace")
+    friend = make_user("Grace", "Hopper")
+    connect(friend, viewer)
+    return viewer, friend
+
+def test_endpoint_suggests_connections_first_and_never_the_viewer(client, login, members, make_user):
+    viewer, friend = members
+    make_user("Grace", "Abbott")
+    login(viewer)
+    users = client.get("/api/typeahead", params={"q": "gra"}).json()["users"]
+    assert [user["id"] for user in users][:1] == [friend.id]
+    assert len(users) == 2
+    assert all(user["id"] != viewer.id for user in client.get("/api/typeahead", params={"q": "ada"}).json()["users"])
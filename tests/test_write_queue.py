@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from core.database import Post
+from core.instrumentation import QueryCounter
+from core.write_queue import WriteQueue
+from models.schemas import PostCreate
+from services.business import PostService
+
+def run(coroutine_function):
+    """Run an async test body on a fresh event loop with its own write queue"""
+    queue = WriteQueue(max_batch=50, max_delay=0.02)
+
+    async def main():
+        try:
+            return await coroutine_function(queue)
+        finally:
+            await queue.stop()
+    return asyncio.run(main()), queue
+
+def post_job(user_id, content):
+    return lambda db: PostService(db).stage_post(PostCreate(content=content, user_id=user_id)).id
+
+def contents(db, user_id):
+    return db.scalars(select(Post.content).where(Post.user_id == user_id).order_by(Post.id)).all()
+
+def test_concurrent_writes_share_commits_and_keep_order(db, make_user):
+    user = make_user()
+
+    async def body(queue):
+        return await asyncio.gather(*[queue.submit(post_job(user.id, str(i))) for i in range(20)])
+
+    post_ids, queue = run(body)
+    assert len(set(post_ids)) == 20
+    assert queue.stats()["writes"] == 20
+    assert queue.stats()["batches"] < 20
+    assert contents(db, user.id) == [str(i) for i in range(20)]
+
+def test_a_failing_write_fails_alone(db, make_user):
+    user = make_user()
+
+    def broken(session):
+        post_job(user.id, "rolled back")(session)
+        raise ValueError("bad write")
+
+    async def body(queue):
+        return await asyncio.gather(
+            queue.submit(post_job(user.id, "first")),
+            queue.submit(broken),
+            queue.submit(post_job(user.id, "last")),
+            return_exceptions=True
+        )
+
+    (first, error, last), _ = run(body)
+    assert isinstance(first, int) and isinstance(last, int)
+    assert isinstance(error, ValueError)
+    assert contents(db, user.id) == ["first", "last"]
+    assert db.scalar(select(func.count()).select_from(Post)) == 2
+
+def test_worker_does_not_inherit_the_callers_context(db):
+    async def body(queue):
+        with QueryCounter() as counter:
+            await queue.submit(lambda session: session.execute(select(1)))
+        for _ in range(5):
+            await queue.submit(lambda session: session.execute(select(1)))
+        return counter.count
+
+    counted, _ = run(body)
+    assert counted == 0
+
+def test_cancelled_caller_still_commits(db, make_user):
+    user = make_user()
+
+    async def body(queue):
+        task = asyncio.ensure_future(queue.submit(post_job(user.id, "kept")))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await queue.submit(lambda session: None)  # wait for the batch to be committed
+
+    run(body)
+    assert contents(db, user.id) == ["kept"]